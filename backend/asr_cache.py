@@ -0,0 +1,126 @@
+import os
+import json
+import time
+import sqlite3
+import hashlib
+import threading
+from urllib.parse import urlparse, parse_qs
+
+# Content-addressed cache of ASR results: re-uploads of the same recording (or the same
+# YouTube video) skip LID and ASR entirely. Bounded on disk with LRU eviction.
+ASR_CACHE_ENABLED = os.getenv("ASR_CACHE", "1").lower() not in ("0", "false", "no")
+ASR_CACHE_DIR = os.getenv("ASR_CACHE_DIR", "asr_cache")
+ASR_CACHE_MAX_ENTRIES = int(os.getenv("ASR_CACHE_MAX_ENTRIES", "5000"))
+ASR_CACHE_MAX_MB = float(os.getenv("ASR_CACHE_MAX_MB", "256"))
+
+
+def file_content_id(path, block_size=1 << 20):
+    """Content id of an uploaded file: SHA-256 of its bytes (no decoding needed)."""
+    h = hashlib.sha256()
+    with open(path, "rb") as f:
+        for block in iter(lambda: f.read(block_size), b""):
+            h.update(block)
+    return f"sha256:{h.hexdigest()}"
+
+
+def _host_matches(host, domain):
+    """True for the domain itself and its subdomains (www., m., music.), not e.g. notyoutube.com."""
+    return host == domain or host.endswith("." + domain)
+
+
+def youtube_video_id(url):
+    """Canonical YouTube video id from watch, youtu.be, shorts, embed and live URLs (None if not YouTube)."""
+    parsed = urlparse(url.strip())
+    host = (parsed.hostname or "").lower()
+    if _host_matches(host, "youtu.be"):
+        return parsed.path.lstrip("/").split("/")[0] or None
+    if _host_matches(host, "youtube.com") or _host_matches(host, "youtube-nocookie.com"):
+        if parsed.path == "/watch":
+            return parse_qs(parsed.query).get("v", [None])[0]
+        parts = parsed.path.strip("/").split("/")
+        if len(parts) >= 2 and parts[0] in ("shorts", "embed", "live", "v"):
+            return parts[1]
+    return None
+
+
+def youtube_content_id(url):
+    """Content id for a YouTube URL; falls back to the raw URL for other sites."""
+    video_id = youtube_video_id(url)
+    return f"youtube:{video_id}" if video_id else f"url:{url.strip()}"
+
+
+def make_cache_key(content_id, asr_model, whisper_size, decoding, lid_model):
+    payload = json.dumps([content_id, asr_model, whisper_size, decoding, lid_model])
+    return hashlib.sha256(payload.encode("utf-8")).hexdigest()
+
+
+class TranscriptionCache:
+    """SQLite-backed result store, evicting least-recently-used entries past the size limits."""
+
+    def __init__(self, directory=ASR_CACHE_DIR, max_entries=ASR_CACHE_MAX_ENTRIES, max_mb=ASR_CACHE_MAX_MB):
+        os.makedirs(directory, exist_ok=True)
+        self.max_entries = max_entries
+        self.max_bytes = int(max_mb * 1024 * 1024)
+        self.hits = 0
+        self.misses = 0
+        self.evictions = 0
+        self._lock = threading.Lock()
+        self._db = sqlite3.connect(os.path.join(directory, "transcriptions.db"), check_same_thread=False)
+        self._db.execute(
+            "CREATE TABLE IF NOT EXISTS results ("
+            " key TEXT PRIMARY KEY, value TEXT NOT NULL, size INTEGER NOT NULL,"
+            " created REAL NOT NULL, last_access REAL NOT NULL)"
+        )
+        self._db.execute("CREATE INDEX IF NOT EXISTS results_lru ON results (last_access)")
+        self._db.commit()
+
+    def get(self, key):
+        with self._lock:
+            row = self._db.execute("SELECT value FROM results WHERE key = ?", (key,)).fetchone()
+            if row is None:
+                self.misses += 1
+                return None
+            self.hits += 1
+            self._db.execute("UPDATE results SET last_access = ? WHERE key = ?", (time.time(), key))
+            self._db.commit()
+            return json.loads(row[0])
+
+    def put(self, key, value):
+        data = json.dumps(value, ensure_ascii=False)
+        now = time.time()
+        with self._lock:
+            self._db.execute(
+                "INSERT OR REPLACE INTO results (key, value, size, created, last_access) VALUES (?, ?, ?, ?, ?)",
+                (key, data, len(data.encode("utf-8")), now, now),
+            )
+            self._evict()
+            self._db.commit()
+
+    def _evict(self):
+        count, total = self._db.execute("SELECT COUNT(*), COALESCE(SUM(size), 0) FROM results").fetchone()
+        while count > self.max_entries or (total > self.max_bytes and count > 1):
+            key, size = self._db.execute(
+                "SELECT key, size FROM results ORDER BY last_access ASC LIMIT 1"
+            ).fetchone()
+            self._db.execute("DELETE FROM results WHERE key = ?", (key,))
+            count, total = count - 1, total - size
+            self.evictions += 1
+
+    def stats(self):
+        with self._lock:
+            count, total = self._db.execute("SELECT COUNT(*), COALESCE(SUM(size), 0) FROM results").fetchone()
+            lookups = self.hits + self.misses
+            return {
+                "hits": self.hits,
+                "misses": self.misses,
+                "hit_ratio": round(self.hits / lookups, 4) if lookups else 0.0,
+                "evictions": self.evictions,
+                "entries": count,
+                "size_bytes": total,
+                "max_entries": self.max_entries,
+                "max_bytes": self.max_bytes,
+            }
+
+
+# Process-wide instance (None when ASR_CACHE=0)
+transcription_cache = TranscriptionCache() if ASR_CACHE_ENABLED else None
@@ -1,25 +1,50 @@
 import os
 import time
 import re
+import shutil
+import tempfile
+from bisect import bisect_right
+import numpy as np
 import whisper
 import spacy
 import torchaudio
 import torch
 import faster_whisper
 from transformers import AutoModel
-from jiwer import wer
-from concurrent.futures import ThreadPoolExecutor, as_completed
 
+from asr_cache import transcription_cache, file_content_id, youtube_content_id, make_cache_key
+from audio_buffer import SAMPLE_RATE, AudioBuffer, as_audio_buffer, stream_decode_audio
+from vad import speech_regions, pack_speech_chunks
+
+from model_manager import model_manager, cpu_int8, cpu_model_key, quantize_int8
 from lid import (
-    LanguageIdentifier,
-    extract_audio_ffmpeg,
+    get_language_identifier,
+    use_whisper_model,
+    whisper_lock,
     download_youtube_audio,
+    resolve_audio_stream,
     record_live_audio,
     TARGET_LANGS
 )
 
-# Cache Whisper models to avoid reloading (saves GPU memory)
-_whisper_model_cache = {}
+# Drop non-speech and cut chunks at pauses before ASR (set ASR_VAD=0 for fixed 30 s chunks)
+ASR_VAD = os.getenv("ASR_VAD", "1").lower() not in ("0", "false", "no")
+
+# Number of chunks decoded per forward pass by the batched Whisper/Faster-Whisper engine
+ASR_BATCH_SIZE = int(os.getenv("ASR_BATCH_SIZE", "8"))
+
+# Models are held by the model manager (see model_manager.py): one resident copy per
+# configuration, shared by every chunk and request and evicted LRU under the memory budget.
+
+# Set once CUDA fails for Faster-Whisper (e.g. missing cuBLAS) so later loads go straight to CPU
+_fasterwhisper_cpu_fallback = False
+# CTranslate2 memory is invisible to torch; approximate sizes (MB) used for CPU budgeting
+FASTER_WHISPER_SIZE_MB = {
+    "tiny": 80, "base": 150, "small": 500, "medium": 1550,
+    "large": 3100, "large-v1": 3100, "large-v2": 3100, "large-v3": 3100,
+}
+
+AI4BHARAT_MODEL_NAME = "ai4bharat/indic-conformer-600m-multilingual"
 
 # Load spaCy English model (used for proper-noun highlighting)
 nlp = spacy.load("en_core_web_lg")
@@ -33,18 +58,27 @@ LID2INDICTRANS = {
 }
 
 # Lazy load AI4Bharat ASR
-ai4bharat_model = None
-def load_ai4bharat_model():
-    global ai4bharat_model
-    if ai4bharat_model is None:
-        # Optional: use Hugging Face token if provided (needed for gated repo access)
-        hf_token = os.getenv("HF_TOKEN") or os.getenv("HUGGINGFACEHUB_API_TOKEN")
-        ai4bharat_model = AutoModel.from_pretrained(
-            "ai4bharat/indic-conformer-600m-multilingual",
-            trust_remote_code=True,
-            token=hf_token if hf_token else None,
-        )
-    return ai4bharat_model
+def _load_ai4bharat_model(device):
+    # Optional: use Hugging Face token if provided (needed for gated repo access)
+    hf_token = os.getenv("HF_TOKEN") or os.getenv("HUGGINGFACEHUB_API_TOKEN")
+    model = AutoModel.from_pretrained(
+        AI4BHARAT_MODEL_NAME,
+        trust_remote_code=True,
+        token=hf_token if hf_token else None,
+    )
+    if cpu_int8(device):
+        try:
+            model = quantize_int8(model)
+        except Exception as e:
+            # The remote code may wrap exported graphs that dynamic quantization cannot touch
+            print(f"⚠️ AI4Bharat model could not be quantized ({e}); using fp32")
+    return model
+
+def use_ai4bharat_model():
+    """Hold the IndicConformer model (kept on CPU, as the remote code expects CPU inputs)."""
+    return model_manager.use(
+        cpu_model_key(("ai4bharat_asr", AI4BHARAT_MODEL_NAME), "cpu"), _load_ai4bharat_model, "cpu"
+    )
 
 def get_proper_nouns(text):
     doc = nlp(text)
@@ -57,119 +91,393 @@ def get_proper_nouns(text):
 
 def transcribe_whisper(audio_path, language_code=None, model_size="large"):
     print("\n🔠 Running Whisper ASR...")
-    # Clear GPU cache before loading model to reduce fragmentation
-    if torch.cuda.is_available():
-        torch.cuda.empty_cache()
-    
-    # Use cached model if available, otherwise load and cache it
-    if model_size not in _whisper_model_cache:
-        print(f"📥 Loading Whisper {model_size} model (first time)...")
-        _whisper_model_cache[model_size] = whisper.load_model(model_size)
-    else:
-        print(f"♻️ Using cached Whisper {model_size} model")
-    
-    model = _whisper_model_cache[model_size]
-    result = model.transcribe(audio_path, language=language_code)
-    
-    # Clear cache after transcription to free up memory
-    if torch.cuda.is_available():
-        torch.cuda.empty_cache()
-    
+    with use_whisper_model(model_size) as model, whisper_lock(model):
+        result = model.transcribe(audio_path, language=language_code)
     return result['text']
 
+def transcribe_whisper_batch(chunks, language_code=None, model_size="large", mels=None):
+    """
+    Decode up to 30 s chunks in one forward pass: their log-mel spectrograms are stacked
+    into a (N, n_mels, 3000) batch. Returns one text per chunk, in input order.
+    - mels: precomputed windows (e.g. from AudioBuffer.mel_window) used instead of the chunks.
+    """
+    print(f"\n🔠 Running batched Whisper ASR on {len(chunks)} chunks...")
+    return [r.text.strip() for r in decode_whisper_batch(chunks, language_code, model_size, mels)]
+
+def decode_whisper_batch(chunks, language_code=None, model_size="large", mels=None):
+    """
+    Batched Whisper decode returning whisper.DecodingResult objects, which carry the
+    confidence signals (avg_logprob, no_speech_prob, compression_ratio) next to the text.
+    """
+    with use_whisper_model(model_size) as model:
+        if mels is None:
+            mels = [whisper.log_mel_spectrogram(whisper.pad_or_trim(c), n_mels=model.dims.n_mels) for c in chunks]
+        mels = torch.stack(mels).to(model.device)
+        options = whisper.DecodingOptions(
+            language=language_code,
+            task="transcribe",
+            without_timestamps=True,
+            fp16=model.device.type == "cuda",
+        )
+        with whisper_lock(model), torch.no_grad():
+            return model.decode(mels, options)
+
+def _is_cuda_library_error(e):
+    """True for CUDA runtime failures (e.g. Windows DLL errors mentioning 'cublas64') that CPU can avoid."""
+    err = str(e).lower()
+    return "cublas" in err or "cudnn" in err or isinstance(e, OSError)
+
+def use_fasterwhisper_model(model_size="large-v2", device=None, compute_type="default"):
+    """Hold the resident Faster-Whisper model for this configuration, loading it on first use."""
+    if device is None:
+        use_cuda = torch.cuda.is_available() and not _fasterwhisper_cpu_fallback
+        device = "cuda" if use_cuda else "cpu"
+    if compute_type == "default" and cpu_int8(device):
+        # CTranslate2 quantizes the weights to int8 at load time
+        compute_type = "int8"
+    # CTranslate2 models cannot move between devices, so the device is part of the key
+    return model_manager.use(
+        ("faster_whisper", model_size, device, compute_type),
+        lambda d: faster_whisper.WhisperModel(model_size, device=d, compute_type=compute_type),
+        device,
+        mover=None,
+        size_mb=FASTER_WHISPER_SIZE_MB.get(model_size),
+    )
+
+def _enable_fasterwhisper_cpu_fallback():
+    """Remember that CUDA is unusable and drop any idle CUDA Faster-Whisper models."""
+    global _fasterwhisper_cpu_fallback
+    _fasterwhisper_cpu_fallback = True
+    model_manager.unload(lambda key: key[0] == "faster_whisper" and key[2] == "cuda")
+
+def get_fasterwhisper_stats():
+    """Faster-Whisper slice of the model manager: cache hits/misses, per-model load time, resident models."""
+    stats = model_manager.stats()
+    family = stats["families"].get("faster_whisper", {"hits": 0, "misses": 0})
+    lookups = family["hits"] + family["misses"]
+    return {
+        "hits": family["hits"],
+        "misses": family["misses"],
+        "hit_ratio": round(family["hits"] / lookups, 4) if lookups else 0.0,
+        "load_seconds": {k: v for k, v in stats["load_seconds"].items() if k.startswith("faster_whisper/")},
+        "loaded_models": [m["key"] for m in stats["models"] if m["key"].startswith("faster_whisper/")],
+        "cpu_fallback": _fasterwhisper_cpu_fallback,
+    }
+
 def transcribe_fasterwhisper(audio_path, language_code=None, model_size="large-v2"):
     print("\n⚡ Running Faster-Whisper ASR...")
-    # Prefer CUDA but gracefully fallback to CPU if CUDA libraries (cuBLAS) are missing
-    device = "cuda" if torch.cuda.is_available() else "cpu"
+    segments = fasterwhisper_segments(audio_path, language_code, model_size)
+    return " ".join([seg.text for seg in segments])
+
+def fasterwhisper_segments(audio_path, language_code=None, model_size="large-v2"):
+    """Faster-Whisper segments (text, timestamps and confidence) for one file or 16 kHz array."""
+    # Prefer CUDA but gracefully fallback to CPU if CUDA libraries (cuBLAS) are missing.
+    # Segments are generated lazily, so CUDA errors surface while iterating them.
     try:
-        model = faster_whisper.WhisperModel(model_size, device=device)
-        segments, _ = model.transcribe(audio_path, language=language_code)
+        with use_fasterwhisper_model(model_size) as model:
+            segments, _ = model.transcribe(audio_path, language=language_code)
+            segments = list(segments)
     except Exception as e:
-        err = str(e).lower()
-        # Common Windows DLL missing error contains 'cublas' or 'cublas64'
-        if "cublas" in err or "cublas64" in err or isinstance(e, OSError):
-            print(f"⚠️ CUDA/cuBLAS not available ({e}). Falling back to CPU (slower)...")
-            try:
-                model = faster_whisper.WhisperModel(model_size, device="cpu")
+        if _fasterwhisper_cpu_fallback or not _is_cuda_library_error(e):
+            raise
+        print(f"⚠️ CUDA/cuBLAS not available ({e}). Falling back to CPU (slower)...")
+        _enable_fasterwhisper_cpu_fallback()
+        try:
+            with use_fasterwhisper_model(model_size, device="cpu") as model:
                 segments, _ = model.transcribe(audio_path, language=language_code)
-            except Exception as e2:
-                print(f"❌ Faster-Whisper CPU fallback also failed: {e2}")
-                raise
-        else:
-            # Unknown error - re-raise
+                segments = list(segments)
+        except Exception as e2:
+            print(f"❌ Faster-Whisper CPU fallback also failed: {e2}")
             raise
-    return " ".join([seg.text for seg in segments])
+    return segments
 
-def transcribe_ai4bharat(audio_path, language_code, decoding_strategy="ctc"):
-    print(f"\n🔠 Running AI4Bharat ASR with {decoding_strategy.upper()} decoding...")
-    wav, sr = torchaudio.load(audio_path)
-    wav = torch.mean(wav, dim=0, keepdim=True)  # Convert to mono
+def transcribe_fasterwhisper_batch(audio, spans, language_code=None, model_size="large-v2", batch_size=ASR_BATCH_SIZE,
+                                   progress_callback=None):
+    """
+    Batched Faster-Whisper over (start, end) sample spans of one 16 kHz buffer.
+    Segments are mapped back to their span by start time, so the result has one text per span.
+    - progress_callback(done, total) is called as segments of later spans arrive.
+    """
+    per_span = fasterwhisper_batch_segments(audio, spans, language_code, model_size, batch_size, progress_callback)
+    return [" ".join(seg.text.strip() for seg in segments) for segments in per_span]
 
-    target_sr = 16000
-    if sr != target_sr:
-        resampler = torchaudio.transforms.Resample(orig_freq=sr, new_freq=target_sr)
-        wav = resampler(wav)
+def fasterwhisper_batch_segments(audio, spans, language_code=None, model_size="large-v2", batch_size=ASR_BATCH_SIZE,
+                                 progress_callback=None):
+    """
+    Like transcribe_fasterwhisper_batch, but returns the Faster-Whisper segments of each
+    span (with their avg_logprob / no_speech_prob) instead of the joined text.
+    """
+    if not hasattr(faster_whisper, "BatchedInferencePipeline"):
+        # Older faster-whisper releases: decode the spans one by one
+        return [fasterwhisper_segments(audio[s:e], language_code, model_size) for s, e in spans]
+
+    print(f"\n⚡ Running batched Faster-Whisper ASR on {len(spans)} chunks (batch_size={batch_size})...")
+    # The pipeline slices audio[start:end], so clips are integer sample offsets;
+    # the segments it returns are timed in seconds
+    clips = [{"start": int(s), "end": int(e)} for s, e in spans]
+    starts = [s / SAMPLE_RATE for s, _ in spans]
+
+    def _run(model):
+        pipeline = faster_whisper.BatchedInferencePipeline(model=model)
+        segments, _ = pipeline.transcribe(
+            audio,
+            language=language_code,
+            batch_size=batch_size,
+            vad_filter=False,
+            clip_timestamps=clips,
+        )
+        collected, done = [], 0
+        for seg in segments:
+            collected.append(seg)
+            idx = bisect_right(starts, seg.start + 1e-3) - 1
+            if progress_callback and idx > done:
+                done = idx
+                progress_callback(done, len(spans))
+        return collected
 
-    model = load_ai4bharat_model()
-    transcription = model(wav, language_code, decoding_strategy)
-    return transcription
+    try:
+        with use_fasterwhisper_model(model_size) as model:
+            segments = _run(model)
+    except Exception as e:
+        if _fasterwhisper_cpu_fallback or not _is_cuda_library_error(e):
+            raise
+        print(f"⚠️ CUDA/cuBLAS not available ({e}). Falling back to CPU (slower)...")
+        _enable_fasterwhisper_cpu_fallback()
+        with use_fasterwhisper_model(model_size, device="cpu") as model:
+            segments = _run(model)
+
+    per_span = [[] for _ in spans]
+    for seg in segments:
+        idx = max(0, bisect_right(starts, seg.start + 1e-3) - 1)
+        per_span[idx].append(seg)
+    if progress_callback:
+        progress_callback(len(spans), len(spans))
+    return per_span
+
+def _ai4bharat_input(audio):
+    """(1, T) 16 kHz mono tensor from a file path or an in-memory 16 kHz chunk."""
+    if isinstance(audio, str):
+        wav, sr = torchaudio.load(audio)
+        wav = torch.mean(wav, dim=0, keepdim=True)  # Convert to mono
+        if sr != SAMPLE_RATE:
+            wav = torchaudio.transforms.Resample(orig_freq=sr, new_freq=SAMPLE_RATE)(wav)
+        return wav
+    # In-memory chunk: already 16 kHz mono float32, wrap without copying
+    return torch.from_numpy(np.ascontiguousarray(audio)).unsqueeze(0)
 
+def transcribe_ai4bharat(audio_path, language_code, decoding_strategy="ctc"):
+    print(f"\n🔠 Running AI4Bharat ASR with {decoding_strategy.upper()} decoding...")
+    wav = _ai4bharat_input(audio_path)
+    with use_ai4bharat_model() as model:
+        transcription = model(wav, language_code, decoding_strategy)
+    return transcription
 
 # ------------------------
 # Chunking + Parallel ASR
 # ------------------------
 
-def chunk_audio(audio_path, chunk_len=30):
-    """Split audio into N-second chunks (WAV)."""
-    wav, sr = torchaudio.load(audio_path)
-    duration = wav.size(1) / sr
-    chunks = []
+def chunk_spans(audio, chunk_len=30, vad=None):
+    """
+    (start, end) sample spans to transcribe (audio: AudioBuffer or 16 kHz array).
+    - vad=True packs detected speech into windows of up to chunk_len seconds, split at pauses.
+    - vad=False (or no speech found) falls back to fixed chunk_len windows, keeping the tail.
+    """
+    vad = ASR_VAD if vad is None else vad
+    samples = audio.samples if isinstance(audio, AudioBuffer) else audio
+    if vad:
+        regions = audio.speech_regions() if isinstance(audio, AudioBuffer) else speech_regions(samples)
+        spans = pack_speech_chunks(samples, regions, max_chunk_s=chunk_len)
+        if spans:
+            kept = sum(e - s for s, e in spans) / max(len(samples), 1)
+            print(f"🗣️ VAD kept {kept:.0%} of the audio as speech")
+            return spans
+        print("⚠️ VAD found no speech; using fixed-length chunks")
+    step = chunk_len * SAMPLE_RATE
+    return [(start, min(start + step, len(samples))) for start in range(0, len(samples), step)]
+
+def chunk_audio(audio_path, chunk_len=30, in_memory=True, vad=None, spans=None):
+    """
+    Split audio into chunks of at most N seconds (see chunk_spans for VAD behaviour).
+    - in_memory=True returns zero-copy NumPy views of one decoded 16 kHz buffer.
+    - in_memory=False writes WAVs into a fresh per-request directory under chunks/;
+      the caller owns that directory and should remove it when done.
+    - spans reuses (start, end) pairs already computed by chunk_spans.
+    """
+    audio = as_audio_buffer(audio_path).samples
+    spans = spans if spans is not None else chunk_spans(audio, chunk_len, vad)
+    views = [audio[start:end] for start, end in spans]
+    if in_memory:
+        return views
 
     os.makedirs("chunks", exist_ok=True)
-    for i in range(0, int(duration), chunk_len):
-        start = i * sr
-        end = min((i + chunk_len) * sr, wav.size(1))
-        chunk_wav = wav[:, start:end]
-        chunk_path = f"chunks/{os.path.basename(audio_path)}_{i//chunk_len}.wav"
-        torchaudio.save(chunk_path, chunk_wav, sr)
+    chunk_dir = tempfile.mkdtemp(prefix="asr_", dir="chunks")
+    chunks = []
+    for i, view in enumerate(views):
+        chunk_path = os.path.join(chunk_dir, f"{i:05d}.wav")
+        torchaudio.save(chunk_path, torch.from_numpy(view).unsqueeze(0), SAMPLE_RATE)
         chunks.append(chunk_path)
     return chunks
 
-def transcribe_in_chunks(audio_path, model_name, lang, whisper_size, decoding):
-    """Run ASR in parallel on chunks."""
-    chunks = chunk_audio(audio_path, chunk_len=30)
-    print(f"🔪 Split into {len(chunks)} chunks...")
-
-    results = []
-    max_workers = 1 if model_name == "ai4bharat" else 1
-
-    with ThreadPoolExecutor(max_workers=max_workers) as executor:
-        futures = {}
-        for c in chunks:
-            if model_name == "faster_whisper":
-                futures[executor.submit(transcribe_fasterwhisper, c, lang, whisper_size)] = c
-            elif model_name == "whisper":
-                futures[executor.submit(transcribe_whisper, c, lang, whisper_size)] = c
-            else:  # ai4bharat
-                futures[executor.submit(transcribe_ai4bharat, c, lang, decoding)] = c
-
-        errors = []
-        for fut in as_completed(futures):
+def _decode_each(indices, decode_one):
+    """Per-chunk fallback after a failed batch: (results, errors) so only failing chunks are reported."""
+    results, errors = [], []
+    for i in indices:
+        try:
+            results.append((i, decode_one(i)))
+        except Exception as e:
+            print(f"❌ Error transcribing chunk {i}: {e}")
+            errors.append((i, e))
+    return results, errors
+
+def _transcribe_batched(buffer, spans, model_name, lang, whisper_size, decoding, batch_size, progress_callback=None):
+    """Batched engine for Whisper / Faster-Whisper; returns (results, errors) of (chunk index, text / exception)."""
+    audio = buffer.samples
+    results, errors = [], []
+    if model_name == "faster_whisper":
+        try:
+            texts = transcribe_fasterwhisper_batch(audio, spans, lang, whisper_size, batch_size, progress_callback)
+        except Exception as e:
+            print(f"❌ Batched Faster-Whisper failed ({e}); transcribing chunks one by one")
+            return _decode_each(
+                range(len(spans)),
+                lambda i: transcribe_fasterwhisper(audio[spans[i][0]:spans[i][1]], lang, whisper_size),
+            )
+        return list(enumerate(texts)), errors
+
+    try:
+        with use_whisper_model(whisper_size) as model:
+            n_mels = model.dims.n_mels
+    except Exception as e:
+        print(f"❌ Error loading Whisper {whisper_size}: {e}")
+        return results, [(i, e) for i in range(len(spans))]
+
+    def decode_whisper(indices):
+        # Slice the buffer's cached log-mel instead of recomputing it per chunk
+        chunks = [audio[spans[i][0]:spans[i][1]] for i in indices]
+        mels = [buffer.mel_window(spans[i][0], spans[i][1], n_mels) for i in indices]
+        return transcribe_whisper_batch(chunks, lang, whisper_size, mels=mels)
+
+    # Group chunks of similar length so padded batches waste as little compute as possible
+    order = sorted(range(len(spans)), key=lambda i: spans[i][1] - spans[i][0])
+    for first in range(0, len(order), batch_size):
+        batch = order[first:first + batch_size]
+        try:
+            results.extend(zip(batch, decode_whisper(batch)))
+        except Exception as e:
+            # Re-run the batch item by item so only the chunks that really fail are reported
+            print(f"❌ Error transcribing chunks {sorted(batch)} as a batch: {e}")
+            batch_results, batch_errors = _decode_each(batch, lambda i: decode_whisper([i])[0])
+            results.extend(batch_results)
+            errors.extend(batch_errors)
+        if progress_callback:
+            progress_callback(min(first + batch_size, len(order)), len(order))
+    return results, errors
+
+def _run_chunks(buffer, spans, model_name, lang, whisper_size, decoding, in_memory=True, batch_size=None,
+                progress_callback=None):
+    """
+    Transcribe every span with one backend; returns (results, errors) as lists of
+    (span index, text) and (span index, exception), so failures stay attributable to chunks.
+    - Chunks are decoded batch_size at a time per forward pass (default ASR_BATCH_SIZE).
+    - batch_size=1, in_memory=False and AI4Bharat use the per-chunk path: the
+      IndicConformer remote code decodes one utterance per call (no padding mask or lengths).
+    """
+    batch_size = batch_size or ASR_BATCH_SIZE
+    if in_memory and batch_size > 1 and model_name != "ai4bharat":
+        return _transcribe_batched(
+            buffer, spans, model_name, lang, whisper_size, decoding, batch_size, progress_callback
+        )
+
+    chunks = chunk_audio(buffer.samples, in_memory=in_memory, spans=spans)
+    results, errors = [], []
+    # One chunk at a time: the backends share one resident model, so threads would only contend for it
+    try:
+        for i, c in enumerate(chunks):
             try:
-                results.append((futures[fut], fut.result()))
+                if model_name == "faster_whisper":
+                    results.append((i, transcribe_fasterwhisper(c, lang, whisper_size)))
+                elif model_name == "whisper":
+                    results.append((i, transcribe_whisper(c, lang, whisper_size)))
+                else:  # ai4bharat
+                    results.append((i, transcribe_ai4bharat(c, lang, decoding)))
             except Exception as e:
-                print(f"❌ Error transcribing {futures[fut]}: {e}")
-                errors.append(e)
-
-    # If every chunk failed, raise to trigger fallback
-    if len(results) == 0:
-        if errors:
-            # Surface the first error; outer layer will handle fallback
-            raise errors[0]
+                print(f"❌ Error transcribing chunk {i}: {e}")
+                errors.append((i, e))
+            if progress_callback:
+                progress_callback(i + 1, len(chunks))
+    finally:
+        if not in_memory and chunks:
+            shutil.rmtree(os.path.dirname(chunks[0]), ignore_errors=True)
+
+    return results, errors
+
+def transcribe_segments(audio_path, model_name, lang, whisper_size, decoding, fallback_model=None,
+                        in_memory=True, vad=None, batch_size=None, progress_callback=None):
+    """
+    Run ASR over chunks and return one segment per chunk, in order:
+    {"index", "start", "end", "text", "model"} (times in seconds).
+    - Only chunks that fail on model_name are re-run on fallback_model; successful chunks are kept.
+    - Chunks that fail on every backend get text "", model None and an "error" message.
+      Raises only if no chunk could be transcribed at all.
+    - progress_callback(done, total) reports finished chunks.
+    """
+    buffer = as_audio_buffer(audio_path)
+    spans = chunk_spans(buffer, chunk_len=30, vad=vad)
+    print(f"🔪 Split into {len(spans)} chunks...")
+
+    results, errors = _run_chunks(buffer, spans, model_name, lang, whisper_size, decoding,
+                                  in_memory, batch_size, progress_callback)
+    texts = dict(results)
+    models = {i: model_name for i in texts}
+    failed = dict(errors)
+
+    if failed and fallback_model and fallback_model != model_name:
+        retry = sorted(failed)
+        print(f"\n🔄 Re-running {len(retry)} of {len(spans)} chunks with {fallback_model}...")
+        retry_results, retry_errors = _run_chunks(
+            buffer, [spans[i] for i in retry], fallback_model, lang, whisper_size, decoding,
+            in_memory, batch_size, progress_callback
+        )
+        for j, text in retry_results:
+            texts[retry[j]] = text
+            models[retry[j]] = fallback_model
+            del failed[retry[j]]
+        for j, e in retry_errors:
+            failed[retry[j]] = e
+
+    # If every chunk failed, raise so the caller can report it
+    if not texts:
+        if failed:
+            raise failed[min(failed)]
         raise Exception("No chunks transcribed")
+    if failed:
+        print(f"⚠️ {len(failed)} of {len(spans)} chunks could not be transcribed: {sorted(failed)}")
+
+    segments = []
+    for i, (start, end) in enumerate(spans):
+        segment = {
+            "index": i,
+            "start": round(start / SAMPLE_RATE, 2),
+            "end": round(end / SAMPLE_RATE, 2),
+            "text": texts.get(i, "").strip(),
+            "model": models.get(i),
+        }
+        if i in failed:
+            segment["error"] = str(failed[i])
+        segments.append(segment)
+    return segments
+
+def segments_model_used(segments, preferred):
+    """The model that produced the transcription: `preferred` if it produced any segment."""
+    used = [s["model"] for s in segments if s["model"]]
+    return preferred if preferred in used or not used else used[0]
 
-    results.sort(key=lambda x: x[0])  # keep chunk order
-    return " ".join([r[1] for r in results])
+def transcribe_in_chunks(audio_path, model_name, lang, whisper_size, decoding, in_memory=True, vad=None,
+                         batch_size=None, progress_callback=None, fallback_model=None):
+    """Run ASR over chunks and return the joined text (see transcribe_segments)."""
+    segments = transcribe_segments(audio_path, model_name, lang, whisper_size, decoding, fallback_model,
+                                   in_memory, vad, batch_size, progress_callback)
+    return " ".join(s["text"] for s in segments if s["text"])
 
 
 # ------------------------
@@ -230,25 +538,51 @@ def process_transcription(audio_path, text):
 
 def run_asr_with_fallback(audio_path, asr_model="whisper", whisper_size="large", decoding="ctc", 
                          duration=5, mic=False, youtube=None, lid_model="whisper", 
-                         selected_language=None):
+                         selected_language=None, progress_callback=None):
     """
     Run ASR with automatic language detection and fallback mechanism from Indic to Whisper
+    - progress_callback(stage, done, total) reports "download", "lid" and per-chunk "asr" progress.
     """
+    def report(stage, done, total):
+        if progress_callback:
+            progress_callback(stage, done, total)
+
+    def asr_progress(done, total):
+        report("asr", done, total)
+
     try:
+        # Serve repeated uploads / YouTube URLs from the transcription cache
+        cache_key = None
+        if transcription_cache is not None and not mic:
+            content_id = youtube_content_id(youtube) if youtube else file_content_id(audio_path)
+            cache_key = make_cache_key(content_id, asr_model, whisper_size, decoding, lid_model)
+            cached = transcription_cache.get(cache_key)
+            if cached is not None:
+                print(f"⚡ Transcription cache hit for {content_id}")
+                return {**cached, "output_file": None, "cached": True}
+
         # Handle input
         if youtube:
+            report("download", 0, 1)
             audio_path = download_youtube_audio(youtube)
+            report("download", 1, 1)
         elif mic:
             print("\n🎤 Speak now...")
             time.sleep(1)
             audio_path = record_live_audio(duration=duration)
-        elif audio_path.lower().endswith(('.mp4', '.mkv', '.mov', '.avi')):
-            audio_path = extract_audio_ffmpeg(audio_path)
+
+        # Decode once (ffmpeg also strips the video track) and share the buffer
+        # between LID, chunking and every ASR backend
+        audio = AudioBuffer.from_file(audio_path)
+        print(f"\n🎧 Decoded {audio.duration:.1f}s of audio")
 
         # Language Identification - Always detect language automatically
         print(f"\n🔍 Detecting language using {lid_model} LID model...")
-        lid = LanguageIdentifier(lid_model=lid_model)
-        detected_lang, probs = lid.detect(audio_path)
+        report("lid", 0, 1)
+        # Shared LID instance; Whisper weights of the same size are shared with ASR by the model manager
+        lid = get_language_identifier(lid_model)
+        detected_lang, probs = lid.detect(audio)
+        report("lid", 1, 1)
         
         # Use detected language (ignore selected_language for ASR)
         lang = detected_lang
@@ -260,59 +594,36 @@ def run_asr_with_fallback(audio_path, asr_model="whisper", whisper_size="large",
         if not lang:
             raise Exception("Could not detect language from audio")
 
-        # Run ASR with fallback mechanism
-        text = None
-        model_used = asr_model
-        
-        try:
-            if asr_model == "ai4bharat":
-                # Try AI4Bharat first
-                print(f"\n🔠 Attempting AI4Bharat ASR...")
-                text = transcribe_in_chunks(audio_path, "ai4bharat", lang, whisper_size, decoding)
-                print(f"✅ AI4Bharat ASR completed successfully")
-                
-            elif asr_model == "faster_whisper":
-                # Use Faster-Whisper
-                print(f"\n⚡ Using Faster-Whisper ASR...")
-                text = transcribe_in_chunks(audio_path, "faster_whisper", lang, whisper_size, decoding)
-                print(f"✅ Faster-Whisper ASR completed successfully")
-                
-            else:  # whisper
-                # Use Whisper
-                print(f"\n🔠 Using Whisper ASR...")
-                text = transcribe_in_chunks(audio_path, "whisper", lang, whisper_size, decoding)
-                print(f"✅ Whisper ASR completed successfully")
-                
-        except Exception as e:
-            print(f"❌ {asr_model} ASR failed: {str(e)}")
-            
-            # Fallback to Whisper if AI4Bharat fails
-            if asr_model == "ai4bharat":
-                print(f"\n🔄 Falling back to Whisper ASR...")
-                try:
-                    text = transcribe_in_chunks(audio_path, "whisper", lang, whisper_size, decoding)
-                    model_used = "whisper"
-                    print(f"✅ Whisper fallback completed successfully")
-                except Exception as fallback_error:
-                    print(f"❌ Whisper fallback also failed: {str(fallback_error)}")
-                    raise Exception(f"Both AI4Bharat and Whisper failed: {str(e)} | {str(fallback_error)}")
-            else:
-                raise e
-
+        # Run ASR; with AI4Bharat, only the chunks it fails on are re-run with Whisper
+        fallback_model = "whisper" if asr_model == "ai4bharat" else None
+        print(f"\n🔠 Running {asr_model} ASR...")
+        segments = transcribe_segments(audio, asr_model, lang, whisper_size, decoding,
+                                       fallback_model=fallback_model, progress_callback=asr_progress)
+        model_used = segments_model_used(segments, asr_model)
+        fallback_count = sum(1 for s in segments if s["model"] == fallback_model)
+        if fallback_model and fallback_count:
+            print(f"🔄 {fallback_count} of {len(segments)} chunks were transcribed by {fallback_model}")
+        print(f"✅ ASR completed successfully")
+
+        text = " ".join(s["text"] for s in segments if s["text"])
         if not text:
             raise Exception("No transcription generated")
 
         # Process + save
         final_text, output_file = process_transcription(audio_path, text)
 
-        return {
+        result = {
             "transcription": final_text,
             "language": lang,
             "language_name": TARGET_LANGS.get(lang, lang),
             "model_used": model_used,
-            "output_file": output_file,
+            "segments": segments,
             "success": True
         }
+        # Partial transcriptions are not cached, so the failed chunks get another try next time
+        if cache_key is not None and not any("error" in s for s in segments):
+            transcription_cache.put(cache_key, result)
+        return {**result, "output_file": output_file, "cached": False}
 
     except Exception as e:
         print(f"❌ ASR processing failed: {str(e)}")
@@ -327,6 +638,124 @@ def run_asr_with_fallback(audio_path, asr_model="whisper", whisper_size="large",
         }
 
 
+# ------------------------
+# Streaming ASR (transcribe while downloading)
+# ------------------------
+
+def _transcribe_window(audio, asr_model, lang, whisper_size, decoding):
+    """
+    Transcribe one streamed window; chunks AI4Bharat fails on are re-run with Whisper.
+    Returns (text, model_used, number of chunks that failed on every backend).
+    """
+    fallback_model = "whisper" if asr_model == "ai4bharat" else None
+    segments = transcribe_segments(audio, asr_model, lang, whisper_size, decoding, fallback_model=fallback_model)
+    failed = sum(1 for s in segments if "error" in s)
+    return " ".join(s["text"] for s in segments if s["text"]), segments_model_used(segments, asr_model), failed
+
+def _stream_windows(blocks):
+    """
+    Cut a stream of 16 kHz blocks into windows without reading ahead, so each window can be
+    transcribed before the next block arrives. Speech still running at the end of a block
+    is held back and prepended to the next one; whatever is held back when the stream ends
+    becomes the last window.
+    """
+    pending = np.zeros(0, dtype=np.float32)
+    for block in blocks:
+        audio = np.concatenate([pending, block])
+        cut = len(audio)
+        regions = speech_regions(audio)
+        # Hold back a trailing utterance (at most half a block, so continuous speech still flows)
+        if regions and regions[-1][1] >= len(audio) - SAMPLE_RATE // 10 \
+                and 0 < len(audio) - regions[-1][0] <= len(block) // 2:
+            cut = regions[-1][0]
+        pending = audio[cut:]
+        if cut:
+            yield audio[:cut]
+    if len(pending):
+        yield pending
+
+def transcribe_stream(blocks, asr_model="whisper", whisper_size="large", decoding="ctc", lid_model="whisper"):
+    """
+    Incrementally transcribe 16 kHz mono blocks (e.g. 30 s windows from stream_decode_audio).
+    Speech still running at the end of a block is held back and prepended to the next one,
+    so windows are cut in pauses. Yields events as soon as each window is decoded:
+      {"type": "language", ...}, then {"type": "segment", "start", "end", "text", ...} per window,
+      and finally {"type": "done", "transcription", "failed_chunks", ...}.
+    """
+    lid = get_language_identifier(lid_model)
+    lang, models_used, texts = None, [], []
+    failed_chunks = 0
+    offset, index = 0, 0
+
+    for samples in _stream_windows(blocks):
+        window = AudioBuffer(samples)
+        if window.speech_regions():
+            if lang is None:
+                lang, probs = lid.detect(window)
+                if not lang:
+                    raise Exception("Could not detect language from audio")
+                print(f"\n✅ Detected Language: {TARGET_LANGS.get(lang, lang)} ({lang})")
+                yield {"type": "language", "language": lang, "language_name": TARGET_LANGS.get(lang, lang)}
+
+            text, model_used, failed = _transcribe_window(window, asr_model, lang, whisper_size, decoding)
+            failed_chunks += failed
+            texts.append(text)
+            models_used.append(model_used)
+            yield {
+                "type": "segment",
+                "index": index,
+                "start": round(offset / SAMPLE_RATE, 2),
+                "end": round((offset + len(samples)) / SAMPLE_RATE, 2),
+                "text": text.strip(),
+                "model_used": model_used,
+            }
+            index += 1
+
+        offset += len(samples)
+
+    if lang is None:
+        raise Exception("No speech found in the audio stream")
+    yield {
+        "type": "done",
+        "transcription": clean_and_paragraphize(" ".join(texts)),
+        "language": lang,
+        "language_name": TARGET_LANGS.get(lang, lang),
+        "model_used": asr_model if asr_model in models_used else (models_used[0] if models_used else asr_model),
+        "duration": round(offset / SAMPLE_RATE, 2),
+        "failed_chunks": failed_chunks,
+    }
+
+def stream_youtube_transcription(url, asr_model="whisper", whisper_size="large", decoding="ctc",
+                                 lid_model="whisper", window_s=30):
+    """
+    Streaming YouTube ingest: the best audio stream is piped through ffmpeg straight to
+    16 kHz mono PCM and each window is transcribed as soon as it has been received, instead
+    of waiting for the whole download + WAV conversion. Results are shared with the
+    transcription cache used by run_asr_with_fallback.
+    """
+    cache_key = None
+    if transcription_cache is not None:
+        cache_key = make_cache_key(youtube_content_id(url), asr_model, whisper_size, decoding, lid_model)
+        cached = transcription_cache.get(cache_key)
+        if cached is not None:
+            yield {"type": "done", **cached, "cached": True}
+            return
+
+    stream_url, headers = resolve_audio_stream(url)
+    blocks = stream_decode_audio(stream_url, window_s=window_s, headers=headers)
+    for event in transcribe_stream(blocks, asr_model, whisper_size, decoding, lid_model):
+        # Partial transcriptions are not cached (see run_asr_with_fallback)
+        if event["type"] == "done" and cache_key is not None and not event["failed_chunks"]:
+            transcription_cache.put(cache_key, {
+                "transcription": event["transcription"],
+                "language": event["language"],
+                "language_name": event["language_name"],
+                "model_used": event["model_used"],
+                "success": True,
+            })
+        yield event
+
+
 # ----------------
 # Standalone mode
 # ----------------
@@ -0,0 +1,140 @@
+import subprocess
+import threading
+
+import numpy as np
+import torch
+import whisper
+
+from vad import speech_regions
+
+# Every ASR/LID backend consumes 16 kHz mono float32 audio
+SAMPLE_RATE = 16000
+# Whisper log-mel hop length: 100 frames per second
+HOP_LENGTH = 160
+# Whisper's 30 s input window, in samples and in mel frames
+N_SAMPLES = 30 * SAMPLE_RATE
+N_FRAMES = N_SAMPLES // HOP_LENGTH
+
+
+def decode_audio(path, sr=SAMPLE_RATE):
+    """Decode any ffmpeg-readable file (audio or video) to mono float32 PCM at `sr`."""
+    cmd = [
+        "ffmpeg", "-nostdin",
+        "-threads", "0",
+        "-i", path,
+        "-vn",           # No video
+        "-f", "s16le",
+        "-ac", "1",      # Mono
+        "-acodec", "pcm_s16le",
+        "-ar", str(sr),
+        "-",
+    ]
+    try:
+        out = subprocess.run(cmd, capture_output=True, check=True).stdout
+    except subprocess.CalledProcessError as e:
+        raise RuntimeError(f"Failed to decode audio: {e.stderr.decode(errors='ignore')[-500:]}") from e
+    return np.frombuffer(out, np.int16).flatten().astype(np.float32) / 32768.0
+
+
+def stream_decode_audio(source, window_s=30, headers=None, sr=SAMPLE_RATE):
+    """
+    Decode a file path or (HTTP) URL through ffmpeg and yield mono float32 blocks of
+    window_s seconds as soon as each one is complete (the last block may be shorter).
+    - headers: extra HTTP request headers for the media URL (e.g. from yt-dlp).
+    """
+    cmd = ["ffmpeg", "-nostdin", "-loglevel", "error"]
+    if headers:
+        cmd += ["-headers", "".join(f"{k}: {v}\r\n" for k, v in headers.items())]
+    cmd += [
+        "-i", source,
+        "-vn",           # No video
+        "-f", "s16le",
+        "-ac", "1",      # Mono
+        "-acodec", "pcm_s16le",
+        "-ar", str(sr),
+        "pipe:1",
+    ]
+    block_bytes = int(window_s * sr) * 2
+    proc = subprocess.Popen(cmd, stdout=subprocess.PIPE, stderr=subprocess.PIPE)
+    try:
+        while True:
+            data = proc.stdout.read(block_bytes)
+            if not data:
+                break
+            yield np.frombuffer(data[:len(data) - len(data) % 2], np.int16).astype(np.float32) / 32768.0
+        if proc.wait() != 0:
+            raise RuntimeError(f"Failed to decode audio stream: {proc.stderr.read().decode(errors='ignore')[-500:]}")
+    finally:
+        if proc.poll() is None:
+            proc.kill()
+            proc.wait()
+
+
+class AudioBuffer:
+    """
+    One upload decoded once to 16 kHz mono float32 and shared by LID, chunking and
+    every ASR backend. Carries its duration and caches the full-length Whisper
+    log-mel spectrogram so LID and ASR do not compute it twice.
+    """
+
+    def __init__(self, samples, source=None):
+        self.samples = np.ascontiguousarray(samples, dtype=np.float32)
+        self.sample_rate = SAMPLE_RATE
+        self.source = source
+        self._mels = {}
+        self._speech_regions = None
+        self._lock = threading.Lock()
+
+    @classmethod
+    def from_file(cls, path):
+        return cls(decode_audio(path), source=path)
+
+    def __len__(self):
+        return len(self.samples)
+
+    @property
+    def duration(self):
+        return len(self.samples) / self.sample_rate
+
+    def speech_regions(self):
+        """VAD speech regions as (start, end) sample pairs, computed once and shared by LID and chunking."""
+        if self._speech_regions is None:
+            self._speech_regions = speech_regions(self.samples, self.sample_rate)
+        return self._speech_regions
+
+    def log_mel(self, n_mels=80):
+        """
+        Full-length log-mel spectrogram, computed once per n_mels.
+        Like whisper.transcribe, N_SAMPLES of silence are appended so every window can be sliced.
+        """
+        with self._lock:
+            if n_mels not in self._mels:
+                self._mels[n_mels] = whisper.log_mel_spectrogram(
+                    torch.from_numpy(self.samples), n_mels=n_mels, padding=N_SAMPLES
+                )
+            return self._mels[n_mels]
+
+    def mel_window(self, start=0, end=None, n_mels=80):
+        """
+        (n_mels, N_FRAMES) Whisper input for samples [start, end), sliced from the cached
+        spectrogram. Frames past `end` are filled with the silence padding, so audio that
+        follows the window (e.g. the next VAD chunk) never leaks into it.
+        """
+        mel = self.log_mel(n_mels)
+        end = len(self.samples) if end is None else end
+        first = start // HOP_LENGTH
+        last = min(first + N_FRAMES, -(-end // HOP_LENGTH))
+        window = mel[:, first:last]
+        if window.shape[-1] < N_FRAMES:
+            silence = mel[:, -1:].expand(-1, N_FRAMES - window.shape[-1])
+            window = torch.cat([window, silence], dim=-1)
+        return window
+
+
+def as_audio_buffer(audio):
+    """Accept a file path, a 16 kHz NumPy array or an AudioBuffer and return an AudioBuffer."""
+    if isinstance(audio, AudioBuffer):
+        return audio
+    if isinstance(audio, str):
+        return AudioBuffer.from_file(audio)
+    return AudioBuffer(audio)
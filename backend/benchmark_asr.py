@@ -0,0 +1,243 @@
+#!/usr/bin/env python3
+"""
+ASR benchmark harness for regression tracking
+Runs every backend/size/decoding/chunking combination over a directory of reference
+pairs (<name>.wav + <name>.txt) and reports per configuration:
+- model load time, real-time factor, p50/p95 latency per file
+- peak RAM and VRAM while transcribing
+- WER against the references (case and punctuation are ignored)
+
+The defaults use the smallest models so it runs on any dev box; force CPU with
+CUDA_VISIBLE_DEVICES= and compare runs by diffing the JSON reports.
+
+Usage:
+    python benchmark_asr.py --data samples --out asr_benchmark.json
+    python benchmark_asr.py --data eval/hi --language hi --models whisper faster_whisper \\
+        --sizes tiny base small --batch-sizes 1 8 --vad on off
+"""
+
+import os
+import re
+import sys
+import json
+import time
+import argparse
+import platform
+import threading
+import itertools
+import resource
+
+import numpy as np
+import torch
+from jiwer import wer
+
+from audio_buffer import AudioBuffer
+from asr_pipeline import transcribe_in_chunks
+from lid import get_language_identifier
+from model_manager import model_manager
+
+AUDIO_EXTS = (".wav", ".mp3", ".flac", ".m4a", ".ogg", ".webm", ".mp4")
+
+
+def normalize_text(text):
+    """Lowercase, drop punctuation (keeping Indic letters and combining marks) and collapse spaces."""
+    text = re.sub(r"[^\w\sऀ-෿]|[।॥]", " ", text.lower())
+    return re.sub(r"\s+", " ", text).strip()
+
+
+def load_dataset(directory):
+    pairs = []
+    for name in sorted(os.listdir(directory)):
+        if not name.lower().endswith(AUDIO_EXTS):
+            continue
+        path = os.path.join(directory, name)
+        ref_path = os.path.splitext(path)[0] + ".txt"
+        reference = None
+        if os.path.exists(ref_path):
+            with open(ref_path, encoding="utf-8") as f:
+                reference = f.read().strip()
+        pairs.append({"path": path, "audio": AudioBuffer.from_file(path), "reference": reference})
+    return pairs
+
+
+def _rss_bytes():
+    try:
+        with open("/proc/self/statm") as f:
+            return int(f.read().split()[1]) * os.sysconf("SC_PAGE_SIZE")
+    except (OSError, ValueError):
+        # Not Linux: lifetime peak is the best available figure
+        scale = 1 if sys.platform == "darwin" else 1024
+        return resource.getrusage(resource.RUSAGE_SELF).ru_maxrss * scale
+
+
+class PeakMemory:
+    """Samples RSS in a background thread and tracks CUDA peak allocation for a with-block."""
+
+    def __init__(self, interval=0.05):
+        self.interval = interval
+        self.peak_ram = 0
+        self.peak_vram = 0
+        self._stop = threading.Event()
+
+    def _sample(self):
+        while not self._stop.is_set():
+            self.peak_ram = max(self.peak_ram, _rss_bytes())
+            self._stop.wait(self.interval)
+
+    def __enter__(self):
+        if torch.cuda.is_available():
+            torch.cuda.reset_peak_memory_stats()
+        self._thread = threading.Thread(target=self._sample, daemon=True)
+        self._thread.start()
+        return self
+
+    def __exit__(self, *exc):
+        self._stop.set()
+        self._thread.join()
+        self.peak_ram = max(self.peak_ram, _rss_bytes())
+        if torch.cuda.is_available():
+            self.peak_vram = torch.cuda.max_memory_allocated()
+
+
+def _percentile(values, q):
+    return round(float(np.percentile(values, q)), 3) if values else None
+
+
+def build_configs(args):
+    configs = []
+    for model_name in args.models:
+        # Sizes only apply to Whisper backends, decoding strategies only to AI4Bharat
+        sizes = args.sizes if model_name in ("whisper", "faster_whisper") else [None]
+        decodings = args.decodings if model_name == "ai4bharat" else [None]
+        for size, decoding, batch_size, vad in itertools.product(sizes, decodings, args.batch_sizes, args.vad):
+            configs.append({
+                "model": model_name, "size": size, "decoding": decoding,
+                "batch_size": batch_size, "vad": vad == "on",
+            })
+    return configs
+
+
+def run_config(config, dataset, languages):
+    name = "/".join(str(v) for v in (config["model"], config["size"] or config["decoding"]))
+    label = f"{name} batch={config['batch_size']} vad={'on' if config['vad'] else 'off'}"
+    print(f"\n🏁 {label}")
+
+    def transcribe(sample):
+        return transcribe_in_chunks(
+            sample["audio"], config["model"], languages[sample["path"]], config["size"] or "small",
+            config["decoding"] or "ctc", vad=config["vad"], batch_size=config["batch_size"],
+        )
+
+    # Start cold so the load time belongs to this configuration
+    model_manager.unload(lambda key: True)
+    before = model_manager.stats()["load_seconds"]
+    report = dict(config)
+    files = []
+    with PeakMemory() as memory:
+        started = time.perf_counter()
+        try:
+            transcribe(dataset[0])  # Warm-up: loads the model and fills lazy caches
+        except Exception as e:
+            print(f"❌ {label} failed: {e}")
+            report["error"] = str(e)
+            return report
+        warmup = time.perf_counter() - started
+        after = model_manager.stats()["load_seconds"]
+
+        for sample in dataset:
+            started = time.perf_counter()
+            hypothesis = transcribe(sample)
+            latency = time.perf_counter() - started
+            files.append({
+                "file": os.path.basename(sample["path"]),
+                "language": languages[sample["path"]],
+                "duration": round(sample["audio"].duration, 2),
+                "latency": round(latency, 3),
+                "rtf": round(latency / sample["audio"].duration, 4) if sample["audio"].duration else None,
+                "hypothesis": hypothesis,
+            })
+
+    load_seconds = sum(v for k, v in after.items() if before.get(k) != v)
+    latencies = [f["latency"] for f in files]
+    audio_seconds = sum(f["duration"] for f in files)
+    report.update({
+        "load_seconds": round(load_seconds, 3),
+        "warmup_seconds": round(warmup, 3),
+        "audio_seconds": round(audio_seconds, 2),
+        "rtf": round(sum(latencies) / audio_seconds, 4) if audio_seconds else None,
+        "latency_p50": _percentile(latencies, 50),
+        "latency_p95": _percentile(latencies, 95),
+        "peak_ram_mb": round(memory.peak_ram / 1024 ** 2),
+        "peak_vram_mb": round(memory.peak_vram / 1024 ** 2),
+    })
+
+    scored = [(normalize_text(s["reference"]), normalize_text(f["hypothesis"]))
+              for s, f in zip(dataset, files) if s["reference"]]
+    scored = [(ref, hyp) for ref, hyp in scored if ref]
+    if scored:
+        report["wer"] = round(wer([r for r, _ in scored], [h for _, h in scored]), 4)
+        for f, s in zip(files, dataset):
+            if s["reference"] and normalize_text(s["reference"]):
+                f["wer"] = round(wer(normalize_text(s["reference"]), normalize_text(f["hypothesis"])), 4)
+    report["files"] = files
+    print(f"📊 {label}: RTF {report['rtf']} p50 {report['latency_p50']}s p95 {report['latency_p95']}s "
+          f"load {report['load_seconds']}s WER {report.get('wer', 'n/a')}")
+    return report
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Benchmark ASR backends: RTF, latency, memory, load time and WER")
+    parser.add_argument("--data", default="samples", help="Directory of audio files with <name>.txt references")
+    parser.add_argument("--models", nargs="+", default=["whisper", "faster_whisper", "ai4bharat"],
+                        choices=["whisper", "faster_whisper", "ai4bharat"])
+    parser.add_argument("--sizes", nargs="+", default=["tiny"], help="Whisper / Faster-Whisper model sizes")
+    parser.add_argument("--decodings", nargs="+", default=["ctc"], choices=["ctc", "rnnt"],
+                        help="AI4Bharat decoding strategies")
+    parser.add_argument("--batch-sizes", nargs="+", type=int, default=[1, 8], help="Chunks decoded per forward pass")
+    parser.add_argument("--vad", nargs="+", default=["on"], choices=["on", "off"],
+                        help="VAD-placed chunk boundaries (off: fixed 30 s chunks)")
+    parser.add_argument("--language", help="Language of every file (default: detected per file with Whisper LID)")
+    parser.add_argument("--out", help="Write the JSON report here")
+    args = parser.parse_args()
+
+    dataset = load_dataset(args.data)
+    if not dataset:
+        print(f"❌ No audio files found in {args.data}")
+        sys.exit(1)
+    print(f"🎧 {len(dataset)} file(s), {sum(s['audio'].duration for s in dataset):.1f}s of audio, "
+          f"{sum(1 for s in dataset if s['reference'])} with references")
+
+    # Detect once so every configuration decodes the same language
+    if args.language:
+        languages = {s["path"]: args.language for s in dataset}
+    else:
+        identifier = get_language_identifier("whisper")
+        languages = {s["path"]: identifier.detect(s["audio"])[0] or "en" for s in dataset}
+
+    runs = [run_config(config, dataset, languages) for config in build_configs(args)]
+    model_manager.unload(lambda key: True)
+
+    output = json.dumps({
+        "environment": {
+            "device": torch.cuda.get_device_name(0) if torch.cuda.is_available() else "cpu",
+            "cpu_count": os.cpu_count(),
+            "torch": torch.__version__,
+            "python": platform.python_version(),
+            "platform": platform.platform(),
+        },
+        "dataset": {
+            "path": args.data,
+            "files": len(dataset),
+            "audio_seconds": round(sum(s["audio"].duration for s in dataset), 2),
+        },
+        "runs": runs,
+    }, indent=2, ensure_ascii=False)
+    print(output)
+    if args.out:
+        with open(args.out, "w", encoding="utf-8") as f:
+            f.write(output)
+        print(f"💾 Saved to: {args.out}")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,166 @@
+#!/usr/bin/env python3
+"""
+Int8 CPU mode: speed and accuracy deltas per backend
+Runs every ASR, LID and MT backend on the sample set twice on CPU, first in fp32
+(CPU_QUANTIZATION=none) and then in int8, and reports per backend:
+- load and inference time in both modes and the int8 speedup
+- agreement: WER of the int8 output against the fp32 output (ASR/MT), top-language
+  agreement (LID), and WER against reference transcripts when <audio>.txt exists
+
+Usage:
+    python benchmark_quantization.py --samples samples --out quantization_report.json
+"""
+
+import os
+
+# The int8 mode targets CPU-only replicas
+os.environ.setdefault("CUDA_VISIBLE_DEVICES", "")
+
+import sys
+import json
+import time
+import argparse
+
+from jiwer import wer
+
+from model_manager import model_manager, set_cpu_quantization
+from asr_pipeline import transcribe_in_chunks, LID2INDICTRANS
+from lid import get_language_identifier
+from mt import translate_nllb, translate_indictrans
+from benchmark_asr import load_dataset
+
+MODES = ("none", "int8")
+
+DEFAULT_MT_SENTENCES = [
+    "The weather is pleasant today and the market is crowded.",
+    "Please send me the report before the meeting tomorrow morning.",
+    "Trains to the city are running late because of heavy rain.",
+    "She has been learning to play the violin for three years.",
+    "The government announced new measures to support farmers.",
+]
+
+def pair_wer(references, hypotheses):
+    """WER over the pairs with a non-empty reference (jiwer rejects empty ones); None when none are left."""
+    pairs = [(r, h) for r, h in zip(references, hypotheses) if r and r.strip()]
+    if not pairs:
+        return None
+    return round(wer([r for r, _ in pairs], [h for _, h in pairs]), 4)
+
+def run_mode(mode, fn):
+    """Run fn() with the given CPU quantization; returns (outputs, load_s, infer_s) and unloads the models."""
+    set_cpu_quantization(mode)
+    model_manager.unload(lambda key: True)
+    before = model_manager.stats()["load_seconds"]
+    started = time.perf_counter()
+    outputs = fn()
+    total = time.perf_counter() - started
+    after = model_manager.stats()["load_seconds"]
+    # Only loads made during this run count (keys loaded again replace their earlier timing)
+    load = sum(v for k, v in after.items() if before.get(k) != v)
+    model_manager.unload(lambda key: True)
+    return outputs, round(load, 3), round(max(total - load, 0.0), 3)
+
+def compare(name, fp32, int8, extra):
+    (out32, load32, t32), (out8, load8, t8) = fp32, int8
+    report = {
+        "backend": name,
+        "fp32": {"load_seconds": load32, "seconds": t32},
+        "int8": {"load_seconds": load8, "seconds": t8},
+        "speedup": round(t32 / t8, 2) if t8 else None,
+    }
+    report.update(extra(out32, out8))
+    print(f"📊 {name}: fp32 {t32:.2f}s → int8 {t8:.2f}s (x{report['speedup']})")
+    return report
+
+def bench_asr(samples, model_name, size, languages):
+    def fn():
+        return [transcribe_in_chunks(s["audio"], model_name, languages[s["path"]], size, "ctc") for s in samples]
+
+    def extra(out32, out8):
+        references = [s["reference"] for s in samples]
+        result = {"wer_int8_vs_fp32": pair_wer(out32, out8)}
+        if any(references):
+            result["wer_fp32"] = pair_wer(references, out32)
+            result["wer_int8"] = pair_wer(references, out8)
+        duration = sum(s["audio"].duration for s in samples)
+        result["audio_seconds"] = round(duration, 2)
+        return result
+
+    results = [run_mode(mode, fn) for mode in MODES]
+    report = compare(f"asr/{model_name}/{size}", *results, extra)
+    duration = report["audio_seconds"]
+    for mode in ("fp32", "int8"):
+        report[mode]["rtf"] = round(report[mode]["seconds"] / duration, 4) if duration else None
+    return report
+
+def bench_lid(samples, lid_model):
+    def fn():
+        return [get_language_identifier(lid_model).detect(s["audio"]) for s in samples]
+
+    def extra(out32, out8):
+        same = sum(1 for a, b in zip(out32, out8) if a[0] == b[0])
+        deltas = [abs(a[1].get(a[0], 0.0) - b[1].get(a[0], 0.0)) for a, b in zip(out32, out8) if a[0]]
+        return {
+            "top_language_agreement": round(same / len(samples), 4) if samples else None,
+            "mean_probability_delta": round(sum(deltas) / len(deltas), 4) if deltas else None,
+        }
+
+    return compare(f"lid/{lid_model}", *[run_mode(mode, fn) for mode in MODES], extra)
+
+def bench_mt(name, translate, sentences, src, tgt):
+    def fn():
+        return translate(sentences, src, tgt)
+
+    def extra(out32, out8):
+        return {"wer_int8_vs_fp32": pair_wer(out32, out8), "sentences": len(sentences)}
+
+    return compare(f"mt/{name}/{src}-{tgt}", *[run_mode(mode, fn) for mode in MODES], extra)
+
+def main():
+    parser = argparse.ArgumentParser(description="Measure int8 vs fp32 CPU speed and accuracy per backend")
+    parser.add_argument("--samples", default="samples", help="Directory of audio files (optional <name>.txt references)")
+    parser.add_argument("--asr", nargs="*", default=["whisper:small", "faster_whisper:small", "ai4bharat"],
+                        help="ASR backends as model[:size]")
+    parser.add_argument("--lid", nargs="*", default=["whisper", "mms"], help="LID backends")
+    parser.add_argument("--mt", nargs="*", default=["nllb", "indictrans"], help="MT backends")
+    parser.add_argument("--mt-file", help="Source sentences for MT, one per line (default: built-in English set)")
+    parser.add_argument("--mt-target", default="hi", help="MT target language")
+    parser.add_argument("--out", help="Write the JSON report here")
+    args = parser.parse_args()
+
+    samples = load_dataset(args.samples)
+    if not samples and (args.asr or args.lid):
+        print(f"❌ No audio files found in {args.samples}")
+        sys.exit(1)
+    print(f"🎧 {len(samples)} sample(s) from {args.samples}")
+
+    reports = []
+    # Reference languages come from fp32 Whisper LID so every ASR backend decodes the same language
+    set_cpu_quantization("none")
+    languages = {s["path"]: get_language_identifier("whisper").detect(s["audio"])[0] for s in samples}
+
+    for spec in args.lid:
+        reports.append(bench_lid(samples, spec))
+    for spec in args.asr:
+        model_name, _, size = spec.partition(":")
+        reports.append(bench_asr(samples, model_name, size or "small", languages))
+
+    if args.mt_file:
+        with open(args.mt_file, encoding="utf-8") as f:
+            sentences = [line.strip() for line in f if line.strip()]
+    else:
+        sentences = DEFAULT_MT_SENTENCES
+    translators = {"nllb": translate_nllb, "indictrans": translate_indictrans}
+    tgt = LID2INDICTRANS.get(args.mt_target, args.mt_target)
+    for name in args.mt:
+        reports.append(bench_mt(name, translators[name], sentences, "eng_Latn", tgt))
+
+    output = json.dumps({"samples": len(samples), "backends": reports}, indent=2, ensure_ascii=False)
+    print(output)
+    if args.out:
+        with open(args.out, "w", encoding="utf-8") as f:
+            f.write(output)
+        print(f"💾 Saved to: {args.out}")
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,115 @@
+import os
+import time
+import threading
+from concurrent.futures import ThreadPoolExecutor
+from typing import List
+
+import requests
+from requests.adapters import HTTPAdapter
+
+# Google Translate backend: one pooled HTTP session (keep-alive connections are reused
+# across sentences and requests), sentences packed into request-sized batches, batches
+# sent concurrently under a bounded semaphore, and throttled/failed requests retried with
+# exponential backoff. GOOGLE_TRANSLATE_URL can point at a local stand-in server for tests
+# and benchmarks (see test_google_translate.py).
+GOOGLE_TRANSLATE_URL = os.getenv("GOOGLE_TRANSLATE_URL", "https://translate.googleapis.com/translate_a/single")
+GOOGLE_TRANSLATE_CONCURRENCY = int(os.getenv("GOOGLE_TRANSLATE_CONCURRENCY", "8"))
+# Characters of source text per request (sentences are never split)
+GOOGLE_TRANSLATE_MAX_CHARS = int(os.getenv("GOOGLE_TRANSLATE_MAX_CHARS", "4500"))
+GOOGLE_TRANSLATE_RETRIES = int(os.getenv("GOOGLE_TRANSLATE_RETRIES", "4"))
+GOOGLE_TRANSLATE_BACKOFF_S = float(os.getenv("GOOGLE_TRANSLATE_BACKOFF_S", "0.5"))
+GOOGLE_TRANSLATE_TIMEOUT_S = float(os.getenv("GOOGLE_TRANSLATE_TIMEOUT_S", "10"))
+
+# Statuses worth retrying: throttling and transient server errors
+_RETRY_STATUSES = (429, 500, 502, 503, 504)
+
+_session = None
+_session_lock = threading.Lock()
+_semaphore = threading.BoundedSemaphore(GOOGLE_TRANSLATE_CONCURRENCY)
+_executor = ThreadPoolExecutor(max_workers=GOOGLE_TRANSLATE_CONCURRENCY, thread_name_prefix="google-mt")
+
+
+def _get_session():
+    global _session
+    with _session_lock:
+        if _session is None:
+            _session = requests.Session()
+            adapter = HTTPAdapter(pool_connections=4, pool_maxsize=GOOGLE_TRANSLATE_CONCURRENCY)
+            _session.mount("http://", adapter)
+            _session.mount("https://", adapter)
+        return _session
+
+
+def pack_sentences(sentences: List[str], max_chars: int = GOOGLE_TRANSLATE_MAX_CHARS,
+                   first_max_chars: int = None) -> List[List[int]]:
+    """
+    Indices of consecutive sentences packed into chunks of at most max_chars (one separator
+    counted per sentence; a longer sentence gets a chunk of its own). first_max_chars caps
+    the first chunk instead, so a first result can be streamed sooner. Also used by the
+    chunked and streaming MT paths in mt.py.
+    """
+    batches, cur, cur_len = [], [], 0
+    for i, s in enumerate(sentences):
+        limit = max_chars if batches or first_max_chars is None else first_max_chars
+        if cur and cur_len + len(s) + 1 > limit:
+            batches.append(cur)
+            cur, cur_len = [], 0
+        cur.append(i)
+        cur_len += len(s) + 1
+    if cur:
+        batches.append(cur)
+    return batches
+
+
+def _request(text: str, src: str, tgt: str) -> str:
+    """Translate one newline-joined batch, retrying throttled and transient failures."""
+    params = {"client": "gtx", "sl": src, "tl": tgt, "dt": "t"}
+    for attempt in range(GOOGLE_TRANSLATE_RETRIES + 1):
+        try:
+            with _semaphore:
+                response = _get_session().post(
+                    GOOGLE_TRANSLATE_URL, params=params, data={"q": text}, timeout=GOOGLE_TRANSLATE_TIMEOUT_S
+                )
+            if response.status_code not in _RETRY_STATUSES:
+                response.raise_for_status()
+                # [[["translated", "source", ...], ...], ...]: one entry per output segment
+                return "".join(part[0] for part in response.json()[0] if part and part[0])
+            error = f"HTTP {response.status_code}"
+            retry_after = response.headers.get("Retry-After")
+        except (requests.ConnectionError, requests.Timeout) as e:
+            error, retry_after = str(e), None
+        if attempt == GOOGLE_TRANSLATE_RETRIES:
+            raise RuntimeError(f"Google Translate failed after {attempt + 1} attempts: {error}")
+        delay = GOOGLE_TRANSLATE_BACKOFF_S * (2 ** attempt)
+        if retry_after and retry_after.isdigit():
+            delay = max(delay, float(retry_after))
+        print(f"⚠️ Google Translate {error}, retrying in {delay:.1f}s")
+        time.sleep(delay)
+
+
+def _translate_batch(sentences: List[str], src: str, tgt: str) -> List[str]:
+    lines = _request("\n".join(sentences), src, tgt).split("\n")
+    if len(lines) == len(sentences):
+        return [line.strip() for line in lines]
+    # Lines were merged or split in translation: fall back to one request per sentence
+    return [_request(s, src, tgt).strip() for s in sentences]
+
+
+def translate_sentences(sentences: List[str], src: str, tgt: str) -> List[str]:
+    """
+    Translate sentences (Google language codes), in input order. Batches run concurrently;
+    a batch that still fails after its retries keeps its source text, as before.
+    """
+    outputs = list(sentences)
+    batches = pack_sentences([s.replace("\n", " ") for s in sentences])
+    futures = {
+        _executor.submit(_translate_batch, [sentences[i].replace("\n", " ") for i in batch], src, tgt): batch
+        for batch in batches
+    }
+    for future, batch in futures.items():
+        try:
+            for i, translated in zip(batch, future.result()):
+                outputs[i] = translated
+        except Exception as e:
+            print(f"Google translate error: {e}")
+    return outputs
@@ -4,12 +4,28 @@ from parler_tts import ParlerTTSForConditionalGeneration
 from transformers import AutoTokenizer
 import os
 
+from model_manager import model_manager
+
 # Supported Indian Languages Auto Detected
 INDIC_LANGS = {
     "as", "bn", "brx", "doi", "en", "gu", "hi", "kn", "kok", "mai", "ml",
     "mni", "mr", "ne", "or", "sa", "sat", "sd", "ta", "te", "ur"
 }
 
+PARLER_MODEL_NAME = "ai4bharat/indic-parler-tts"
+
+# Tokenizers are cached here; the Parler-TTS weights are held by the model manager
+_tokenizers = {}
+
+def _get_tokenizer(name):
+    if name not in _tokenizers:
+        _tokenizers[name] = AutoTokenizer.from_pretrained(name)
+    return _tokenizers[name]
+
+def _load_parler_model(device):
+    print("🎙️ Loading Indic Parler-TTS...")
+    return ParlerTTSForConditionalGeneration.from_pretrained(PARLER_MODEL_NAME).to(device)
+
 def run_indic_tts(text, description=None, out_dir="tts_output", out_name="indic_tts.wav"):
     """
     Use Indic Parler-TTS (HuggingFace, AI4Bharat)
@@ -18,10 +34,12 @@ def run_indic_tts(text, description=None, out_dir="tts_output", out_name="indic_
     os.makedirs(out_dir, exist_ok=True)
     device = "cuda" if torch.cuda.is_available() else "cpu"
 
-    print("🎙️ Loading Indic Parler-TTS...")
-    model = ParlerTTSForConditionalGeneration.from_pretrained("ai4bharat/indic-parler-tts").to(device)
-    tokenizer = AutoTokenizer.from_pretrained("ai4bharat/indic-parler-tts")
-    description_tokenizer = AutoTokenizer.from_pretrained(model.config.text_encoder._name_or_path)
+    with model_manager.use(("indic_parler_tts", PARLER_MODEL_NAME), _load_parler_model, device) as model:
+        return _generate(model, text, description, device, out_dir, out_name)
+
+def _generate(model, text, description, device, out_dir, out_name):
+    tokenizer = _get_tokenizer(PARLER_MODEL_NAME)
+    description_tokenizer = _get_tokenizer(model.config.text_encoder._name_or_path)
 
     if description is None:
         description = "A neutral Indian speaker with moderate pitch and speed, clear and high-quality voice."
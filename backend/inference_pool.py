@@ -0,0 +1,241 @@
+import os
+import time
+import asyncio
+import threading
+from collections import deque
+from concurrent.futures import ThreadPoolExecutor
+
+import anyio
+from fastapi import HTTPException
+
+# Bounded per-capability worker pools for blocking model inference, so the async
+# endpoints never run ASR/MT/TTS/OCR on the event loop. Each pool limits both
+# concurrency (workers) and how many requests may wait for a worker (queue);
+# beyond that, requests are rejected with 429, and waiting too long yields 503.
+
+INFERENCE_QUEUE_TIMEOUT = float(os.getenv("INFERENCE_QUEUE_TIMEOUT", "300"))
+
+# name -> (workers, queue) defaults; override with INFERENCE_<NAME>_WORKERS / INFERENCE_<NAME>_QUEUE
+POOL_DEFAULTS = {
+    "asr": (1, 8),
+    "mt": (2, 32),
+    "tts": (1, 8),
+    "ocr": (1, 8),
+}
+
+
+class PoolSaturated(HTTPException):
+    """Raised when a pool's queue is full (HTTP 429)."""
+
+    def __init__(self, name):
+        super().__init__(
+            status_code=429,
+            detail=f"The {name} service is busy, please retry shortly",
+            headers={"Retry-After": "5"},
+        )
+
+
+class PoolTimeout(HTTPException):
+    """Raised when a request waited longer than the queue timeout for a worker (HTTP 503)."""
+
+    def __init__(self, name):
+        super().__init__(
+            status_code=503,
+            detail=f"Timed out waiting for a free {name} worker",
+            headers={"Retry-After": "30"},
+        )
+
+
+class _Timings:
+    """Count / total / max plus a rolling window for percentiles (seconds)."""
+
+    def __init__(self, window=256):
+        self.count = 0
+        self.total = 0.0
+        self.max = 0.0
+        self.recent = deque(maxlen=window)
+
+    def add(self, seconds):
+        self.count += 1
+        self.total += seconds
+        self.max = max(self.max, seconds)
+        self.recent.append(seconds)
+
+    def summary(self):
+        recent = sorted(self.recent)
+
+        def pct(p):
+            return round(recent[min(len(recent) - 1, int(p * len(recent)))] * 1000, 1) if recent else 0.0
+
+        return {
+            "count": self.count,
+            "avg_ms": round(self.total / self.count * 1000, 1) if self.count else 0.0,
+            "p50_ms": pct(0.50),
+            "p95_ms": pct(0.95),
+            "max_ms": round(self.max * 1000, 1),
+        }
+
+
+class InferencePool:
+    def __init__(self, name, max_workers, max_queue, queue_timeout=INFERENCE_QUEUE_TIMEOUT):
+        self.name = name
+        self.max_workers = max_workers
+        self.max_queue = max_queue
+        self.queue_timeout = queue_timeout
+        self._executor = ThreadPoolExecutor(max_workers=max_workers, thread_name_prefix=f"{name}-inference")
+        self._slots = None
+        self._lock = threading.Lock()
+        self._waiting = 0
+        self._running = 0
+        self._rejected = 0
+        self._timed_out = 0
+        self._failed = 0
+        self._queue_wait = _Timings()
+        self._execution = _Timings()
+
+    async def run(self, fn, *args, **kwargs):
+        """Run fn(*args, **kwargs) on this pool's workers, applying backpressure."""
+        with self._lock:
+            if self._waiting + self._running >= self.max_workers + self.max_queue:
+                self._rejected += 1
+                raise PoolSaturated(self.name)
+            self._waiting += 1
+
+        loop = asyncio.get_running_loop()
+        enqueued = time.perf_counter()
+        try:
+            await asyncio.wait_for(self._acquire(), timeout=self.queue_timeout)
+        except asyncio.TimeoutError:
+            with self._lock:
+                self._timed_out += 1
+            raise PoolTimeout(self.name)
+        finally:
+            with self._lock:
+                self._waiting -= 1
+        self._started(enqueued)
+
+        def _release_if_cancelled(future):
+            # Cancelled before a worker picked it up: _execute never runs, so free the slot here
+            if future.cancelled():
+                with self._lock:
+                    self._running -= 1
+                loop.call_soon_threadsafe(self._slots.release)
+
+        future = self._executor.submit(self._execute, loop, fn, args, kwargs)
+        future.add_done_callback(_release_if_cancelled)
+        return await asyncio.wrap_future(future)
+
+    def run_blocking(self, loop, fn, *args, **kwargs):
+        """
+        Run fn on the calling thread once one of this pool's slots is free, for threads
+        outside the event loop (background job workers). Jobs share the workers limit
+        with requests but are never rejected or timed out: they wait for their turn.
+        """
+        with self._lock:
+            self._waiting += 1
+        enqueued = time.perf_counter()
+        try:
+            asyncio.run_coroutine_threadsafe(self._acquire(), loop).result()
+        finally:
+            with self._lock:
+                self._waiting -= 1
+        self._started(enqueued)
+        return self._execute(loop, fn, args, kwargs)
+
+    async def _acquire(self):
+        # asyncio.Semaphore guarding the workers, created inside the event loop on first use
+        if self._slots is None:
+            self._slots = asyncio.Semaphore(self.max_workers)
+        await self._slots.acquire()
+
+    def _started(self, enqueued):
+        with self._lock:
+            self._running += 1
+            self._queue_wait.add(time.perf_counter() - enqueued)
+
+    def _execute(self, loop, fn, args, kwargs):
+        started = time.perf_counter()
+        try:
+            return fn(*args, **kwargs)
+        except Exception:
+            with self._lock:
+                self._failed += 1
+            raise
+        finally:
+            # Release when the work really ends: a cancelled request must not free the
+            # slot while its inference is still running
+            with self._lock:
+                self._running -= 1
+                self._execution.add(time.perf_counter() - started)
+            loop.call_soon_threadsafe(self._slots.release)
+
+    def metrics(self):
+        with self._lock:
+            return {
+                "workers": self.max_workers,
+                "max_queue": self.max_queue,
+                "running": self._running,
+                "queued": self._waiting,
+                "rejected": self._rejected,
+                "timed_out": self._timed_out,
+                "failed": self._failed,
+                "queue_wait": self._queue_wait.summary(),
+                "execution": self._execution.summary(),
+            }
+
+
+_pools = {}
+_pools_lock = threading.Lock()
+
+
+def get_pool(name):
+    with _pools_lock:
+        if name not in _pools:
+            workers, queue = POOL_DEFAULTS.get(name, (1, 8))
+            workers = int(os.getenv(f"INFERENCE_{name.upper()}_WORKERS", workers))
+            queue = int(os.getenv(f"INFERENCE_{name.upper()}_QUEUE", queue))
+            _pools[name] = InferencePool(name, workers, queue)
+        return _pools[name]
+
+
+async def run_inference(name, fn, *args, **kwargs):
+    """Run blocking inference on the named capability pool ('asr', 'mt', 'tts', 'ocr')."""
+    return await get_pool(name).run(fn, *args, **kwargs)
+
+
+def run_inference_blocking(name, loop, fn, *args, **kwargs):
+    """Run blocking inference from a non-async thread within the named pool's limit; loop is the app's event loop."""
+    return get_pool(name).run_blocking(loop, fn, *args, **kwargs)
+
+
+async def iterate_in_pool(name, events):
+    """
+    Async iterator over a blocking generator: every next() runs on the named pool.
+    When the consumer stops early (e.g. the client disconnected), the step still in flight
+    is awaited and the generator is then closed on a worker thread. Closing it on the event
+    loop while next() runs raises "generator already executing" and skips its cleanup
+    (ffmpeg / yt-dlp subprocesses, temp files).
+    """
+    step = None
+    try:
+        while True:
+            step = asyncio.ensure_future(run_inference(name, next, events, None))
+            # Shielded so a cancelled consumer does not abandon a running next()
+            event = await asyncio.shield(step)
+            if event is None:
+                return
+            yield event
+    finally:
+        with anyio.CancelScope(shield=True):
+            if step is not None and not step.done():
+                try:
+                    await step
+                except Exception:
+                    pass  # Nobody is listening for this step's result any more
+            await asyncio.to_thread(events.close)
+
+
+def get_inference_metrics():
+    with _pools_lock:
+        pools = dict(_pools)
+    return {name: pool.metrics() for name, pool in pools.items()}
@@ -0,0 +1,164 @@
+import os
+import json
+import time
+import uuid
+import sqlite3
+import threading
+
+# Durable background jobs for long ASR/YouTube/TTS work. Jobs live in a local SQLite
+# queue, so submitted work and finished results survive a process restart; clients
+# poll GET /jobs/{id} or subscribe to its server-sent events for progress.
+
+JOBS_DIR = os.getenv("JOBS_DIR", "jobs")
+JOBS_WORKERS = int(os.getenv("JOBS_WORKERS", "1"))
+# Finished jobs are kept this long before being purged (uploads are deleted when a job ends)
+JOBS_RETENTION_HOURS = float(os.getenv("JOBS_RETENTION_HOURS", "72"))
+# A job interrupted by this many restarts is failed instead of requeued (guards against crash loops)
+JOBS_MAX_ATTEMPTS = int(os.getenv("JOBS_MAX_ATTEMPTS", "3"))
+
+QUEUED, RUNNING, SUCCEEDED, FAILED = "queued", "running", "succeeded", "failed"
+TERMINAL_STATES = (SUCCEEDED, FAILED)
+
+
+class JobQueue:
+    def __init__(self, directory=JOBS_DIR):
+        self.directory = directory
+        self.files_dir = os.path.join(directory, "files")
+        os.makedirs(self.files_dir, exist_ok=True)
+        self._handlers = {}
+        self._lock = threading.Lock()
+        self._wakeup = threading.Event()
+        self._workers = []
+        self._db = sqlite3.connect(os.path.join(directory, "jobs.db"), check_same_thread=False)
+        self._db.execute(
+            "CREATE TABLE IF NOT EXISTS jobs ("
+            " id TEXT PRIMARY KEY, kind TEXT NOT NULL, params TEXT NOT NULL,"
+            " status TEXT NOT NULL, stage TEXT, done INTEGER DEFAULT 0, total INTEGER DEFAULT 0,"
+            " result TEXT, error TEXT, attempts INTEGER DEFAULT 0,"
+            " created REAL NOT NULL, updated REAL NOT NULL)"
+        )
+        self._db.execute("CREATE INDEX IF NOT EXISTS jobs_status ON jobs (status, created)")
+        self._db.commit()
+
+    def register_handler(self, kind, fn):
+        """fn(params, progress) -> JSON-serialisable result; progress(stage, done, total)."""
+        self._handlers[kind] = fn
+
+    def upload_path(self, job_id, suffix):
+        """Where an uploaded input for job_id should be stored (kept until the job finishes)."""
+        return os.path.join(self.files_dir, f"{job_id}{suffix}")
+
+    def new_id(self):
+        return uuid.uuid4().hex
+
+    def submit(self, kind, params, job_id=None):
+        if kind not in self._handlers:
+            raise ValueError(f"Unknown job kind: {kind}")
+        job_id = job_id or self.new_id()
+        now = time.time()
+        with self._lock:
+            self._db.execute(
+                "INSERT INTO jobs (id, kind, params, status, created, updated) VALUES (?, ?, ?, ?, ?, ?)",
+                (job_id, kind, json.dumps(params), QUEUED, now, now),
+            )
+            self._db.commit()
+        self._wakeup.set()
+        return job_id
+
+    def get(self, job_id):
+        with self._lock:
+            row = self._db.execute(
+                "SELECT id, kind, status, stage, done, total, result, error, attempts, created, updated"
+                " FROM jobs WHERE id = ?",
+                (job_id,),
+            ).fetchone()
+        if row is None:
+            return None
+        keys = ("job_id", "kind", "status", "stage", "done", "total", "result", "error", "attempts", "created", "updated")
+        job = dict(zip(keys, row))
+        job["result"] = json.loads(job["result"]) if job["result"] else None
+        job["progress"] = round(job["done"] / job["total"], 4) if job["total"] else 0.0
+        return job
+
+    def _claim(self):
+        """Atomically move the oldest queued job to running."""
+        with self._lock:
+            row = self._db.execute(
+                "SELECT id, kind, params FROM jobs WHERE status = ? ORDER BY created LIMIT 1", (QUEUED,)
+            ).fetchone()
+            if row is None:
+                return None
+            self._db.execute(
+                "UPDATE jobs SET status = ?, attempts = attempts + 1, updated = ? WHERE id = ?",
+                (RUNNING, time.time(), row[0]),
+            )
+            self._db.commit()
+        return row[0], row[1], json.loads(row[2])
+
+    def _update(self, job_id, **fields):
+        fields["updated"] = time.time()
+        columns = ", ".join(f"{k} = ?" for k in fields)
+        with self._lock:
+            self._db.execute(f"UPDATE jobs SET {columns} WHERE id = ?", (*fields.values(), job_id))
+            self._db.commit()
+
+    def _run_one(self, job_id, kind, params):
+        last_total = 0
+
+        def progress(stage, done, total):
+            nonlocal last_total
+            last_total = int(total)
+            self._update(job_id, stage=stage, done=int(done), total=int(total))
+
+        try:
+            result = self._handlers[kind](params, progress)
+            # A finished job reports complete progress even if its last callback was partial
+            total = max(last_total, 1)
+            self._update(job_id, status=SUCCEEDED, done=total, total=total,
+                         result=json.dumps(result, ensure_ascii=False))
+        except Exception as e:
+            print(f"❌ Job {job_id} ({kind}) failed: {e}")
+            self._update(job_id, status=FAILED, error=str(e))
+        finally:
+            upload = params.get("upload_path")
+            if upload and os.path.exists(upload):
+                os.unlink(upload)
+
+    def _worker(self):
+        while True:
+            claimed = self._claim()
+            if claimed is None:
+                self._wakeup.wait(timeout=1.0)
+                self._wakeup.clear()
+                continue
+            self._run_one(*claimed)
+
+    def purge_expired(self):
+        cutoff = time.time() - JOBS_RETENTION_HOURS * 3600
+        with self._lock:
+            self._db.execute(
+                "DELETE FROM jobs WHERE status IN (?, ?) AND updated < ?", (SUCCEEDED, FAILED, cutoff)
+            )
+            self._db.commit()
+
+    def start(self, workers=JOBS_WORKERS):
+        """Requeue jobs interrupted by a restart and start the worker threads."""
+        if self._workers:
+            return
+        now = time.time()
+        with self._lock:
+            self._db.execute(
+                "UPDATE jobs SET status = ?, error = ?, updated = ? WHERE status = ? AND attempts >= ?",
+                (FAILED, "Interrupted by restarts too many times", now, RUNNING, JOBS_MAX_ATTEMPTS),
+            )
+            self._db.execute("UPDATE jobs SET status = ?, updated = ? WHERE status = ?", (QUEUED, now, RUNNING))
+            self._db.commit()
+        self.purge_expired()
+        for i in range(workers):
+            t = threading.Thread(target=self._worker, name=f"job-worker-{i}", daemon=True)
+            t.start()
+            self._workers.append(t)
+
+
+# Process-wide queue; handlers are registered by main.py
+job_queue = JobQueue()
@@ -1,8 +1,10 @@
+import os
+import threading
 import whisper
 import torch
+import numpy as np
 import torchaudio
 import tempfile
-import subprocess
 import yt_dlp
 import sounddevice as sd
 from scipy.io.wavfile import write
@@ -15,6 +17,19 @@ from transformers import (
 import fasttext
 from huggingface_hub import hf_hub_download
 
+from audio_buffer import SAMPLE_RATE, N_SAMPLES, as_audio_buffer
+from vad import pack_speech_chunks
+from model_manager import model_manager, cpu_int8, cpu_model_key, quantize_int8
+
+# Fast Whisper LID: encoder + detect_language on a few sampled speech windows instead of
+# a full transcription pass. Stops early once the top language reaches LID_CONFIDENCE.
+LID_FAST = os.getenv("LID_FAST", "1").lower() not in ("0", "false", "no")
+LID_MAX_WINDOWS = int(os.getenv("LID_MAX_WINDOWS", "3"))
+LID_CONFIDENCE = float(os.getenv("LID_CONFIDENCE", "0.8"))
+# Whisper size used for LID
+LID_MODEL_SIZE = os.getenv("LID_MODEL_SIZE", "small")
+MMS_LID_MODEL = "facebook/mms-lid-1024"
+
 # Load spaCy English large model for proper noun filtering
 nlp = spacy.load("en_core_web_lg")
 
@@ -64,34 +79,137 @@ TARGET_LANGS = {
     'id': 'Indonesian',
 }
 
+# Whisper's decoding installs kv-cache hooks on the model, so calls that share one set of
+# weights (LID and ASR) must not overlap. One lock per loaded model object.
+_whisper_locks = {}
+_whisper_locks_guard = threading.Lock()
+
+def whisper_lock(model):
+    with _whisper_locks_guard:
+        return _whisper_locks.setdefault(id(model), threading.Lock())
+
+def use_whisper_model(model_size, device=None):
+    """Hold the Whisper weights for model_size from the model manager (shared by LID and ASR)."""
+    device = device or ("cuda" if torch.cuda.is_available() else "cpu")
+    if cpu_int8(device):
+        # int8 CPU mode: Whisper's Linear subclass only casts dtypes, so it quantizes like nn.Linear
+        return model_manager.use(
+            cpu_model_key(("whisper", model_size), device),
+            lambda d: quantize_int8(whisper.load_model(model_size, device=d), (whisper.model.Linear,)),
+            device,
+            mover=None,
+        )
+    return model_manager.use(
+        ("whisper", model_size), lambda d: whisper.load_model(model_size, device=d), device
+    )
+
+
 class LanguageIdentifier:
-    def __init__(self, model_size="small", device=None, lid_model="whisper"):
+    def __init__(self, model_size="small", device=None, lid_model="whisper", fast=None):
         self.device = device or ("cuda" if torch.cuda.is_available() else "cpu")
         self.lid_model = lid_model
+        self.model_size = model_size
+        # Whisper only: sampled-window detection (default) vs. full transcription + spaCy filter
+        self.fast = LID_FAST if fast is None else fast
+        self._lock = threading.Lock()
+        # Weights live in the model manager; self.model is only set while detect() holds them
+        self.model = None
         if lid_model == "whisper":
-            self.model = whisper.load_model(model_size, device=self.device)
+            pass
         elif lid_model == "ai4bharat":
             # AI4Bharat does not support LID, fallback to Whisper or raise error
             raise NotImplementedError("AI4Bharat Indic Conformer does not support LID. Use Whisper for LID.")
         elif lid_model in ("facebook_mms", "mms"):
-            # Load Facebook MMS LID model (classification head)
-            model_id = "facebook/mms-lid-1024"
-            self.processor = AutoFeatureExtractor.from_pretrained(model_id)
-            self.model = Wav2Vec2ForSequenceClassification.from_pretrained(model_id)
-            self.model.to(self.device)
+            # Facebook MMS LID model (classification head); the feature extractor is small and kept here
+            self.processor = AutoFeatureExtractor.from_pretrained(MMS_LID_MODEL)
         # Note: facebook/mms-1b-all support removed — keep Whisper and facebook/mms-lid-1024
         else:
             raise ValueError("Unsupported LID model")
 
+    def _use_model(self):
+        if self.lid_model == "whisper":
+            return use_whisper_model(self.model_size, self.device)
+        if cpu_int8(self.device):
+            return model_manager.use(
+                cpu_model_key(("mms_lid", MMS_LID_MODEL), self.device),
+                lambda d: quantize_int8(Wav2Vec2ForSequenceClassification.from_pretrained(MMS_LID_MODEL)),
+                self.device,
+                mover=None,
+            )
+        return model_manager.use(
+            ("mms_lid", MMS_LID_MODEL),
+            lambda d: Wav2Vec2ForSequenceClassification.from_pretrained(MMS_LID_MODEL).to(d),
+            self.device,
+        )
+
+    def warm(self):
+        """Load the weights into the model manager ahead of the first request."""
+        with self._use_model():
+            pass
+
     def filter_proper_nouns(self, text):
         doc = nlp(text)
         tokens = [token.text for token in doc if token.pos_ != "PROPN"]
         return " ".join(tokens)
 
-    def detect(self, audio_path):
+    def _speech_windows(self, audio, max_windows):
+        """Up to max_windows speech windows (≤30 s each), spread evenly over the recording."""
+        spans = pack_speech_chunks(audio.samples, audio.speech_regions()) or [(0, min(len(audio), N_SAMPLES))]
+        picks = np.unique(np.linspace(0, len(spans) - 1, num=min(max_windows, len(spans))).round().astype(int))
+        return [spans[i] for i in picks]
+
+    def detect_whisper_fast(self, audio, max_windows=None, confidence=None):
+        """
+        Whisper LID without transcribing: run the encoder + detect_language on sampled speech
+        windows, average their probabilities (weighted by speech length) and exit early
+        once the leading supported language passes the confidence threshold.
+        """
+        audio = as_audio_buffer(audio)
+        max_windows = max_windows or LID_MAX_WINDOWS
+        confidence = LID_CONFIDENCE if confidence is None else confidence
+        n_mels = self.model.dims.n_mels
+
+        totals, weight = {}, 0.0
+        filtered_probs = {}
+        for i, (start, end) in enumerate(self._speech_windows(audio, max_windows), 1):
+            mel = audio.mel_window(start, end, n_mels=n_mels).to(self.model.device)
+            _, probs = self.model.detect_language(mel)
+            w = (end - start) / SAMPLE_RATE
+            for lang, prob in probs.items():
+                totals[lang] = totals.get(lang, 0.0) + w * prob
+            weight += w
+
+            filtered_probs = {lang: p / weight for lang, p in totals.items() if lang in TARGET_LANGS}
+            if filtered_probs and max(filtered_probs.values()) >= confidence:
+                print(f"⚡ Whisper LID confident after {i} window(s)")
+                break
+
+        if not filtered_probs:
+            print("⚠️ Could not find any supported language in detected results.")
+            return None, {}
+
+        filtered_probs = dict(sorted(filtered_probs.items(), key=lambda kv: kv[1], reverse=True))
+        detected_lang = next(iter(filtered_probs))
+        return detected_lang, filtered_probs
+
+    def detect(self, audio):
+        """Detect the spoken language of a file path, 16 kHz array or AudioBuffer (decoded once)."""
+        audio = as_audio_buffer(audio)
+        # Instances are shared process-wide (see get_language_identifier); Whisper weights are
+        # also shared with ASR, so decoding is serialised per loaded model
+        with self._use_model() as model, self._lock, whisper_lock(model):
+            self.model = model
+            try:
+                return self._detect(audio)
+            finally:
+                self.model = None
+
+    def _detect(self, audio):
+        if self.lid_model == "whisper" and self.fast:
+            return self.detect_whisper_fast(audio)
         if self.lid_model == "whisper":
             # Step 1: Transcribe audio to get raw text
-            result = self.model.transcribe(audio_path, task="transcribe", language=None)
+            result = self.model.transcribe(audio.samples, task="transcribe", language=None)
             raw_text = result["text"].strip()
 
             if not raw_text:
@@ -108,10 +226,8 @@ class LanguageIdentifier:
             else:
                 text_for_detection = filtered_text
 
-            # Step 4: Load and prepare audio for language detection
-            audio = whisper.load_audio(audio_path)
-            audio = whisper.pad_or_trim(audio)
-            mel = whisper.log_mel_spectrogram(audio).to(self.model.device)
+            # Step 4: First 30 s window from the buffer's cached log-mel (shared with Whisper ASR)
+            mel = audio.mel_window(0, N_SAMPLES, n_mels=self.model.dims.n_mels).to(self.model.device)
 
             # Step 5: Detect language using Whisper
             _, probs = self.model.detect_language(mel)
@@ -127,12 +243,7 @@ class LanguageIdentifier:
             return detected_lang, filtered_probs
         elif self.lid_model == "ai4bharat":
             # Example: AI4Bharat LID (pseudo-code, adjust as per actual API)
-            wav, sr = torchaudio.load(audio_path)
-            wav = torch.mean(wav, dim=0, keepdim=True)
-            target_sr = 16000
-            if sr != target_sr:
-                resampler = torchaudio.transforms.Resample(orig_freq=sr, new_freq=target_sr)
-                wav = resampler(wav)
+            wav = torch.from_numpy(audio.samples).unsqueeze(0)
             # The actual AI4Bharat model may have a method for LID, e.g.:
             lid_result = self.model.detect_language(wav)
             # lid_result should be a dict: {lang_code: probability}
@@ -143,15 +254,11 @@ class LanguageIdentifier:
             detected_lang = max(filtered_probs, key=filtered_probs.get)
             return detected_lang, filtered_probs
         elif self.lid_model in ("facebook_mms", "mms"):
-            # Load waveform
-            wav, sr = torchaudio.load(audio_path)
-            # Convert to mono
-            if wav.shape[0] > 1:
-                wav = torch.mean(wav, dim=0, keepdim=True)
-            wav = wav.squeeze().cpu().numpy()
+            # Decoded waveform is already mono at SAMPLE_RATE
+            wav, sr = audio.samples, SAMPLE_RATE
 
             # Resample to processor expected sample rate if needed
-            target_sr = getattr(self.processor, "sampling_rate", 16000)
+            target_sr = getattr(self.processor, "sampling_rate", SAMPLE_RATE)
             if sr != target_sr:
                 resampler = torchaudio.transforms.Resample(orig_freq=sr, new_freq=target_sr)
                 wav_tensor = torch.from_numpy(wav).unsqueeze(0)
@@ -214,20 +321,38 @@ class LanguageIdentifier:
         else:
             raise ValueError("Unsupported LID model")
 
-# --- Utility functions for audio sources ---
+# --------------------------------------------------
+# Process-wide LanguageIdentifier pool
+# --------------------------------------------------
+# One instance per (lid_model, model_size, device); the weights themselves are held by the
+# model manager, so Whisper LID and Whisper ASR of the same size share one copy
+_lid_pool = {}
+_lid_pool_lock = threading.Lock()
+
+def get_language_identifier(lid_model="whisper", model_size=None, device=None):
+    """Shared LanguageIdentifier for this configuration."""
+    model_size = model_size or LID_MODEL_SIZE
+    device = device or ("cuda" if torch.cuda.is_available() else "cpu")
+    key = (lid_model, model_size, device)
+    with _lid_pool_lock:
+        if key not in _lid_pool:
+            _lid_pool[key] = LanguageIdentifier(model_size=model_size, device=device, lid_model=lid_model)
+        return _lid_pool[key]
+
+def warm_language_identifiers(lid_models=("whisper",), model_size=None):
+    """Load LID models ahead of the first request (e.g. from the FastAPI startup hook)."""
+    for lid_model in lid_models:
+        try:
+            get_language_identifier(lid_model, model_size).warm()
+        except Exception as e:
+            print(f"⚠️ Could not warm {lid_model} LID model: {e}")
+
+def get_lid_pool_stats():
+    with _lid_pool_lock:
+        return {"identifiers": ["/".join(k) for k in _lid_pool]}
 
-def extract_audio_ffmpeg(video_path):
-    temp_audio = tempfile.mktemp(suffix=".wav")
-    cmd = [
-        "ffmpeg", "-y",
-        "-i", video_path,
-        "-ar", "16000",  # 16kHz sample rate
-        "-ac", "1",      # Mono
-        "-vn",           # No video
-        temp_audio
-    ]
-    subprocess.run(cmd, stdout=subprocess.DEVNULL, stderr=subprocess.DEVNULL)
-    return temp_audio
+
+# --- Utility functions for audio sources ---
 
 def download_youtube_audio(url):
     out_path = tempfile.mktemp(suffix=".wav")
@@ -241,8 +366,27 @@ def download_youtube_audio(url):
         'quiet': True
     }
     with yt_dlp.YoutubeDL(ydl_opts) as ydl:
-        ydl.download([url])
-    return out_path.replace('.wav', '.wav')
+        info = ydl.extract_info(url, download=True)
+    # Use the file yt-dlp actually wrote (after the WAV postprocessor), not the template guess
+    downloads = (info or {}).get("requested_downloads") or []
+    if downloads and downloads[0].get("filepath"):
+        return downloads[0]["filepath"]
+    return out_path
+
+def resolve_audio_stream(url):
+    """
+    Direct media URL (+ HTTP headers) of the best audio stream, without downloading it.
+    URLs yt-dlp cannot resolve (e.g. a plain media file on a local server) are used as-is.
+    """
+    ydl_opts = {'format': 'bestaudio/best', 'quiet': True, 'noplaylist': True}
+    try:
+        with yt_dlp.YoutubeDL(ydl_opts) as ydl:
+            info = ydl.extract_info(url, download=False)
+    except Exception as e:
+        print(f"⚠️ yt-dlp could not resolve {url} ({e}); streaming it directly")
+        return url, {}
+    stream_url = info.get("url") or (info.get("requested_formats") or [{}])[0].get("url") or url
+    return stream_url, info.get("http_headers") or {}
 
 def record_live_audio(duration=5, sample_rate=16000):
     print("🎤 Speak now...")
@@ -1,5 +1,5 @@
-from fastapi import FastAPI, Depends, HTTPException, status, Request, UploadFile, File, Form
-from fastapi.responses import JSONResponse, FileResponse
+from fastapi import FastAPI, Depends, HTTPException, status, Request, UploadFile, File, Form, WebSocket, WebSocketDisconnect
+from fastapi.responses import JSONResponse, FileResponse, StreamingResponse
 from fastapi.middleware.cors import CORSMiddleware
 from pydantic import BaseModel
 from pymongo import MongoClient
@@ -18,11 +18,26 @@ import requests
 import os
 import tempfile
 import shutil
-from asr_pipeline import run_asr_with_fallback
-from lid import TARGET_LANGS, detect_language_text
-from mt import translate_with_fallback
+import threading
+import asyncio
+import json
+import uuid
+from contextlib import aclosing
+from asr_pipeline import run_asr_with_fallback, get_fasterwhisper_stats, stream_youtube_transcription
+from asr_cache import transcription_cache
+from translation_cache import translation_cache
+from lid import TARGET_LANGS, detect_language_text, warm_language_identifiers, get_lid_pool_stats
+from mt import (
+    translate_with_fallback, translate_batch, iter_translate_text, indictrans_batcher, indictrans_stage_timings,
+    MT_BACKENDS, MT_BATCH_MAX_ITEMS,
+)
 from tts_handler import run_tts
 from ocr_pipeline import run_ocr
+from inference_pool import run_inference, run_inference_blocking, iterate_in_pool, get_inference_metrics
+from model_manager import model_manager
+from jobs import job_queue, TERMINAL_STATES
+from streaming_asr import StreamingTranscriber, STREAM_MODEL_SIZE, parse_control_message
+from speculative_asr import transcribe_speculative, SPECULATIVE_MODELS, SPECULATIVE_DRAFT_SIZE, SPECULATIVE_REFINE_SIZE
 
 load_dotenv()
 
@@ -92,6 +107,14 @@ def authenticate_user(username: str, password: str):
         return False
     return user
 
+# Optionally load LID models at startup (comma-separated, e.g. LID_WARMUP=whisper,mms)
+# so the first ASR request does not pay their load time
+@app.on_event("startup")
+async def warm_lid_models():
+    lid_models = [m.strip() for m in os.getenv("LID_WARMUP", "").split(",") if m.strip()]
+    if lid_models:
+        threading.Thread(target=warm_language_identifiers, args=(lid_models,), daemon=True).start()
+
 @app.get("/")
 async def root():
     return {"message": "Vasha AI Backend is running", "status": "ok"}
@@ -995,11 +1018,28 @@ async def mt_indictrans(payload: MTRequest):
         raise HTTPException(status_code=400, detail="'text' is required")
 
     try:
-        translated, used = translate_with_fallback(payload.text, payload.src_lang, payload.tgt_lang, primary=payload.primary)
+        translated, used = await run_inference(
+            "mt", translate_with_fallback, payload.text, payload.src_lang, payload.tgt_lang, primary=payload.primary
+        )
         return {"success": True, "translation": translated, "model_used": used}
+    except HTTPException:
+        raise
     except Exception as e:
         raise HTTPException(status_code=500, detail=f"MT failed: {e}")
 
+# Upload types accepted by the ASR endpoints (.webm for browser mic recordings)
+ALLOWED_AUDIO_EXTENSIONS = ['.wav', '.mp3', '.mp4', '.mkv', '.mov', '.avi', '.webm']
+
+def _validate_audio_upload(file):
+    """Extension of an uploaded audio/video file; 400 if it is not an allowed type."""
+    file_extension = os.path.splitext(file.filename or "")[1].lower()
+    if file_extension not in ALLOWED_AUDIO_EXTENSIONS:
+        raise HTTPException(
+            status_code=400,
+            detail=f"Unsupported file type. Allowed: {', '.join(ALLOWED_AUDIO_EXTENSIONS)}"
+        )
+    return file_extension
+
 @app.post("/asr/upload")
 async def process_audio_upload(
     file: UploadFile = File(...),
@@ -1010,18 +1050,11 @@ async def process_audio_upload(
 ):
     """
     Process audio file upload for ASR with automatic language detection
-    Supports: .wav, .mp3, .mp4, .mkv, .mov, .avi files
+    Supports: .wav, .mp3, .mp4, .mkv, .mov, .avi, .webm files
     """
     try:
-        # Validate file type (include .webm for browser mic recordings)
-        allowed_extensions = ['.wav', '.mp3', '.mp4', '.mkv', '.mov', '.avi', '.webm']
-        file_extension = os.path.splitext(file.filename)[1].lower()
-        
-        if file_extension not in allowed_extensions:
-            raise HTTPException(
-                status_code=400, 
-                detail=f"Unsupported file type. Allowed: {', '.join(allowed_extensions)}"
-            )
+        # Validate file type
+        file_extension = _validate_audio_upload(file)
         
         # Validate model
         valid_models = ["whisper", "faster_whisper", "ai4bharat"]
@@ -1038,30 +1071,12 @@ async def process_audio_upload(
             temp_file.write(content)
             temp_file.close()
 
-            # If uploaded file is .webm, convert to .wav before processing
-            input_path = temp_file.name
-            processed_path = input_path
-            try:
-                if file_extension == '.webm':
-                    import subprocess, tempfile as _tf
-                    wav_out = _tf.NamedTemporaryFile(delete=False, suffix='.wav')
-                    wav_out.close()
-                    # ffmpeg -y -i input.webm -ar 16000 -ac 1 output.wav
-                    subprocess.run([
-                        'ffmpeg', '-y',
-                        '-i', input_path,
-                        '-ar', '16000',
-                        '-ac', '1',
-                        wav_out.name
-                    ], stdout=subprocess.DEVNULL, stderr=subprocess.DEVNULL)
-                    processed_path = wav_out.name
-            except Exception:
-                # Fall through; ASR may still handle if backend supports webm
-                processed_path = input_path
-
+            # .webm (browser mic) is decoded by AudioBuffer's ffmpeg pipe like any other format
             # Process with ASR pipeline (language will be auto-detected)
-            result = run_asr_with_fallback(
-                audio_path=processed_path,
+            result = await run_inference(
+                "asr",
+                run_asr_with_fallback,
+                audio_path=temp_file.name,
                 asr_model=model,
                 whisper_size=whisper_size,
                 decoding=decoding,
@@ -1075,6 +1090,8 @@ async def process_audio_upload(
                     "language": result["language"],
                     "language_name": result["language_name"],
                     "model_used": result["model_used"],
+                    "segments": result.get("segments", []),
+                    "cached": result.get("cached", False),
                     "message": "Audio processed successfully"
                 }
             else:
@@ -1114,7 +1131,9 @@ async def process_youtube_audio(
             )
         
         # Process YouTube URL (language will be auto-detected)
-        result = run_asr_with_fallback(
+        result = await run_inference(
+            "asr",
+            run_asr_with_fallback,
             audio_path=None,
             youtube=youtube_url,
             asr_model=model,
@@ -1130,6 +1149,8 @@ async def process_youtube_audio(
                 "language": result["language"],
                 "language_name": result["language_name"],
                 "model_used": result["model_used"],
+                "segments": result.get("segments", []),
+                "cached": result.get("cached", False),
                 "message": "YouTube audio processed successfully"
             }
         else:
@@ -1143,6 +1164,82 @@ async def process_youtube_audio(
     except Exception as e:
         raise HTTPException(status_code=500, detail=f"Server error: {str(e)}")
 
+def ndjson_response(pool, events, cleanup=None):
+    """
+    Stream a blocking event generator as NDJSON, one step at a time on the given inference
+    pool. Failures become a final {"type": "error"} line; cleanup() runs once the stream ends.
+    """
+    async def ndjson():
+        try:
+            # aclosing: a disconnect while an event is being sent still closes the generator
+            async with aclosing(iterate_in_pool(pool, events)) as steps:
+                async for event in steps:
+                    yield json.dumps(event, ensure_ascii=False) + "\n"
+        except Exception as e:
+            detail = e.detail if isinstance(e, HTTPException) else str(e)
+            yield json.dumps({"type": "error", "error": detail}, ensure_ascii=False) + "\n"
+        finally:
+            if cleanup:
+                cleanup()
+
+    return StreamingResponse(ndjson(), media_type="application/x-ndjson")
+
+@app.post("/asr/youtube/stream")
+async def stream_youtube_audio(
+    youtube_url: str = Form(...),
+    model: str = Form("whisper"),
+    whisper_size: str = Form("large"),
+    decoding: str = Form("ctc"),
+    lid_model: str = Form("whisper")
+):
+    """
+    Transcribe a YouTube video while it downloads. Responds with NDJSON events:
+    'language', one 'segment' per ~30 s window, then 'done' (or 'error').
+    """
+    valid_models = ["whisper", "faster_whisper", "ai4bharat"]
+    if model not in valid_models:
+        raise HTTPException(
+            status_code=400,
+            detail=f"Invalid model. Valid models: {', '.join(valid_models)}"
+        )
+
+    events = stream_youtube_transcription(youtube_url, model, whisper_size, decoding, lid_model)
+    # Each step (download + decode of one window) runs on the ASR pool
+    return ndjson_response("asr", events)
+
+@app.post("/asr/speculative")
+async def speculative_audio_upload(
+    file: UploadFile = File(...),
+    model: str = Form("whisper"),
+    draft_size: str = Form(SPECULATIVE_DRAFT_SIZE),
+    refine_size: str = Form(SPECULATIVE_REFINE_SIZE),
+    language: str = Form(None),
+    lid_model: str = Form("whisper")
+):
+    """
+    Two-pass ASR for an uploaded file. Responds with NDJSON events: 'language', a 'draft'
+    from the small model, one 'correction' per chunk re-decoded by the large model, then
+    'done' (or 'error').
+    """
+    if model not in SPECULATIVE_MODELS:
+        raise HTTPException(
+            status_code=400,
+            detail=f"Invalid model. Valid models: {', '.join(SPECULATIVE_MODELS)}"
+        )
+
+    file_extension = _validate_audio_upload(file)
+    temp_file = tempfile.NamedTemporaryFile(delete=False, suffix=file_extension)
+    temp_file.write(await file.read())
+    temp_file.close()
+    events = transcribe_speculative(temp_file.name, model, language, draft_size, refine_size, lid_model)
+
+    def cleanup():
+        if os.path.exists(temp_file.name):
+            os.unlink(temp_file.name)
+
+    # Drafting and each refinement batch run on the ASR pool
+    return ndjson_response("asr", events, cleanup)
+
 @app.post("/asr/microphone")
 async def process_microphone_audio(
     duration: int = Form(5),
@@ -1171,7 +1268,9 @@ async def process_microphone_audio(
             )
         
         # Process microphone audio (language will be auto-detected)
-        result = run_asr_with_fallback(
+        result = await run_inference(
+            "asr",
+            run_asr_with_fallback,
             audio_path=None,
             mic=True,
             duration=duration,
@@ -1188,6 +1287,7 @@ async def process_microphone_audio(
                 "language": result["language"],
                 "language_name": result["language_name"],
                 "model_used": result["model_used"],
+                "segments": result.get("segments", []),
                 "message": "Microphone audio processed successfully"
             }
         else:
@@ -1201,6 +1301,243 @@ async def process_microphone_audio(
     except Exception as e:
         raise HTTPException(status_code=500, detail=f"Server error: {str(e)}")
 
+@app.websocket("/asr/stream")
+async def stream_microphone_audio(
+    websocket: WebSocket,
+    model: str = "whisper",
+    model_size: str = STREAM_MODEL_SIZE,
+    language: str = None,
+    format: str = "pcm",
+    sample_rate: int = 16000,
+    lid_model: str = "whisper"
+):
+    """
+    Real-time ASR for browser microphones.
+    Binary frames: 16-bit mono PCM (format=pcm, at sample_rate) or MediaRecorder Opus chunks
+    (format=opus). Send the text frame "stop" to finalize. The server sends JSON events:
+    'ready', 'language', 'partial' (may still change), 'final', then 'done' (or 'error').
+    """
+    await websocket.accept()
+    try:
+        transcriber = StreamingTranscriber(model, model_size, language, format, sample_rate, lid_model)
+    except ValueError as e:
+        await websocket.send_json({"type": "error", "error": str(e)})
+        await websocket.close(code=1003)
+        return
+
+    stopped = asyncio.Event()
+    client_gone = False
+
+    async def receive_audio():
+        nonlocal client_gone
+        try:
+            while True:
+                message = await websocket.receive()
+                if message["type"] == "websocket.disconnect":
+                    client_gone = True
+                    break
+                if message.get("bytes"):
+                    transcriber.write(message["bytes"])
+                elif message.get("text") and parse_control_message(message["text"]) == "stop":
+                    break
+        except (WebSocketDisconnect, BrokenPipeError):
+            client_gone = True
+        finally:
+            stopped.set()
+
+    receiver = asyncio.create_task(receive_audio())
+    try:
+        await websocket.send_json({"type": "ready", "model": model, "model_size": model_size})
+        while not stopped.is_set():
+            if not transcriber.ready():
+                try:
+                    await asyncio.wait_for(stopped.wait(), timeout=0.1)
+                except asyncio.TimeoutError:
+                    pass
+                continue
+            # Decoding runs on the ASR pool; audio keeps being buffered meanwhile
+            for event in await run_inference("asr", transcriber.step):
+                await websocket.send_json(event)
+        if not client_gone:
+            for event in await run_inference("asr", transcriber.finish):
+                await websocket.send_json(event)
+            await websocket.send_json({"type": "done"})
+            await websocket.close()
+    except WebSocketDisconnect:
+        pass
+    except Exception as e:
+        if not client_gone:
+            detail = e.detail if isinstance(e, HTTPException) else str(e)
+            try:
+                await websocket.send_json({"type": "error", "error": detail})
+                await websocket.close(code=1011)
+            except Exception:
+                pass
+    finally:
+        receiver.cancel()
+        transcriber.close()
+
+# ------------------------
+# Background jobs (long ASR / YouTube / TTS work)
+# ------------------------
+
+# The app's event loop, captured at startup: job workers are plain threads and reach the
+# inference pools through it, so jobs and requests share the same worker limits
+_job_loop = None
+
+def _asr_job(params, progress):
+    result = run_inference_blocking(
+        "asr",
+        _job_loop,
+        run_asr_with_fallback,
+        audio_path=params.get("upload_path"),
+        youtube=params.get("youtube_url"),
+        asr_model=params["model"],
+        whisper_size=params["whisper_size"],
+        decoding=params["decoding"],
+        lid_model=params["lid_model"],
+        progress_callback=progress,
+    )
+    if not result["success"]:
+        raise RuntimeError(result.get("error", "Unknown error"))
+    return {
+        "transcription": result["transcription"],
+        "language": result["language"],
+        "language_name": result["language_name"],
+        "model_used": result["model_used"],
+        "segments": result.get("segments", []),
+        "cached": result.get("cached", False),
+    }
+
+def _tts_job(params, progress):
+    progress("tts", 0, 1)
+    filename = run_inference_blocking(
+        "tts", _job_loop, _generate_tts_file, params["text"], params["lang_code"], params["model"]
+    )
+    progress("tts", 1, 1)
+    return {"audio_path": filename, "model_used": params["model"]}
+
+job_queue.register_handler("asr", _asr_job)
+job_queue.register_handler("tts", _tts_job)
+
+@app.on_event("startup")
+async def start_job_workers():
+    global _job_loop
+    _job_loop = asyncio.get_running_loop()
+    # Jobs left running by a previous process are requeued before workers start
+    job_queue.start()
+
+def _validate_asr_model(model):
+    valid_models = ["whisper", "faster_whisper", "ai4bharat"]
+    if model not in valid_models:
+        raise HTTPException(
+            status_code=400,
+            detail=f"Invalid model. Valid models: {', '.join(valid_models)}"
+        )
+
+def _store_upload(src, path):
+    with open(path, "wb") as out:
+        shutil.copyfileobj(src, out)
+
+@app.post("/jobs/asr/upload")
+async def submit_asr_upload_job(
+    file: UploadFile = File(...),
+    model: str = Form("whisper"),
+    whisper_size: str = Form("large"),
+    decoding: str = Form("ctc"),
+    lid_model: str = Form("whisper")
+):
+    """
+    Queue an uploaded file for ASR and return immediately with a job id.
+    Poll GET /jobs/{job_id} or subscribe to GET /jobs/{job_id}/events for progress.
+    """
+    file_extension = _validate_audio_upload(file)
+    _validate_asr_model(model)
+
+    # The upload is kept with the job (not in a temp file) so it survives a restart
+    job_id = job_queue.new_id()
+    upload_path = job_queue.upload_path(job_id, file_extension)
+    try:
+        await asyncio.to_thread(_store_upload, file.file, upload_path)
+        await asyncio.to_thread(job_queue.submit, "asr", {
+            "upload_path": upload_path,
+            "model": model,
+            "whisper_size": whisper_size,
+            "decoding": decoding,
+            "lid_model": lid_model,
+        }, job_id=job_id)
+    except Exception:
+        # The job was never queued, so no worker will delete its upload
+        if os.path.exists(upload_path):
+            os.unlink(upload_path)
+        raise
+    return {"success": True, "job_id": job_id, "status": "queued"}
+
+@app.post("/jobs/asr/youtube")
+async def submit_asr_youtube_job(
+    youtube_url: str = Form(...),
+    model: str = Form("whisper"),
+    whisper_size: str = Form("large"),
+    decoding: str = Form("ctc"),
+    lid_model: str = Form("whisper")
+):
+    """Queue a YouTube video for download + ASR and return immediately with a job id."""
+    _validate_asr_model(model)
+    job_id = await asyncio.to_thread(job_queue.submit, "asr", {
+        "youtube_url": youtube_url,
+        "model": model,
+        "whisper_size": whisper_size,
+        "decoding": decoding,
+        "lid_model": lid_model,
+    })
+    return {"success": True, "job_id": job_id, "status": "queued"}
+
+@app.post("/jobs/tts")
+async def submit_tts_job(payload: dict):
+    """Queue TTS generation (same body as /tts/generate) and return immediately with a job id."""
+    text = payload.get("text", "")
+    if not text:
+        raise HTTPException(status_code=400, detail="'text' is required")
+    job_id = await asyncio.to_thread(job_queue.submit, "tts", {
+        "text": text,
+        "lang_code": payload.get("lang_code", "eng_Latn"),
+        "model": payload.get("model", "auto"),
+    })
+    return {"success": True, "job_id": job_id, "status": "queued"}
+
+@app.get("/jobs/{job_id}")
+async def get_job(job_id: str):
+    """Job status, progress (stage, done/total chunks) and the result once finished"""
+    job = await asyncio.to_thread(job_queue.get, job_id)
+    if job is None:
+        raise HTTPException(status_code=404, detail="Job not found")
+    return job
+
+@app.get("/jobs/{job_id}/events")
+async def stream_job_events(job_id: str):
+    """Server-sent events: one 'progress' event per change, then 'succeeded' or 'failed'."""
+    if await asyncio.to_thread(job_queue.get, job_id) is None:
+        raise HTTPException(status_code=404, detail="Job not found")
+
+    async def events():
+        last = None
+        while True:
+            # SQLite reads block (and wait on the queue lock), so keep them off the event loop
+            job = await asyncio.to_thread(job_queue.get, job_id)
+            if job is None:
+                break
+            snapshot = (job["status"], job["stage"], job["done"], job["total"])
+            terminal = job["status"] in TERMINAL_STATES
+            if snapshot != last:
+                last = snapshot
+                event = job["status"] if terminal else "progress"
+                yield f"event: {event}\ndata: {json.dumps(job, ensure_ascii=False)}\n\n"
+            if terminal:
+                break
+            await asyncio.sleep(0.5)
+
+    return StreamingResponse(events(), media_type="text/event-stream", headers={"Cache-Control": "no-cache"})
+
 @app.get("/asr/models")
 async def get_available_models():
     """Get list of available ASR models"""
@@ -1229,6 +1566,34 @@ async def get_available_models():
         "message": "Available models retrieved successfully"
     }
 
+@app.get("/asr/stats")
+async def get_asr_stats():
+    """Model registry counters (cache hits/misses, load times) for diagnosing cold starts"""
+    return {
+        "faster_whisper": get_fasterwhisper_stats(),
+        "lid": get_lid_pool_stats(),
+        "cache": transcription_cache.stats() if transcription_cache is not None else None,
+    }
+
+@app.get("/mt/stats")
+async def get_mt_stats():
+    """Translation memory counters, IndicTrans micro-batching stats and per-stage (pre/generate/post) timings"""
+    return {
+        "cache": translation_cache.stats() if translation_cache is not None else None,
+        "indictrans_batcher": indictrans_batcher.stats(),
+        "indictrans_stages": indictrans_stage_timings.stats(),
+    }
+
+@app.get("/metrics/models")
+async def model_metrics():
+    """Model residency: memory budgets and usage, resident models with device/size/in-use count, evictions"""
+    return model_manager.stats()
+
+@app.get("/metrics/inference")
+async def inference_metrics():
+    """Per-capability pool metrics: running/queued requests, rejections and queue wait vs execution time"""
+    return get_inference_metrics()
+
 # OCR Endpoint
 @app.post("/ocr")
 async def process_ocr(image: UploadFile = File(...)):
@@ -1247,13 +1612,17 @@ async def process_ocr(image: UploadFile = File(...)):
             temp_file_path = tmp_file.name
         
         # Run OCR
-        extracted_text = run_ocr(temp_file_path)
+        extracted_text = await run_inference("ocr", run_ocr, temp_file_path)
         
         # Clean up
         if os.path.exists(temp_file_path):
             os.remove(temp_file_path)
             
         return {"text": extracted_text}
+    except HTTPException:
+        if 'temp_file_path' in locals() and os.path.exists(temp_file_path):
+            os.remove(temp_file_path)
+        raise
     except Exception as e:
         # Clean up in case of error
         if 'temp_file_path' in locals() and os.path.exists(temp_file_path):
@@ -1271,7 +1640,9 @@ async def mt_translate(payload: dict):
     if not text or not tgt_lang:
         raise HTTPException(status_code=400, detail="'text' and 'tgt_lang' are required")
     try:
-        translated, model_used = translate_with_fallback(text, src_lang, tgt_lang, primary=model)
+        translated, model_used = await run_inference(
+            "mt", translate_with_fallback, text, src_lang, tgt_lang, primary=model
+        )
         return {
             "success": True,
             "text": text,
@@ -1280,10 +1651,127 @@ async def mt_translate(payload: dict):
             "tgt_lang": tgt_lang,
             "model_used": model_used,
         }
+    except HTTPException:
+        raise
     except Exception as e:
         raise HTTPException(status_code=500, detail=f"MT failed: {str(e)}")
 
+@app.post("/mt/translate/stream")
+async def mt_translate_stream(payload: dict):
+    """
+    Translate long text progressively. Same body as /mt/translate; responds with NDJSON:
+    one 'chunk' event per translated chunk ({"index", "start", "end", "translation",
+    "model_used"}, start/end are character offsets in the source text) as soon as it is
+    ready, then 'done' with the full translation (or 'error').
+    """
+    text = payload.get("text", "")
+    src_lang = payload.get("src_lang", "eng_Latn")
+    tgt_lang = payload.get("tgt_lang", "hin_Deva")
+    model = payload.get("model", "indictrans")  # 'google', 'indictrans', or 'nllb'
+    if not text or not tgt_lang:
+        raise HTTPException(status_code=400, detail="'text' and 'tgt_lang' are required")
+
+    def events():
+        chunks = iter_translate_text(text, src_lang, tgt_lang, model)
+        translations = []
+        try:
+            for chunk in chunks:
+                translations.append(chunk["translation"])
+                yield {"type": "chunk", **chunk}
+        finally:
+            chunks.close()
+        yield {
+            "type": "done",
+            "translation": " ".join(translations).strip(),
+            "src_lang": src_lang,
+            "tgt_lang": tgt_lang,
+            "chunks": len(translations),
+        }
+
+    # Each chunk is translated on the MT pool
+    return ndjson_response("mt", events())
+
+class MTBatchItem(BaseModel):
+    text: str
+    src_lang: str = "eng_Latn"
+    tgt_lang: str = "hin_Deva"
+    # None uses the request's model
+    model: str | None = None
+
+
+class MTBatchRequest(BaseModel):
+    items: list[MTBatchItem]
+    # 'indictrans', 'nllb' or 'google'
+    model: str = "indictrans"
+
+
+@app.post("/mt/batch")
+async def mt_batch(payload: MTBatchRequest):
+    """
+    Translate many documents in one request. Documents are grouped by (model, src, tgt),
+    identical sentences are translated once, and the response streams NDJSON: one 'group'
+    event (with {"index", "translation"} results) as each group finishes, then 'done' with
+    every translation in input order (or 'error').
+    """
+    if not payload.items:
+        raise HTTPException(status_code=400, detail="'items' is required")
+    if len(payload.items) > MT_BATCH_MAX_ITEMS:
+        raise HTTPException(status_code=400, detail=f"At most {MT_BATCH_MAX_ITEMS} items per batch")
+    for item in payload.items:
+        model = item.model or payload.model
+        if model != "auto" and model not in MT_BACKENDS:
+            raise HTTPException(
+                status_code=400,
+                detail=f"Invalid model '{model}'. Valid models: {', '.join(MT_BACKENDS)}"
+            )
+
+    events = translate_batch([item.model_dump() for item in payload.items], payload.model)
+    # Each group is translated on the MT pool
+    return ndjson_response("mt", events)
+
 # TTS Endpoint
+def _generate_tts_file(text, lang_code, model):
+    """Blocking TTS generation into tts_output/; returns the output filename."""
+    # Determine reference audio path for XTTS (Coqui)
+    reference_audio = None
+    if model == "xtts" or model == "auto":
+        # Use the sample voice from samples folder
+        # Try multiple possible paths
+        possible_paths = [
+            os.path.join("samples", "female_clip.wav"),
+            os.path.join("backend", "samples", "female_clip.wav"),
+            os.path.join(os.path.dirname(__file__), "samples", "female_clip.wav"),
+        ]
+        for sample_path in possible_paths:
+            if os.path.exists(sample_path):
+                reference_audio = sample_path
+                break
+
+    # Generate unique output filename
+    out_name = f"tts_{uuid.uuid4().hex[:8]}.wav"
+    if model == "gtts":
+        out_name = out_name.replace(".wav", ".mp3")
+
+    # Ensure output directory exists
+    os.makedirs("tts_output", exist_ok=True)
+
+    # Generate TTS
+    output_path = run_tts(
+        text=text,
+        lang_code=lang_code,
+        reference_audio=reference_audio,
+        out_dir="tts_output",
+        out_name=out_name,
+        prefer=model
+    )
+
+    # Check if file exists
+    if not os.path.exists(output_path):
+        raise RuntimeError("TTS generation failed - output file not created")
+
+    # Extract just the filename for the frontend
+    return os.path.basename(output_path)
+
 @app.post("/tts/generate")
 async def tts_generate(payload: dict):
     """Generate speech from text using selected TTS model."""
@@ -1295,46 +1783,7 @@ async def tts_generate(payload: dict):
         raise HTTPException(status_code=400, detail="'text' is required")
     
     try:
-        # Determine reference audio path for XTTS (Coqui)
-        reference_audio = None
-        if model == "xtts" or model == "auto":
-            # Use the sample voice from samples folder
-            # Try multiple possible paths
-            possible_paths = [
-                os.path.join("samples", "female_clip.wav"),
-                os.path.join("backend", "samples", "female_clip.wav"),
-                os.path.join(os.path.dirname(__file__), "samples", "female_clip.wav"),
-            ]
-            for sample_path in possible_paths:
-                if os.path.exists(sample_path):
-                    reference_audio = sample_path
-                    break
-        
-        # Generate unique output filename
-        import uuid
-        out_name = f"tts_{uuid.uuid4().hex[:8]}.wav"
-        if model == "gtts":
-            out_name = out_name.replace(".wav", ".mp3")
-        
-        # Ensure output directory exists
-        os.makedirs("tts_output", exist_ok=True)
-        
-        # Generate TTS
-        output_path = run_tts(
-            text=text,
-            lang_code=lang_code,
-            reference_audio=reference_audio,
-            out_dir="tts_output",
-            out_name=out_name,
-            prefer=model
-        )
-        
-        # Check if file exists
-        if not os.path.exists(output_path):
-            raise HTTPException(status_code=500, detail="TTS generation failed - output file not created")
-        
-        # Extract just the filename for the frontend
-        filename = os.path.basename(output_path)
+        filename = await run_inference("tts", _generate_tts_file, text, lang_code, model)
         
         # Return the filename (frontend will fetch it via /tts/audio/{filename})
         return {
@@ -1344,6 +1793,8 @@ async def tts_generate(payload: dict):
             "model_used": model
         }
         
+    except HTTPException:
+        raise
     except Exception as e:
         raise HTTPException(status_code=500, detail=f"TTS failed: {str(e)}")
 
@@ -0,0 +1,274 @@
+import gc
+import os
+import time
+import threading
+from contextlib import contextmanager
+
+import torch
+
+# Central residency manager for every model the backend loads (Whisper, Faster-Whisper,
+# IndicConformer, NLLB, IndicTrans2, XTTS, Parler-TTS, PaddleOCR, MMS LID). Models are
+# loaded on first use and kept resident within a VRAM and a RAM budget. When a budget
+# is exceeded, idle models are evicted least-recently-used first: GPU models that can
+# move are offloaded to CPU RAM, and everything else is unloaded. A model only counts as
+# idle when no request holds it (reference counted by use()), so it is never evicted
+# mid-inference.
+
+GB = 1024 ** 3
+
+
+def _default_vram_budget():
+    if not torch.cuda.is_available():
+        return 0
+    return int(torch.cuda.get_device_properties(0).total_memory * 0.9)
+
+
+# Budgets in GB; the VRAM default is 90% of the first GPU, 0 for RAM means unlimited
+MODEL_VRAM_BUDGET = int(float(os.getenv("MODEL_VRAM_BUDGET_GB", "0")) * GB) or _default_vram_budget()
+MODEL_RAM_BUDGET = int(float(os.getenv("MODEL_RAM_BUDGET_GB", "0")) * GB)
+# Offload evicted GPU models to RAM (faster to bring back) instead of unloading them
+MODEL_OFFLOAD_TO_CPU = os.getenv("MODEL_OFFLOAD_TO_CPU", "1").lower() not in ("0", "false", "no")
+# Quantization for models that run on CPU: "none" (fp32) or "int8"
+CPU_QUANTIZATION = os.getenv("CPU_QUANTIZATION", "none").lower()
+CPU_QUANTIZATION_MODES = ("none", "int8")
+
+
+def set_cpu_quantization(mode):
+    """Switch the CPU quantization mode at runtime (models are keyed by mode, so both can be resident)."""
+    global CPU_QUANTIZATION
+    if mode not in CPU_QUANTIZATION_MODES:
+        raise ValueError(f"CPU_QUANTIZATION must be one of {', '.join(CPU_QUANTIZATION_MODES)}")
+    CPU_QUANTIZATION = mode
+
+
+def cpu_int8(device):
+    """True when a model loaded on `device` should be quantized to int8."""
+    return CPU_QUANTIZATION == "int8" and _device_kind(device) == "cpu"
+
+
+def quantize_int8(model, linear_subclasses=()):
+    """
+    Dynamic int8 quantization for CPU: nn.Linear weights are stored as int8 and activations
+    are quantized on the fly. Quantized models cannot move to the GPU (load them with mover=None).
+    - linear_subclasses: nn.Linear subclasses that only override forward (e.g. Whisper's
+      dtype-casting Linear); they are treated as plain nn.Linear so they get quantized too.
+    """
+    model = model.float().eval()
+    if linear_subclasses:
+        for module in model.modules():
+            if isinstance(module, tuple(linear_subclasses)):
+                module.__class__ = torch.nn.Linear
+    return torch.quantization.quantize_dynamic(model, {torch.nn.Linear}, dtype=torch.qint8, inplace=True)
+
+
+def cpu_model_key(key, device):
+    """Model manager key under the active CPU quantization (int8 and fp32 copies are kept apart)."""
+    return (*key, "int8") if cpu_int8(device) else key
+
+
+def module_bytes(model):
+    """Bytes of a torch module's state (parameters, buffers and int8 packed weights); None for other objects."""
+    if not isinstance(model, torch.nn.Module):
+        return None
+    total = 0
+    for value in model.state_dict().values():
+        for t in value if isinstance(value, (tuple, list)) else (value,):
+            if torch.is_tensor(t):
+                total += t.numel() * t.element_size()
+    return total
+
+
+def move_module(model, device):
+    return model.to(device)
+
+
+def _device_kind(device):
+    return "cuda" if str(device).startswith("cuda") else "cpu"
+
+
+def _free_cuda_bytes():
+    if not torch.cuda.is_available():
+        return None
+    free, _ = torch.cuda.mem_get_info()
+    return free
+
+
+class _Entry:
+    def __init__(self, key, model, device, size, mover):
+        self.key = key
+        self.model = model
+        self.device = device
+        self.size = size
+        self.mover = mover
+        self.refs = 0
+        self.last_used = time.time()
+        self.uses = 0
+
+
+class ModelManager:
+    def __init__(self, vram_budget=MODEL_VRAM_BUDGET, ram_budget=MODEL_RAM_BUDGET, offload=MODEL_OFFLOAD_TO_CPU):
+        self.budgets = {"cuda": vram_budget, "cpu": ram_budget}
+        self.offload = offload
+        self._entries = {}
+        self._lock = threading.RLock()
+        self._key_locks = {}
+        self._known_sizes = {}
+        self._stats = {"hits": 0, "misses": 0, "offloads": 0, "unloads": 0, "load_seconds": {}}
+        # key[0] (model family, e.g. "faster_whisper") -> {"hits", "misses"}
+        self._family_stats = {}
+
+    def _key_lock(self, key):
+        with self._lock:
+            return self._key_locks.setdefault(key, threading.Lock())
+
+    def _family(self, key):
+        return self._family_stats.setdefault(str(key[0]), {"hits": 0, "misses": 0})
+
+    def _used(self, kind):
+        return sum(e.size for e in self._entries.values() if _device_kind(e.device) == kind)
+
+    def _unload(self, entry):
+        del self._entries[entry.key]
+        was_cuda = _device_kind(entry.device) == "cuda"
+        entry.model = None
+        self._stats["unloads"] += 1
+        gc.collect()
+        if was_cuda:
+            torch.cuda.empty_cache()
+        print(f"🧹 Unloaded {'/'.join(map(str, entry.key))}")
+
+    def _make_room(self, kind, needed):
+        """Evict idle models (LRU) until `needed` more bytes fit in the budget of `kind`."""
+        budget = self.budgets[kind]
+        if not budget:
+            return
+        idle = sorted(
+            (e for e in self._entries.values() if e.refs == 0 and _device_kind(e.device) == kind),
+            key=lambda e: e.last_used,
+        )
+        for entry in idle:
+            if self._used(kind) + needed <= budget:
+                break
+            ram_budget = self.budgets["cpu"]
+            fits_in_ram = not ram_budget or self._used("cpu") + entry.size <= ram_budget
+            if kind == "cuda" and self.offload and entry.mover is not None and fits_in_ram:
+                entry.model = entry.mover(entry.model, "cpu")
+                entry.device = "cpu"
+                self._stats["offloads"] += 1
+                torch.cuda.empty_cache()
+                print(f"📤 Offloaded {'/'.join(map(str, entry.key))} to CPU")
+            else:
+                self._unload(entry)
+        if self._used(kind) + needed > budget:
+            print(f"⚠️ {kind.upper()} model budget exceeded: models in use hold "
+                  f"{self._used(kind) / GB:.1f} GB of {budget / GB:.1f} GB")
+
+    def acquire(self, key, loader, device="cpu", mover=move_module, size_mb=None):
+        """
+        Return the model for `key` with one more reference held (see release / use).
+        - loader(device) builds the model when it is not resident.
+        - mover(model, device) moves it between GPU and CPU; None means it cannot move
+          (put the device in the key) and it is unloaded instead of offloaded.
+        - size_mb: size estimate for models whose memory torch cannot measure.
+        """
+        with self._key_lock(key):
+            with self._lock:
+                entry = self._entries.get(key)
+                if entry is not None:
+                    self._stats["hits"] += 1
+                    self._family(key)["hits"] += 1
+                    entry.refs += 1
+                    entry.uses += 1
+                    entry.last_used = time.time()
+                    if entry.mover is None or _device_kind(entry.device) == _device_kind(device):
+                        return entry.model
+                    # Offloaded earlier: bring it back to the requested device
+                    self._make_room(_device_kind(device), entry.size)
+                    entry.model = entry.mover(entry.model, device)
+                    entry.device = device
+                    print(f"📥 Moved {'/'.join(map(str, key))} back to {device}")
+                    return entry.model
+
+                self._stats["misses"] += 1
+                self._family(key)["misses"] += 1
+                self._make_room(_device_kind(device), self._known_sizes.get(key, 0))
+
+            print(f"📥 Loading {'/'.join(map(str, key))} on {device}...")
+            free_before = _free_cuda_bytes() if _device_kind(device) == "cuda" else None
+            started = time.perf_counter()
+            model = loader(device)
+            elapsed = time.perf_counter() - started
+
+            size = module_bytes(model)
+            if size is None and free_before is not None:
+                size = max(0, free_before - _free_cuda_bytes())
+            if size is None or (not size and size_mb):
+                size = int((size_mb or 0) * 1024 * 1024)
+
+            with self._lock:
+                entry = _Entry(key, model, device, size, mover)
+                entry.refs = 1
+                entry.uses = 1
+                self._entries[key] = entry
+                self._known_sizes[key] = size
+                self._stats["load_seconds"]["/".join(map(str, key))] = round(elapsed, 3)
+                print(f"✅ Loaded {'/'.join(map(str, key))} ({size / 1024 ** 2:.0f} MB) in {elapsed:.1f}s")
+                self._make_room(_device_kind(device), 0)
+            return model
+
+    def release(self, key):
+        with self._lock:
+            entry = self._entries.get(key)
+            if entry is None:
+                return
+            entry.refs = max(0, entry.refs - 1)
+            entry.last_used = time.time()
+            if entry.refs == 0:
+                # Settle any overcommit that models in use forced earlier
+                self._make_room(_device_kind(entry.device), 0)
+
+    @contextmanager
+    def use(self, key, loader, device="cpu", mover=move_module, size_mb=None):
+        """Hold a model for the duration of a with-block; it cannot be evicted meanwhile."""
+        model = self.acquire(key, loader, device, mover, size_mb)
+        try:
+            yield model
+        finally:
+            self.release(key)
+
+    def unload(self, predicate):
+        """Unload every idle model whose key matches predicate(key)."""
+        with self._lock:
+            for entry in [e for e in self._entries.values() if e.refs == 0 and predicate(e.key)]:
+                self._unload(entry)
+
+    def stats(self):
+        with self._lock:
+            lookups = self._stats["hits"] + self._stats["misses"]
+            now = time.time()
+            return {
+                "budget_mb": {k: round(v / 1024 ** 2) for k, v in self.budgets.items()},
+                "used_mb": {k: round(self._used(k) / 1024 ** 2) for k in self.budgets},
+                "hits": self._stats["hits"],
+                "misses": self._stats["misses"],
+                "hit_ratio": round(self._stats["hits"] / lookups, 4) if lookups else 0.0,
+                "offloads": self._stats["offloads"],
+                "unloads": self._stats["unloads"],
+                "load_seconds": dict(self._stats["load_seconds"]),
+                "families": {k: dict(v) for k, v in self._family_stats.items()},
+                "models": [
+                    {
+                        "key": "/".join(map(str, e.key)),
+                        "device": e.device,
+                        "size_mb": round(e.size / 1024 ** 2),
+                        "in_use": e.refs,
+                        "uses": e.uses,
+                        "idle_seconds": round(now - e.last_used, 1),
+                    }
+                    for e in sorted(self._entries.values(), key=lambda e: -e.last_used)
+                ],
+            }
+
+
+# Process-wide manager shared by ASR, LID, MT, TTS and OCR
+model_manager = ModelManager()
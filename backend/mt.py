@@ -1,17 +1,30 @@
 import os
 import re
+import time
+import queue
+import threading
+from contextlib import contextmanager
+from concurrent.futures import Future
 from typing import List
 
-from deep_translator import GoogleTranslator
 import torch
 from transformers import AutoModelForSeq2SeqLM, AutoTokenizer
 
-# translator definition not needed for deep-translator as we instantiate it on demand or globally if preferred, 
-# but it's lightweight to instantiate.
+from model_manager import model_manager, move_module, cpu_int8, quantize_int8
+import google_translate
+from translation_cache import translation_cache, make_translation_key, normalize_sentence
 
 
 # Meta NLLB-200 Model
 NLLB_MODEL_NAME = "facebook/nllb-200-distilled-1.3B"
+# Sentences per padded generate call
+NLLB_BATCH_SIZE = int(os.getenv("NLLB_BATCH_SIZE", "16"))
+NLLB_NUM_BEAMS = int(os.getenv("NLLB_NUM_BEAMS", "4"))
+# Generation budget per batch: longest input length * ratio + slack, capped at NLLB_MAX_NEW_TOKENS
+# (Indic scripts need more tokens than the English source)
+NLLB_LENGTH_RATIO = float(os.getenv("NLLB_LENGTH_RATIO", "2.0"))
+NLLB_LENGTH_SLACK = int(os.getenv("NLLB_LENGTH_SLACK", "16"))
+NLLB_MAX_NEW_TOKENS = int(os.getenv("NLLB_MAX_NEW_TOKENS", "1024"))
 
 # Optional IndicProcessor
 try:
@@ -55,7 +68,7 @@ LANG_TO_NLLB = {
     # IndicTrans codes -> NLLB codes (direct pass-through if already in format)
     "hin_Deva": "hin_Deva", "mar_Deva": "mar_Deva", "guj_Gujr": "guj_Gujr",
     "ben_Beng": "ben_Beng", "pan_Guru": "pan_Guru", "asm_Beng": "asm_Beng",
-    "ory_Orya": "ory_Orya", "npi_Deva": "nep_Deva", "kas_Arab": "kas_Arab",
+    "ory_Orya": "ory_Orya", "npi_Deva": "nep_Deva", "nep_Deva": "nep_Deva", "kas_Arab": "kas_Arab",
     "kas_Deva": "kas_Arab", "gom_Deva": "gom_Deva", "mai_Deva": "mai_Deva",
     "snd_Arab": "snd_Arab", "snd_Deva": "snd_Arab", "san_Deva": "san_Deva",
     "urd_Arab": "urd_Arab", "brx_Deva": "brx_Deva", "doi_Deva": "doi_Deva",
@@ -104,27 +117,15 @@ def normalize_code_for_indictrans(code: str) -> str:
     return fallback.get(code, "eng_Latn")
 
 
+_WHITESPACE_RE = re.compile(r"\s+")
+_SENTENCE_END_RE = re.compile(r'(?<=[\.\?\!।])\s+')
+
 def _split_into_sentences(text: str) -> List[str]:
     """Split text into sentences for batch processing."""
-    text = re.sub(r"\s+", " ", text).strip()
-    sentences = re.split(r'(?<=[\.\?\!।])\s+', text)
+    text = _WHITESPACE_RE.sub(" ", text).strip()
+    sentences = _SENTENCE_END_RE.split(text)
     return [s.strip() for s in sentences if s.strip()]
 
-def _group_sentences(sentences: List[str], char_limit: int = 2000) -> List[str]:
-    """Group sentences into chunks that respect character limits."""
-    chunks, cur, cur_len = [], [], 0
-    for s in sentences:
-        if cur_len + len(s) + 1 <= char_limit:
-            cur.append(s)
-            cur_len += len(s) + 1
-        else:
-            if cur:
-                chunks.append(" ".join(cur))
-            cur, cur_len = [s], len(s)
-    if cur:
-        chunks.append(" ".join(cur))
-    return chunks
-
 def split_into_sentences(text: str) -> List[str]:
     """Legacy function for backward compatibility."""
     return _split_into_sentences(text)
@@ -146,38 +147,38 @@ def normalize_code_for_nllb(code: str) -> str:
 def translate_google(texts: List[str], src_lang: str, tgt_lang: str) -> List[str]:
     src = normalize_code_for_google(src_lang)
     tgt = normalize_code_for_google(tgt_lang)
-    outputs: List[str] = []
-    
-    # deep-translator handles one string at a time usually, looping is fine
-    for t in texts:
-        try:
-            # deep-translator
-            res = GoogleTranslator(source=src, target=tgt).translate(t)
-            outputs.append(res)
-        except Exception as e:
-            print(f"Google translate error: {e}")
-            outputs.append(t)
-    return outputs
+    # Pooled session, packed and concurrent requests (see google_translate.py)
+    return google_translate.translate_sentences(texts, src, tgt)
 
-# Cache for NLLB model and tokenizer to avoid reloading
+# Tokenizers are small and cached here; the seq2seq weights are held by the model manager,
+# which keeps them resident within the memory budget (and may offload them to CPU when idle)
 _nllb_tokenizer = None
-_nllb_model = None
-
-# Cache for IndicTrans models (avoid reloading on every request)
 _indic_tokenizers = {}
-_indic_models = {}
 
-def _load_nllb_model():
-    """Lazy load NLLB model and tokenizer."""
-    global _nllb_tokenizer, _nllb_model
-    if _nllb_tokenizer is None or _nllb_model is None:
+def _load_seq2seq_model(model_name, device):
+    return AutoModelForSeq2SeqLM.from_pretrained(
+        model_name,
+        trust_remote_code=True,
+        torch_dtype=torch.float16 if DEVICE == "cuda" else torch.float32,
+    ).to(device)
+
+def _seq2seq_spec(kind, model_name):
+    """Model manager key, loader and mover for a seq2seq model under the current CPU quantization."""
+    if cpu_int8(DEVICE):
+        # int8 weights stay on CPU, so the quantized copy cannot be moved
+        return (kind, model_name, "int8"), lambda d: quantize_int8(_load_seq2seq_model(model_name, d)), None
+    return (kind, model_name), lambda d: _load_seq2seq_model(model_name, d), move_module
+
+def _get_nllb_tokenizer():
+    global _nllb_tokenizer
+    if _nllb_tokenizer is None:
         _nllb_tokenizer = AutoTokenizer.from_pretrained(NLLB_MODEL_NAME, trust_remote_code=True)
-        _nllb_model = AutoModelForSeq2SeqLM.from_pretrained(
-            NLLB_MODEL_NAME,
-            trust_remote_code=True,
-            torch_dtype=torch.float16 if DEVICE == "cuda" else torch.float32,
-        ).to(DEVICE)
-    return _nllb_tokenizer, _nllb_model
+    return _nllb_tokenizer
+
+def _use_nllb_model():
+    """Hold the NLLB model for the duration of a with-block."""
+    key, loader, mover = _seq2seq_spec("nllb", NLLB_MODEL_NAME)
+    return model_manager.use(key, loader, DEVICE, mover=mover)
 
 def _get_forced_bos_token_id(tokenizer, tgt_flores_code):
     """Robust method to get forced BOS token ID for NLLB target language."""
@@ -237,12 +238,17 @@ def _get_forced_bos_token_id(tokenizer, tgt_flores_code):
     raise ValueError(f"Could not map target FLORES code '{tgt_flores_code}' to a token id.")
 
 def translate_nllb(texts: List[str], src_lang: str, tgt_lang: str) -> List[str]:
-    """Translate using Meta NLLB-200 model."""
+    """
+    Translate using Meta NLLB-200 model.
+    Sentences are sorted by token length and generated in padded batches of NLLB_BATCH_SIZE
+    with the KV cache on; each batch's budget scales with its longest input, and the
+    outputs are returned in input order.
+    """
     src_flores = normalize_code_for_nllb(src_lang)
     tgt_flores = normalize_code_for_nllb(tgt_lang)
     
     try:
-        tokenizer, model = _load_nllb_model()
+        tokenizer = _get_nllb_tokenizer()
         
         # Set source language for tokenizer (try flores format first, then ISO code)
         if hasattr(tokenizer, 'src_lang'):
@@ -255,26 +261,39 @@ def translate_nllb(texts: List[str], src_lang: str, tgt_lang: str) -> List[str]:
         
         # Get target language token ID using robust method
         forced_bos_token_id = _get_forced_bos_token_id(tokenizer, tgt_flores)
-        
-        translations = []
-        for text in texts:
-            inputs = tokenizer(text, return_tensors="pt", truncation=True, padding="longest")
-            inputs = {k: v.to(DEVICE) for k, v in inputs.items()}
-            
-            with torch.no_grad():
-                generated_tokens = model.generate(
-                    **inputs,
-                    forced_bos_token_id=forced_bos_token_id,
-                    max_new_tokens=1024,
-                    no_repeat_ngram_size=3,
-                    repetition_penalty=2.0,
-                    early_stopping=True,
-                    num_beams=4,
-                    use_cache=False,
+
+        translations = [""] * len(texts)
+        todo = [i for i, text in enumerate(texts) if text and text.strip()]
+        if not todo:
+            return translations
+        # Length-sorted batches keep padding (and wasted decoder steps) to a minimum
+        lengths = tokenizer([texts[i] for i in todo], truncation=True)["input_ids"]
+        order = [i for _, i in sorted(zip(map(len, lengths), todo))]
+
+        with _use_nllb_model() as model:
+            for first in range(0, len(order), NLLB_BATCH_SIZE):
+                batch = order[first:first + NLLB_BATCH_SIZE]
+                inputs = tokenizer([texts[i] for i in batch], return_tensors="pt", truncation=True, padding="longest")
+                inputs = {k: v.to(DEVICE) for k, v in inputs.items()}
+                max_new_tokens = min(
+                    NLLB_MAX_NEW_TOKENS, int(inputs["input_ids"].shape[1] * NLLB_LENGTH_RATIO) + NLLB_LENGTH_SLACK
                 )
-            translated = tokenizer.batch_decode(generated_tokens, skip_special_tokens=True)[0]
-            translations.append(translated)
-        
+
+                with torch.no_grad():
+                    generated_tokens = model.generate(
+                        **inputs,
+                        forced_bos_token_id=forced_bos_token_id,
+                        max_new_tokens=max_new_tokens,
+                        no_repeat_ngram_size=3,
+                        repetition_penalty=2.0,
+                        early_stopping=True,
+                        num_beams=NLLB_NUM_BEAMS,
+                        use_cache=True,
+                    )
+                decoded = tokenizer.batch_decode(generated_tokens, skip_special_tokens=True)
+                for i, translated in zip(batch, decoded):
+                    translations[i] = translated
+
         return translations
     except Exception as e:
         print(f"⚠️ NLLB translation error: {e}")
@@ -296,80 +315,386 @@ def detect_model(src_lang: str, tgt_lang: str) -> str:
         return MODEL_MAP[("indic", "indic")]
 
 
+def _get_indic_tokenizer(model_name):
+    if model_name not in _indic_tokenizers:
+        _indic_tokenizers[model_name] = AutoTokenizer.from_pretrained(model_name, trust_remote_code=True)
+    return _indic_tokenizers[model_name]
+
+
+def _indictrans_generate(model_name: str, texts: List[str]) -> List[str]:
+    """One padded generate over tagged/preprocessed sentences; returns the decoded outputs."""
+    tokenizer = _get_indic_tokenizer(model_name)
+    # The model is held from the model manager while generating
+    model_key, loader, mover = _seq2seq_spec("indictrans", model_name)
+    model = model_manager.acquire(model_key, loader, DEVICE, mover=mover)
+    try:
+        inputs = tokenizer(texts, truncation=True, padding="longest", return_tensors="pt", return_attention_mask=True).to(DEVICE)
+        with torch.no_grad():
+            # Use slightly faster generation defaults to reduce latency
+            outputs = model.generate(**inputs, use_cache=True, min_length=0, max_length=512, num_beams=3, num_return_sequences=1)
+        return tokenizer.batch_decode(outputs, skip_special_tokens=True, clean_up_tokenization_spaces=True)
+    finally:
+        model_manager.release(model_key)
+
+
+# IndicTrans2 micro-batching: sentences from concurrent requests are collected for up to
+# INDICTRANS_BATCH_WAIT_MS, grouped by model and target language, sorted into length
+# buckets and decoded with one padded generate per bucket. A single scheduler thread owns
+# the tokenizers and generate calls, so concurrent requests no longer contend on the model.
+INDICTRANS_BATCH_WAIT_MS = float(os.getenv("INDICTRANS_BATCH_WAIT_MS", "10"))
+# Bucket limits: padded tokens (longest input x sentences) and sentences per generate
+INDICTRANS_MAX_BATCH_TOKENS = int(os.getenv("INDICTRANS_MAX_BATCH_TOKENS", "8192"))
+INDICTRANS_MAX_BATCH_SIZE = int(os.getenv("INDICTRANS_MAX_BATCH_SIZE", "64"))
+
+
+class _PendingSentence:
+    __slots__ = ("key", "text", "future", "queued")
+
+    def __init__(self, key, text):
+        self.key = key
+        self.text = text
+        self.future = Future()
+        self.queued = time.perf_counter()
+
+
+class IndicTransBatcher:
+    def __init__(self, wait_ms=INDICTRANS_BATCH_WAIT_MS, max_batch_tokens=INDICTRANS_MAX_BATCH_TOKENS,
+                 max_batch_size=INDICTRANS_MAX_BATCH_SIZE):
+        self.wait = wait_ms / 1000
+        self.max_batch_tokens = max_batch_tokens
+        self.max_batch_size = max_batch_size
+        self._queue = queue.Queue()
+        self._thread = None
+        self._lock = threading.Lock()
+        self._stats = {"batches": 0, "sentences": 0, "largest_batch": 0, "wait_seconds": 0.0, "padding_tokens": 0,
+                       "tokens": 0}
+
+    def submit(self, model_name: str, tgt_lang: str, texts: List[str]) -> List[Future]:
+        """Queue tagged/preprocessed sentences; returns one future per sentence (its decoded output)."""
+        with self._lock:
+            if self._thread is None:
+                self._thread = threading.Thread(target=self._run, name="indictrans-batcher", daemon=True)
+                self._thread.start()
+        pending = [_PendingSentence((model_name, tgt_lang), text) for text in texts]
+        for item in pending:
+            self._queue.put(item)
+        return [item.future for item in pending]
+
+    def translate(self, model_name: str, tgt_lang: str, texts: List[str]) -> List[str]:
+        return [f.result() for f in self.submit(model_name, tgt_lang, texts)]
+
+    def _collect(self):
+        """Block for the first sentence, then gather more until the window closes or a batch is full."""
+        items = [self._queue.get()]
+        deadline = time.perf_counter() + self.wait
+        while len(items) < self.max_batch_size:
+            timeout = deadline - time.perf_counter()
+            try:
+                items.append(self._queue.get(timeout=timeout) if timeout > 0 else self._queue.get_nowait())
+            except queue.Empty:
+                break
+        return items
+
+    def _buckets(self, items):
+        """Split items into (model_name, bucket) runs: same key, similar length, within the token limits."""
+        groups = {}
+        for item in items:
+            groups.setdefault(item.key, []).append(item)
+        for (model_name, _), group in groups.items():
+            lengths = [len(ids) for ids in _get_indic_tokenizer(model_name)([i.text for i in group], truncation=True)["input_ids"]]
+            ordered = sorted(zip(lengths, range(len(group))))
+            bucket, longest = [], 0
+            for n, idx in ordered:
+                if bucket and (max(longest, n) * (len(bucket) + 1) > self.max_batch_tokens
+                               or len(bucket) >= self.max_batch_size):
+                    yield model_name, bucket, longest
+                    bucket, longest = [], 0
+                bucket.append((n, group[idx]))
+                longest = max(longest, n)
+            if bucket:
+                yield model_name, bucket, longest
+
+    def _run(self):
+        while True:
+            items = self._collect()
+            try:
+                buckets = list(self._buckets(items))
+            except Exception as e:
+                for item in items:
+                    item.future.set_exception(e)
+                continue
+            for model_name, bucket, longest in buckets:
+                started = time.perf_counter()
+                try:
+                    outputs = _indictrans_generate(model_name, [item.text for _, item in bucket])
+                except Exception as e:
+                    print(f"⚠️ IndicTrans generation error for model {model_name}: {e}")
+                    for _, item in bucket:
+                        item.future.set_exception(e)
+                    continue
+                for (_, item), output in zip(bucket, outputs):
+                    item.future.set_result(output)
+                with self._lock:
+                    tokens = sum(n for n, _ in bucket)
+                    self._stats["batches"] += 1
+                    self._stats["sentences"] += len(bucket)
+                    self._stats["largest_batch"] = max(self._stats["largest_batch"], len(bucket))
+                    self._stats["wait_seconds"] += sum(started - item.queued for _, item in bucket)
+                    self._stats["tokens"] += tokens
+                    self._stats["padding_tokens"] += longest * len(bucket) - tokens
+
+    def stats(self):
+        with self._lock:
+            s = dict(self._stats)
+        padded = s["tokens"] + s["padding_tokens"]
+        return {
+            "batches": s["batches"],
+            "sentences": s["sentences"],
+            "avg_batch_size": round(s["sentences"] / s["batches"], 2) if s["batches"] else 0.0,
+            "largest_batch": s["largest_batch"],
+            "avg_queue_wait_ms": round(s["wait_seconds"] / s["sentences"] * 1000, 1) if s["sentences"] else 0.0,
+            "padding_ratio": round(s["padding_tokens"] / padded, 4) if padded else 0.0,
+            "queued": self._queue.qsize(),
+            "wait_ms": self.wait * 1000,
+            "max_batch_tokens": self.max_batch_tokens,
+            "max_batch_size": self.max_batch_size,
+        }
+
+
+# Process-wide scheduler shared by every IndicTrans request
+indictrans_batcher = IndicTransBatcher()
+
+
+# IndicProcessor instances compile their normalization regexes and tables on construction,
+# so they are built once and reused. An instance keeps per-batch state between
+# preprocess_batch and postprocess_batch, so each call borrows one exclusively.
+INDIC_PROCESSOR_POOL_SIZE = int(os.getenv("INDIC_PROCESSOR_POOL_SIZE", "8"))
+_indic_processors = queue.LifoQueue()
+_indic_processors_created = 0
+_indic_processors_lock = threading.Lock()
+
+
+@contextmanager
+def _indic_processor():
+    global _indic_processors_created
+    try:
+        ip = _indic_processors.get_nowait()
+    except queue.Empty:
+        with _indic_processors_lock:
+            create = _indic_processors_created < INDIC_PROCESSOR_POOL_SIZE
+            if create:
+                _indic_processors_created += 1
+        if not create:
+            ip = _indic_processors.get()
+        else:
+            try:
+                ip = IndicProcessor(inference=True)
+            except Exception:
+                with _indic_processors_lock:
+                    _indic_processors_created -= 1
+                raise
+    try:
+        yield ip
+    finally:
+        _indic_processors.put(ip)
+
+
+class _StageTimings:
+    """Cumulative seconds per IndicTrans stage, to tell preprocessing apart from generation."""
+
+    STAGES = ("preprocess", "generate", "postprocess")
+
+    def __init__(self):
+        self._lock = threading.Lock()
+        self.calls = 0
+        self.sentences = 0
+        self.seconds = dict.fromkeys(self.STAGES, 0.0)
+
+    def add(self, sentences, **seconds):
+        with self._lock:
+            self.calls += 1
+            self.sentences += sentences
+            for stage, value in seconds.items():
+                self.seconds[stage] += value
+
+    def stats(self):
+        with self._lock:
+            total = sum(self.seconds.values())
+            return {
+                "calls": self.calls,
+                "sentences": self.sentences,
+                "processors": _indic_processors_created,
+                "stages": {
+                    stage: {
+                        "total_ms": round(value * 1000, 1),
+                        "avg_ms_per_call": round(value / self.calls * 1000, 2) if self.calls else 0.0,
+                        "share": round(value / total, 4) if total else 0.0,
+                    }
+                    for stage, value in self.seconds.items()
+                },
+            }
+
+
+indictrans_stage_timings = _StageTimings()
+
+
 def translate_indictrans(texts: List[str], src_lang: str, tgt_lang: str) -> List[str]:
     # Normalize to IndicTrans tags
     src_lang = normalize_code_for_indictrans(src_lang)
     tgt_lang = normalize_code_for_indictrans(tgt_lang)
     model_name = detect_model(src_lang, tgt_lang)
-    # Lazy-load and cache the tokenizer/model for this model_name
-    global _indic_tokenizers, _indic_models
-    if model_name not in _indic_tokenizers or model_name not in _indic_models:
-        try:
-            _indic_tokenizers[model_name] = AutoTokenizer.from_pretrained(model_name, trust_remote_code=True)
-            _indic_models[model_name] = AutoModelForSeq2SeqLM.from_pretrained(
-                model_name,
-                trust_remote_code=True,
-                torch_dtype=torch.float16 if DEVICE == "cuda" else torch.float32,
-            ).to(DEVICE)
-        except Exception as e:
-            print(f"⚠️ Failed to load IndicTrans model {model_name}: {e}")
-            raise
-
-    tokenizer = _indic_tokenizers[model_name]
-    model = _indic_models[model_name]
-
     try:
-        if HAS_INDIC_PROCESSOR:
-            ip = IndicProcessor(inference=True)
-            batch = ip.preprocess_batch(texts, src_lang=src_lang, tgt_lang=tgt_lang)
-            inputs = tokenizer(batch, truncation=True, padding="longest", return_tensors="pt", return_attention_mask=True).to(DEVICE)
-            with torch.no_grad():
-                # Use slightly faster generation defaults to reduce latency
-                outputs = model.generate(**inputs, use_cache=True, min_length=0, max_length=512, num_beams=3, num_return_sequences=1)
-            decoded = tokenizer.batch_decode(outputs, skip_special_tokens=True, clean_up_tokenization_spaces=True)
-            translations = ip.postprocess_batch(decoded, lang=tgt_lang)
-        else:
-            tagged = [f"<{src_lang}><{tgt_lang}> {s}" for s in texts]
-            inputs = tokenizer(tagged, truncation=True, padding=True, return_tensors="pt").to(DEVICE)
-            with torch.no_grad():
-                outputs = model.generate(**inputs, max_length=512, num_beams=3, use_cache=True)
-            translations = tokenizer.batch_decode(outputs, skip_special_tokens=True, clean_up_tokenization_spaces=True)
+        _get_indic_tokenizer(model_name)
     except Exception as e:
-        print(f"⚠️ IndicTrans generation error for model {model_name}: {e}")
+        print(f"⚠️ Failed to load IndicTrans model {model_name}: {e}")
         raise
+
+    # Generation runs on the micro-batching scheduler, together with concurrent requests
+    if HAS_INDIC_PROCESSOR:
+        # Entity placeholders live on the processor between the two stages, so one pooled
+        # instance is held from preprocessing until postprocessing
+        with _indic_processor() as ip:
+            started = time.perf_counter()
+            batch = ip.preprocess_batch(texts, src_lang=src_lang, tgt_lang=tgt_lang)
+            preprocessed = time.perf_counter()
+            decoded = indictrans_batcher.translate(model_name, tgt_lang, batch)
+            generated = time.perf_counter()
+            translations = ip.postprocess_batch(decoded, lang=tgt_lang)
+        indictrans_stage_timings.add(
+            len(texts),
+            preprocess=preprocessed - started,
+            generate=generated - preprocessed,
+            postprocess=time.perf_counter() - generated,
+        )
+    else:
+        started = time.perf_counter()
+        tagged = [f"<{src_lang}><{tgt_lang}> {s}" for s in texts]
+        translations = indictrans_batcher.translate(model_name, tgt_lang, tagged)
+        indictrans_stage_timings.add(len(texts), generate=time.perf_counter() - started)
     return translations
 
 
+# ------------------------
+# Cached sentence translation
+# ------------------------
+
+MT_BACKENDS = {
+    "indictrans": translate_indictrans,
+    "nllb": translate_nllb,
+    "google": translate_google,
+}
+# Language code normalization per backend, so 'hi' and 'hin_Deva' share groups and cache entries.
+# Only for grouping and cache keys: the backends normalize the caller's codes themselves.
+MT_CODE_NORMALIZERS = {
+    "indictrans": normalize_code_for_indictrans,
+    "nllb": normalize_code_for_nllb,
+    "google": normalize_code_for_google,
+}
+
+
+def _cache_model_name(model: str, src_lang: str, tgt_lang: str) -> str:
+    """The concrete model behind a backend for this pair (part of the translation cache key)."""
+    if model == "indictrans":
+        return detect_model(src_lang, tgt_lang)
+    if model == "nllb":
+        return NLLB_MODEL_NAME
+    return model
+
+
+def translate_sentences(sentences: List[str], src_lang: str, tgt_lang: str, model: str = "indictrans") -> List[str]:
+    """
+    Translate sentences with one backend through the translation cache: only unique cache
+    misses reach the model, in one call (the backends bound their own batches). Raises if
+    the backend fails.
+    """
+    normalize = MT_CODE_NORMALIZERS[model]
+    src, tgt = normalize(src_lang), normalize(tgt_lang)
+    model_name = _cache_model_name(model, src, tgt)
+    normalized = [normalize_sentence(s) for s in sentences]
+    keys = {s: make_translation_key(model, model_name, src, tgt, s) for s in normalized}
+
+    found = translation_cache.get_many(list(keys.values())) if translation_cache is not None else {}
+    misses = [s for s in dict.fromkeys(normalized) if keys[s] not in found]
+    if misses:
+        translated = MT_BACKENDS[model](misses, src_lang, tgt_lang)
+        new = {}
+        for s, out in zip(misses, translated):
+            found[keys[s]] = out
+            # translate_google returns the source text when a request fails; do not remember that
+            if not (model == "google" and out == s and src != tgt):
+                new[keys[s]] = out
+        if translation_cache is not None:
+            translation_cache.put_many(new)
+    return [found[keys[s]] for s in normalized]
+
+
 def translate_text(text: str, src_lang: str, tgt_lang: str, mt_model_choice: str = "auto") -> str:
-    """Translate text using specified model with automatic chunking for long texts."""
+    """
+    Translate text using specified model with automatic chunking for long texts.
+    Sentences are looked up in the translation cache first; only misses are translated.
+    """
+    model = mt_model_choice if mt_model_choice in MT_BACKENDS else "indictrans"  # auto - default to indictrans
     sentences = _split_into_sentences(text)
-    chunks = _group_sentences(sentences, char_limit=1800)
-    
+    # The whole document goes to the backend as one batch; chunks only isolate failures
+    try:
+        return " ".join(translate_sentences(sentences, src_lang, tgt_lang, model)).strip()
+    except Exception as e:
+        print(f"⚠️ Document translation error, retrying chunk by chunk: {e}")
     outputs = []
-    for chunk in chunks:
+    for chunk in google_translate.pack_sentences(sentences, max_chars=1800):
         try:
-            if mt_model_choice == "google":
-                chunk_sentences = _split_into_sentences(chunk)
-                out_list = translate_google(chunk_sentences, src_lang, tgt_lang)
-                out = " ".join(out_list)
-            elif mt_model_choice == "indictrans":
-                chunk_sentences = _split_into_sentences(chunk)
-                out_list = translate_indictrans(chunk_sentences, src_lang, tgt_lang)
-                out = " ".join(out_list)
-            elif mt_model_choice == "nllb":
-                chunk_sentences = _split_into_sentences(chunk)
-                out_list = translate_nllb(chunk_sentences, src_lang, tgt_lang)
-                out = " ".join(out_list)
-            else:  # auto - default to indictrans
-                chunk_sentences = _split_into_sentences(chunk)
-                out_list = translate_indictrans(chunk_sentences, src_lang, tgt_lang)
-                out = " ".join(out_list)
-            outputs.append(out)
+            outputs.append(" ".join(translate_sentences([sentences[i] for i in chunk], src_lang, tgt_lang, model)))
         except Exception as e:
             print(f"⚠️ Batch translation error on chunk: {e}")
             outputs.append("[translation_error]")
     return " ".join(outputs).strip()
 
+# Streaming: the first chunk is kept short so the first translation arrives quickly
+MT_STREAM_FIRST_CHUNK_CHARS = int(os.getenv("MT_STREAM_FIRST_CHUNK_CHARS", "300"))
+MT_STREAM_CHUNK_CHARS = int(os.getenv("MT_STREAM_CHUNK_CHARS", "1800"))
+
+
+def _sentence_spans(text: str):
+    """(start, end) character offsets in `text` of the sentences _split_into_sentences returns."""
+    spans, start = [], 0
+    for boundary in list(_SENTENCE_END_RE.finditer(text)) + [None]:
+        end = boundary.start() if boundary else len(text)
+        piece = text[start:end]
+        if piece.strip():
+            lead = len(piece) - len(piece.lstrip())
+            spans.append((start + lead, start + len(piece.rstrip())))
+        start = boundary.end() if boundary else len(text)
+    return spans
+
+
+def iter_translate_text(text: str, src_lang: str, tgt_lang: str, mt_model_choice: str = "auto"):
+    """
+    Generator version of translate_text: yields each chunk as soon as it is translated,
+    {"index", "start", "end", "translation", "model_used"} with start/end as character
+    offsets of the chunk in `text`. A chunk that fails falls back to Google; if that
+    fails too, it gets "[translation_error]" and an "error".
+    """
+    model = mt_model_choice if mt_model_choice in MT_BACKENDS else "indictrans"  # auto - default to indictrans
+    spans = _sentence_spans(text)
+    sentences = [_WHITESPACE_RE.sub(" ", text[s:e]) for s, e in spans]
+
+    chunks = google_translate.pack_sentences(sentences, MT_STREAM_CHUNK_CHARS, MT_STREAM_FIRST_CHUNK_CHARS)
+
+    for index, chunk in enumerate(chunks):
+        event = {"index": index, "start": spans[chunk[0]][0], "end": spans[chunk[-1]][1]}
+        chunk_sentences = [sentences[i] for i in chunk]
+        for candidate in dict.fromkeys([model, "google"]):
+            try:
+                event["translation"] = " ".join(translate_sentences(chunk_sentences, src_lang, tgt_lang, candidate))
+                event["model_used"] = candidate
+                event.pop("error", None)
+                break
+            except Exception as e:
+                print(f"⚠️ Streaming translation error on chunk {index} ({candidate}): {e}")
+                event["translation"], event["model_used"], event["error"] = "[translation_error]", None, str(e)
+        yield event
+
+
 def translate_with_fallback(text: str, src_lang: str, tgt_lang: str, primary: str = "indictrans"):
     """Translate with automatic fallback if primary model fails."""
     try:
@@ -400,3 +725,95 @@ def translate_with_fallback(text: str, src_lang: str, tgt_lang: str, primary: st
             raise
 
 
+
+
+# ------------------------
+# Batch translation
+# ------------------------
+
+# Documents accepted by one /mt/batch request
+MT_BATCH_MAX_ITEMS = int(os.getenv("MT_BATCH_MAX_ITEMS", "2000"))
+
+
+def _translate_unique(sentences: List[str], src_lang: str, tgt_lang: str, model: str):
+    """Translate unique sentences with `model`, falling back to Google like translate_with_fallback."""
+    try:
+        return translate_sentences(sentences, src_lang, tgt_lang, model), model
+    except Exception as e:
+        if model == "google":
+            raise
+        print(f"⚠️ Batch MT ({model}) failed: {e}, falling back to google")
+        return translate_sentences(sentences, src_lang, tgt_lang, "google"), "google"
+
+
+def translate_batch(items, default_model: str = "indictrans"):
+    """
+    Translate many documents with per-item language pairs and models.
+    items: [{"text", "src_lang", "tgt_lang", "model"?}]. Documents are grouped by
+    (model, src, tgt); each group's sentences are deduplicated across the whole batch and
+    translated in batched model calls. Yields events:
+      {"type": "group", "model", "src_lang", "tgt_lang", "model_used", "results": [{"index", "translation"}], ...}
+      as each group finishes, then {"type": "done", "translations": [...] in input order, ...}.
+    """
+    groups = {}
+    for index, item in enumerate(items):
+        model = item.get("model") or default_model
+        model = "indictrans" if model == "auto" else model
+        if model not in MT_BACKENDS:
+            raise ValueError(f"Unknown MT model '{model}'. Valid models: {', '.join(MT_BACKENDS)}")
+        normalize = MT_CODE_NORMALIZERS[model]
+        key = (model, normalize(item.get("src_lang") or "eng_Latn"), normalize(item.get("tgt_lang") or "hin_Deva"))
+        groups.setdefault(key, []).append(index)
+
+    translations = [""] * len(items)
+    total_sentences = total_unique = 0
+    for (model, src, tgt), indices in groups.items():
+        started = time.perf_counter()
+        # Every item in a group normalizes to (src, tgt); translate with the first one's own codes
+        src_lang = items[indices[0]].get("src_lang") or "eng_Latn"
+        tgt_lang = items[indices[0]].get("tgt_lang") or "hin_Deva"
+        doc_sentences = {i: _split_into_sentences(items[i].get("text") or "") for i in indices}
+        # dict keeps first-seen order, so identical sentences are translated once per group
+        unique = list(dict.fromkeys(s for i in indices for s in doc_sentences[i]))
+        sentences = sum(len(doc_sentences[i]) for i in indices)
+        print(f"🔁 MT batch group {model} {src}->{tgt}: {len(indices)} docs, {sentences} sentences, {len(unique)} unique")
+
+        model_used, error = model, None
+        try:
+            if unique:
+                outputs, model_used = _translate_unique(unique, src_lang, tgt_lang, model)
+                lookup = dict(zip(unique, outputs))
+            else:
+                lookup = {}
+            for i in indices:
+                translations[i] = " ".join(lookup[s] for s in doc_sentences[i]).strip()
+        except Exception as e:
+            print(f"⚠️ MT batch group {model} {src}->{tgt} failed: {e}")
+            error = str(e)
+            for i in indices:
+                translations[i] = "[translation_error]"
+
+        total_sentences += sentences
+        total_unique += len(unique)
+        event = {
+            "type": "group",
+            "model": model,
+            "src_lang": src,
+            "tgt_lang": tgt,
+            "model_used": model_used,
+            "sentences": sentences,
+            "unique_sentences": len(unique),
+            "seconds": round(time.perf_counter() - started, 3),
+            "results": [{"index": i, "translation": translations[i]} for i in indices],
+        }
+        if error:
+            event["error"] = error
+        yield event
+
+    yield {
+        "type": "done",
+        "translations": translations,
+        "groups": len(groups),
+        "sentences": total_sentences,
+        "unique_sentences": total_unique,
+    }
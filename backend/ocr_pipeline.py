@@ -2,26 +2,44 @@ from paddleocr import PaddleOCR
 import cv2
 import logging
 
+from model_manager import model_manager
+
 # Configure logging
 logging.basicConfig(level=logging.INFO)
 logger = logging.getLogger(__name__)
 
-# Initialize OCR (English only as per user request)
-try:
-    ocr = PaddleOCR(
+OCR_KEY = ("paddleocr", "en")
+# PaddleOCR memory is not visible to torch; approximate resident size used for budgeting
+OCR_SIZE_MB = 300
+
+def _ocr_device():
+    try:
+        import paddle
+        return "cuda" if paddle.device.is_compiled_with_cuda() and paddle.device.cuda.device_count() > 0 else "cpu"
+    except Exception:
+        return "cpu"
+
+def _load_ocr(device):
+    # English only as per user request
+    return PaddleOCR(
         lang='en',                 # English model
         use_textline_orientation=True,  # replaces deprecated use_angle_cls
         show_log=False # Suppress PaddleOCR internal logging
     )
-    logger.info("PaddleOCR initialized successfully.")
-except Exception as e:
-    logger.error(f"Failed to initialize PaddleOCR: {e}")
-    ocr = None
+
+def _acquire_ocr():
+    """PaddleOCR from the model manager, loaded on first use (None if it cannot be initialized)."""
+    try:
+        return model_manager.acquire(OCR_KEY, _load_ocr, _ocr_device(), mover=None, size_mb=OCR_SIZE_MB)
+    except Exception as e:
+        logger.error(f"Failed to initialize PaddleOCR: {e}")
+        return None
 
 def run_ocr(image_path):
     """
     Runs OCR on the image at the given path and returns the extracted text.
     """
+    ocr = _acquire_ocr()
     if ocr is None:
         return "OCR model not initialized."
 
@@ -51,6 +69,8 @@ def run_ocr(image_path):
     except Exception as e:
         logger.error(f"Error during OCR processing: {e}")
         return f"Error during OCR processing: {str(e)}"
+    finally:
+        model_manager.release(OCR_KEY)
 
 if __name__ == "__main__":
     # Test with a helper function if needed, or manual run
@@ -0,0 +1,159 @@
+import os
+
+from audio_buffer import SAMPLE_RATE, as_audio_buffer
+from asr_pipeline import (
+    chunk_spans,
+    clean_and_paragraphize,
+    decode_whisper_batch,
+    fasterwhisper_batch_segments,
+    fasterwhisper_segments,
+    use_whisper_model,
+    ASR_BATCH_SIZE,
+)
+from lid import get_language_identifier, TARGET_LANGS
+
+# Two-pass ("speculative") ASR: every chunk is first decoded with a small draft model and
+# the draft is returned straight away. Only chunks the draft model was unsure about are
+# then re-decoded with the large model, and each correction is streamed as it lands.
+# On clean speech most chunks pass the confidence checks and never reach the large model.
+
+SPECULATIVE_DRAFT_SIZE = os.getenv("SPECULATIVE_DRAFT_SIZE", "base")
+SPECULATIVE_REFINE_SIZE = os.getenv("SPECULATIVE_REFINE_SIZE", "large")
+# A chunk is refined when its average token log-probability is below this...
+SPECULATIVE_LOGPROB_THRESHOLD = float(os.getenv("SPECULATIVE_LOGPROB_THRESHOLD", "-0.6"))
+# ...when the draft produced text although the chunk is probably not speech (hallucination)...
+SPECULATIVE_NO_SPEECH_THRESHOLD = float(os.getenv("SPECULATIVE_NO_SPEECH_THRESHOLD", "0.5"))
+# ...or when the text is repetitive (gzip compression ratio, as in whisper.transcribe)
+SPECULATIVE_COMPRESSION_THRESHOLD = float(os.getenv("SPECULATIVE_COMPRESSION_THRESHOLD", "2.4"))
+
+SPECULATIVE_MODELS = ("whisper", "faster_whisper")
+
+
+def _decode(buffer, spans, model_name, lang, model_size, batch_size):
+    """Decode spans and return one {"text", "avg_logprob", "no_speech_prob", "compression_ratio"} per span."""
+    if model_name == "faster_whisper":
+        decoded = []
+        try:
+            per_span = fasterwhisper_batch_segments(buffer.samples, spans, lang, model_size, batch_size)
+        except Exception as e:
+            # Same fallback as the regular batched engine: decode the chunks one by one
+            print(f"❌ Batched Faster-Whisper failed ({e}); decoding chunks one by one")
+            per_span = [fasterwhisper_segments(buffer.samples[s:e], lang, model_size) for s, e in spans]
+        for segments in per_span:
+            # The least confident segment decides for the whole chunk
+            decoded.append({
+                "text": " ".join(seg.text.strip() for seg in segments),
+                "avg_logprob": min((seg.avg_logprob for seg in segments), default=0.0),
+                "no_speech_prob": max((seg.no_speech_prob for seg in segments), default=1.0),
+                "compression_ratio": max((seg.compression_ratio for seg in segments), default=0.0),
+            })
+        return decoded
+
+    with use_whisper_model(model_size) as model:
+        n_mels = model.dims.n_mels
+    decoded = [None] * len(spans)
+    # Similar lengths share a batch, as in the regular batched engine
+    order = sorted(range(len(spans)), key=lambda i: spans[i][1] - spans[i][0])
+    for first in range(0, len(order), batch_size):
+        batch = order[first:first + batch_size]
+        chunks = [buffer.samples[spans[i][0]:spans[i][1]] for i in batch]
+        mels = [buffer.mel_window(spans[i][0], spans[i][1], n_mels) for i in batch]
+        for i, r in zip(batch, decode_whisper_batch(chunks, lang, model_size, mels=mels)):
+            decoded[i] = {
+                "text": r.text.strip(),
+                "avg_logprob": r.avg_logprob,
+                "no_speech_prob": r.no_speech_prob,
+                "compression_ratio": r.compression_ratio,
+            }
+    return decoded
+
+
+def needs_refinement(draft):
+    """True when the draft of a chunk is not trustworthy enough to keep."""
+    if not draft["text"]:
+        # Nothing was said, unless the draft model was merely unsure there was speech
+        return draft["no_speech_prob"] < SPECULATIVE_NO_SPEECH_THRESHOLD
+    return (
+        draft["avg_logprob"] < SPECULATIVE_LOGPROB_THRESHOLD
+        or draft["no_speech_prob"] > SPECULATIVE_NO_SPEECH_THRESHOLD
+        or draft["compression_ratio"] > SPECULATIVE_COMPRESSION_THRESHOLD
+    )
+
+
+def transcribe_speculative(audio, model_name="whisper", language=None, draft_size=SPECULATIVE_DRAFT_SIZE,
+                           refine_size=SPECULATIVE_REFINE_SIZE, lid_model="whisper", vad=None,
+                           batch_size=ASR_BATCH_SIZE):
+    """
+    Two-pass transcription of a file path, 16 kHz array or AudioBuffer. Yields events:
+      {"type": "language", ...} when the language was detected,
+      {"type": "draft", "transcription", "segments", "pending"} once every chunk has a draft,
+      {"type": "correction", "index", "start", "end", "text", "draft_text"} per refined chunk,
+      {"type": "done", "transcription", "segments", "refined", ...} with the final result.
+    """
+    if model_name not in SPECULATIVE_MODELS:
+        raise ValueError(f"Speculative ASR supports {', '.join(SPECULATIVE_MODELS)}, not {model_name}")
+    buffer = as_audio_buffer(audio)
+
+    lang = language
+    if not lang:
+        lang, _ = get_language_identifier(lid_model).detect(buffer)
+        if not lang:
+            raise Exception("Could not detect language from audio")
+        print(f"\n✅ Detected Language: {TARGET_LANGS.get(lang, lang)} ({lang})")
+        yield {"type": "language", "language": lang, "language_name": TARGET_LANGS.get(lang, lang)}
+
+    spans = chunk_spans(buffer, chunk_len=30, vad=vad)
+    print(f"\n📝 Drafting {len(spans)} chunks with {model_name} {draft_size}...")
+    drafts = _decode(buffer, spans, model_name, lang, draft_size, batch_size)
+
+    segments = []
+    for i, ((start, end), draft) in enumerate(zip(spans, drafts)):
+        segments.append({
+            "index": i,
+            "start": round(start / SAMPLE_RATE, 2),
+            "end": round(end / SAMPLE_RATE, 2),
+            "text": draft["text"],
+            "model": f"{model_name}/{draft_size}",
+            "avg_logprob": round(float(draft["avg_logprob"]), 3),
+            "no_speech_prob": round(float(draft["no_speech_prob"]), 3),
+            "refine": needs_refinement(draft),
+        })
+    pending = [s["index"] for s in segments if s["refine"]]
+    yield {
+        "type": "draft",
+        "transcription": " ".join(s["text"] for s in segments if s["text"]),
+        "segments": [dict(s) for s in segments],
+        "pending": len(pending),
+    }
+
+    print(f"\n🔁 Refining {len(pending)} of {len(spans)} chunks with {model_name} {refine_size}...")
+    for first in range(0, len(pending), batch_size):
+        batch = pending[first:first + batch_size]
+        refined = _decode(buffer, [spans[i] for i in batch], model_name, lang, refine_size, batch_size)
+        for i, r in zip(batch, refined):
+            segment = segments[i]
+            draft_text, segment["text"] = segment["text"], r["text"]
+            segment["model"] = f"{model_name}/{refine_size}"
+            yield {
+                "type": "correction",
+                "index": i,
+                "start": segment["start"],
+                "end": segment["end"],
+                "text": segment["text"],
+                "draft_text": draft_text,
+                "model": segment["model"],
+            }
+
+    for segment in segments:
+        del segment["refine"]
+    yield {
+        "type": "done",
+        "transcription": clean_and_paragraphize(" ".join(s["text"] for s in segments if s["text"])),
+        "language": lang,
+        "language_name": TARGET_LANGS.get(lang, lang),
+        "segments": segments,
+        "refined": len(pending),
+        "draft_model": f"{model_name}/{draft_size}",
+        "refine_model": f"{model_name}/{refine_size}",
+        "duration": round(buffer.duration, 2),
+    }
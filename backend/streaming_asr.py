@@ -0,0 +1,226 @@
+import os
+import json
+import subprocess
+import threading
+
+import numpy as np
+
+from audio_buffer import SAMPLE_RATE, AudioBuffer
+from vad import speech_regions, frame_energy_db, quietest_cut, FRAME_MS
+from lid import get_language_identifier, TARGET_LANGS
+from asr_pipeline import transcribe_whisper_batch, transcribe_fasterwhisper
+
+# Real-time ASR for browser microphones: audio arrives in small frames over a WebSocket
+# and is decoded with a rolling window. While someone speaks, the open utterance is
+# re-decoded every STREAM_STEP_S seconds ("partial"); after a pause, or once the window
+# reaches STREAM_MAX_WINDOW_S, it is decoded one last time ("final") and dropped from the
+# buffer. Each decode therefore covers at most one window, however long the session runs.
+
+STREAM_MODEL_SIZE = os.getenv("STREAM_MODEL_SIZE", "small")
+STREAM_STEP_S = float(os.getenv("STREAM_STEP_S", "1.0"))
+STREAM_MAX_WINDOW_S = min(float(os.getenv("STREAM_MAX_WINDOW_S", "15")), 30.0)
+# Silence after speech that closes an utterance
+STREAM_MIN_SILENCE_S = float(os.getenv("STREAM_MIN_SILENCE_S", "0.6"))
+# Speech needed before the language is detected (when the client does not pass one)
+STREAM_LID_MIN_S = float(os.getenv("STREAM_LID_MIN_S", "2.0"))
+
+STREAM_MODELS = ("whisper", "faster_whisper")
+STREAM_FORMATS = ("pcm", "opus")
+
+
+class _FFmpegPipeDecoder:
+    """
+    Incremental ffmpeg decoder: encoded bytes (WebM/Ogg Opus from MediaRecorder, or PCM
+    at another sample rate) are written to stdin; a reader thread hands 16 kHz mono
+    float32 samples to on_samples as soon as ffmpeg produces them.
+    """
+
+    def __init__(self, on_samples, input_args=()):
+        cmd = ["ffmpeg", "-nostdin", "-loglevel", "error", *input_args, "-i", "pipe:0",
+               "-vn", "-f", "s16le", "-ac", "1", "-acodec", "pcm_s16le", "-ar", str(SAMPLE_RATE), "pipe:1"]
+        self._proc = subprocess.Popen(cmd, stdin=subprocess.PIPE, stdout=subprocess.PIPE, stderr=subprocess.DEVNULL)
+        self._on_samples = on_samples
+        self._reader = threading.Thread(target=self._read, name="stream-ffmpeg-reader", daemon=True)
+        self._reader.start()
+
+    def _read(self):
+        leftover = b""
+        while True:
+            data = self._proc.stdout.read1(8192)
+            if not data:
+                break
+            data = leftover + data
+            usable = len(data) - len(data) % 2
+            leftover = data[usable:]
+            if usable:
+                self._on_samples(np.frombuffer(data[:usable], np.int16).astype(np.float32) / 32768.0)
+
+    def write(self, data):
+        self._proc.stdin.write(data)
+        self._proc.stdin.flush()
+
+    def close(self, timeout=10):
+        """Flush ffmpeg and wait until every decoded sample has been delivered."""
+        if self._proc.stdin and not self._proc.stdin.closed:
+            try:
+                self._proc.stdin.close()
+            except BrokenPipeError:
+                pass
+        self._reader.join(timeout)
+        if self._proc.poll() is None:
+            self._proc.kill()
+        self._proc.wait()
+
+
+class StreamingTranscriber:
+    """
+    Rolling-window transcriber for one streaming session.
+    - write(bytes) only buffers audio and is cheap enough for the event loop.
+    - step() decodes whatever arrived since the last call and returns events; if decoding
+      falls behind, intermediate partials are skipped instead of queueing up.
+    - finish() flushes the decoder and finalizes the open utterance.
+    Events: {"type": "language"|"partial"|"final", "start", "end", "text", ...}, times in seconds
+    from the start of the session.
+    """
+
+    def __init__(self, model_name="whisper", model_size=STREAM_MODEL_SIZE, language=None,
+                 input_format="pcm", sample_rate=SAMPLE_RATE, lid_model="whisper",
+                 step_s=STREAM_STEP_S, max_window_s=STREAM_MAX_WINDOW_S, min_silence_s=STREAM_MIN_SILENCE_S):
+        if model_name not in STREAM_MODELS:
+            raise ValueError(f"Streaming supports {', '.join(STREAM_MODELS)}, not {model_name}")
+        if input_format not in STREAM_FORMATS:
+            raise ValueError(f"Unsupported stream format: {input_format}")
+        self.model_name = model_name
+        self.model_size = model_size
+        self.language = language
+        self.lid_model = lid_model
+        self.step_samples = int(step_s * SAMPLE_RATE)
+        self.max_window = int(max_window_s * SAMPLE_RATE)
+        self.min_silence = int(min_silence_s * SAMPLE_RATE)
+
+        self._lock = threading.Lock()
+        self._audio = np.zeros(0, dtype=np.float32)  # samples after the last final segment
+        self._offset = 0                             # session position of self._audio[0]
+        self._decoded = 0                            # samples of self._audio already decoded
+        self._leftover = b""
+
+        self._decoder = None
+        if input_format == "opus":
+            self._decoder = _FFmpegPipeDecoder(self._append)
+        elif sample_rate != SAMPLE_RATE:
+            self._decoder = _FFmpegPipeDecoder(self._append, ("-f", "s16le", "-ar", str(sample_rate), "-ac", "1"))
+
+    def _append(self, samples):
+        with self._lock:
+            self._audio = np.concatenate([self._audio, samples])
+
+    def write(self, data):
+        """Buffer one frame: 16-bit little-endian mono PCM, or Opus container bytes."""
+        if self._decoder is not None:
+            self._decoder.write(data)
+            return
+        data = self._leftover + data
+        usable = len(data) - len(data) % 2
+        self._leftover = data[usable:]
+        self._append(np.frombuffer(data[:usable], np.int16).astype(np.float32) / 32768.0)
+
+    def ready(self):
+        """True once enough new audio arrived for another decode."""
+        with self._lock:
+            return len(self._audio) - self._decoded >= self.step_samples
+
+    def _drop(self, n):
+        with self._lock:
+            self._audio = self._audio[n:]
+            self._offset += n
+            self._decoded = max(0, self._decoded - n)
+
+    def _decode(self, audio):
+        if self.model_name == "faster_whisper":
+            return transcribe_fasterwhisper(audio, self.language, self.model_size).strip()
+        return transcribe_whisper_batch([audio], self.language, self.model_size)[0]
+
+    def _segment(self, kind, start, end, text):
+        return {
+            "type": kind,
+            "start": round(float(self._offset + start) / SAMPLE_RATE, 2),
+            "end": round(float(self._offset + end) / SAMPLE_RATE, 2),
+            "text": text,
+        }
+
+    def _detect_language(self, audio, regions, final):
+        speech = sum(e - s for s, e in regions)
+        if speech < STREAM_LID_MIN_S * SAMPLE_RATE and not final:
+            return None
+        lang, _ = get_language_identifier(self.lid_model).detect(AudioBuffer(audio))
+        if not lang:
+            return None
+        self.language = lang
+        return {"type": "language", "language": lang, "language_name": TARGET_LANGS.get(lang, lang)}
+
+    def step(self, final=False):
+        events = []
+        while True:
+            with self._lock:
+                audio = self._audio
+                self._decoded = len(audio)
+            n = len(audio)
+            regions = speech_regions(audio) if n else []
+            if not regions:
+                # Only silence so far: keep a short tail so the next word onset is not clipped
+                self._drop(n if final else max(0, n - self.min_silence))
+                return events
+
+            if self.language is None:
+                event = self._detect_language(audio, regions, final)
+                if event:
+                    events.append(event)
+
+            start, last_end = regions[0][0], regions[-1][1]
+            if final:
+                cut = last_end
+            elif n - last_end >= self.min_silence:
+                cut = last_end
+            elif n - start >= self.max_window:
+                # No pause within the window: close it at the quietest frame of its last seconds
+                limit = start + self.max_window
+                frame = int(SAMPLE_RATE * FRAME_MS / 1000)
+                cut = quietest_cut(frame_energy_db(audio), max(start, limit - 5 * SAMPLE_RATE), limit, frame)
+                cut = cut if cut > start else limit
+            else:
+                text = self._decode(audio[start:n])
+                if text:
+                    events.append(self._segment("partial", start, n, text))
+                return events
+
+            text = self._decode(audio[start:cut])
+            if text:
+                events.append(self._segment("final", start, cut, text))
+            self._drop(cut)
+            # Keep going only to work off a backlog (or the rest of the audio when finishing)
+            if not len(self._audio) or (not final and len(self._audio) < self.max_window):
+                return events
+
+    def finish(self):
+        """Flush buffered audio and finalize the open utterance."""
+        if self._decoder is not None:
+            self._decoder.close()
+            self._decoder = None
+        return self.step(final=True)
+
+    def close(self):
+        if self._decoder is not None:
+            self._decoder.close(timeout=1)
+            self._decoder = None
+
+
+def parse_control_message(text):
+    """Text frames carry control messages: 'stop' or {"type": "stop"} ends the session."""
+    text = text.strip()
+    try:
+        message = json.loads(text)
+    except ValueError:
+        return text.lower()
+    if isinstance(message, dict):
+        return str(message.get("type") or message.get("event") or "").lower()
+    return str(message).lower()
@@ -0,0 +1,60 @@
+#!/usr/bin/env python3
+"""
+Test script for transcription cache keys
+Checks that YouTube URLs in their different forms map to one video id, and that
+look-alike hosts (notyoutube.com, youtube.com.evil.example) are not treated as YouTube.
+
+Usage:
+    python test_asr_cache.py
+"""
+
+import os
+import sys
+
+# Key derivation only: do not open the on-disk cache
+os.environ["ASR_CACHE"] = "0"
+
+from asr_cache import youtube_video_id, youtube_content_id
+
+YOUTUBE_URLS = [
+    "https://www.youtube.com/watch?v=dQw4w9WgXcQ",
+    "https://youtube.com/watch?v=dQw4w9WgXcQ&t=42s",
+    "https://m.youtube.com/watch?v=dQw4w9WgXcQ",
+    "https://music.youtube.com/watch?v=dQw4w9WgXcQ",
+    "https://youtu.be/dQw4w9WgXcQ?si=abc",
+    "https://www.youtube.com/shorts/dQw4w9WgXcQ",
+    "https://www.youtube.com/embed/dQw4w9WgXcQ",
+    "https://www.youtube-nocookie.com/embed/dQw4w9WgXcQ",
+    "https://www.youtube.com/live/dQw4w9WgXcQ",
+]
+
+NOT_YOUTUBE_URLS = [
+    "https://notyoutube.com/watch?v=dQw4w9WgXcQ",
+    "https://evilyoutube-nocookie.com/embed/dQw4w9WgXcQ",
+    "https://notyoutu.be/dQw4w9WgXcQ",
+    "https://youtube.com.evil.example/watch?v=dQw4w9WgXcQ",
+    "https://example.com/watch?v=dQw4w9WgXcQ",
+]
+
+
+def main():
+    print("🧪 Testing YouTube cache keys")
+    print("=" * 50)
+    ok = True
+    for url in YOUTUBE_URLS:
+        video_id = youtube_video_id(url)
+        if video_id != "dQw4w9WgXcQ":
+            print(f"❌ {url} → {video_id}")
+            ok = False
+    for url in NOT_YOUTUBE_URLS:
+        video_id = youtube_video_id(url)
+        if video_id is not None or youtube_content_id(url) != f"url:{url}":
+            print(f"❌ {url} was treated as YouTube video {video_id}")
+            ok = False
+    if ok:
+        print(f"✅ {len(YOUTUBE_URLS)} YouTube URLs share one key; {len(NOT_YOUTUBE_URLS)} look-alike hosts do not")
+    sys.exit(0 if ok else 1)
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,84 @@
+#!/usr/bin/env python3
+"""
+Test script for batched Faster-Whisper decoding
+Runs the batched engine (_transcribe_batched) against a stand-in BatchedInferencePipeline
+that slices the audio by clip_timestamps exactly like faster-whisper does, and fails if
+any chunk was decoded by the per-chunk fallback instead: a silent fallback would make
+the batched path (and its benchmark numbers) quietly per-chunk again.
+
+Usage:
+    python test_fasterwhisper_batch.py
+"""
+
+import sys
+from contextlib import contextmanager
+from types import SimpleNamespace
+
+import numpy as np
+
+import asr_pipeline
+from audio_buffer import AudioBuffer, SAMPLE_RATE
+
+
+class StubBatchedPipeline:
+    calls = 0
+
+    def __init__(self, model):
+        self.model = model
+
+    def transcribe(self, audio, language=None, batch_size=8, vad_filter=False, clip_timestamps=None):
+        type(self).calls += 1
+
+        def segments():
+            for clip in clip_timestamps:
+                # faster-whisper's collect_chunks: sample-index slicing
+                chunk = audio[clip["start"]:clip["end"]]
+                yield SimpleNamespace(
+                    start=clip["start"] / SAMPLE_RATE,
+                    end=clip["end"] / SAMPLE_RATE,
+                    text=f" {len(chunk)} samples",
+                    avg_logprob=-0.1, no_speech_prob=0.01, compression_ratio=1.2,
+                )
+
+        return segments(), SimpleNamespace(language=language)
+
+
+@contextmanager
+def stub_model(model_size, device=None):
+    yield SimpleNamespace(model_size=model_size)
+
+
+def per_chunk_fallback(*args, **kwargs):
+    raise AssertionError("per-chunk fallback was used")
+
+
+def main():
+    print("🧪 Testing batched Faster-Whisper decoding")
+    print("=" * 50)
+    asr_pipeline.faster_whisper.BatchedInferencePipeline = StubBatchedPipeline
+    asr_pipeline.use_fasterwhisper_model = stub_model
+    asr_pipeline.transcribe_fasterwhisper = per_chunk_fallback
+    asr_pipeline.fasterwhisper_segments = per_chunk_fallback
+
+    buffer = AudioBuffer(np.zeros(95 * SAMPLE_RATE, dtype=np.float32))
+    spans = [(0, 30 * SAMPLE_RATE), (30 * SAMPLE_RATE, 61 * SAMPLE_RATE - 7), (61 * SAMPLE_RATE - 7, len(buffer))]
+    results, errors = asr_pipeline._transcribe_batched(buffer, spans, "faster_whisper", "hi", "tiny", "ctc", 8)
+
+    ok = True
+    if errors:
+        print(f"❌ Batched path failed and fell back: {errors[0][1]}")
+        ok = False
+    expected = [(i, f"{e - s} samples") for i, (s, e) in enumerate(spans)]
+    if sorted(results) != expected:
+        print(f"❌ Expected {expected}, got {sorted(results)}")
+        ok = False
+    if StubBatchedPipeline.calls != 1:
+        print(f"❌ Expected one batched pipeline call, got {StubBatchedPipeline.calls}")
+        ok = False
+    if ok:
+        print(f"✅ {len(spans)} chunks decoded in one batched call, mapped back to their spans")
+    sys.exit(0 if ok else 1)
+
+
+if __name__ == "__main__":
+    main()
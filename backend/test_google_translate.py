@@ -0,0 +1,115 @@
+#!/usr/bin/env python3
+"""
+Test script for the Google Translate backend
+Runs a local stand-in for the Google endpoint (GOOGLE_TRANSLATE_URL) that "translates"
+by tagging every line, throttles the first request with 429 and adds a fixed latency,
+then checks ordering, batching, retries and concurrency, and reports throughput.
+
+Usage:
+    python test_google_translate.py [--sentences 200] [--latency-ms 50]
+"""
+
+import os
+import sys
+import json
+import time
+import argparse
+import threading
+from http.server import ThreadingHTTPServer, BaseHTTPRequestHandler
+from urllib.parse import urlparse, parse_qs
+
+
+class MockGoogleHandler(BaseHTTPRequestHandler):
+    latency = 0.05
+    lock = threading.Lock()
+    requests = 0
+    in_flight = 0
+    max_in_flight = 0
+    throttle_next = True
+
+    def log_message(self, *args):
+        pass
+
+    def do_POST(self):
+        cls = type(self)
+        with cls.lock:
+            cls.requests += 1
+            throttle, cls.throttle_next = cls.throttle_next, False
+            cls.in_flight += 1
+            cls.max_in_flight = max(cls.max_in_flight, cls.in_flight)
+        try:
+            body = self.rfile.read(int(self.headers.get("Content-Length", 0))).decode("utf-8")
+            text = parse_qs(body)["q"][0]
+            tgt = parse_qs(urlparse(self.path).query)["tl"][0]
+            time.sleep(cls.latency)
+            if throttle:
+                self.send_response(429)
+                self.send_header("Retry-After", "0")
+                self.end_headers()
+                return
+            # Same shape as the real endpoint: one [translated, source] segment per line
+            lines = text.split("\n")
+            segments = [[f"[{tgt}] {line}" + ("\n" if i < len(lines) - 1 else ""), line] for i, line in enumerate(lines)]
+            payload = json.dumps([segments, None, "en"]).encode("utf-8")
+            self.send_response(200)
+            self.send_header("Content-Type", "application/json")
+            self.send_header("Content-Length", str(len(payload)))
+            self.end_headers()
+            self.wfile.write(payload)
+        finally:
+            with cls.lock:
+                cls.in_flight -= 1
+
+
+def start_server():
+    server = ThreadingHTTPServer(("127.0.0.1", 0), MockGoogleHandler)
+    threading.Thread(target=server.serve_forever, daemon=True).start()
+    return server
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Test the Google Translate backend against a local stand-in")
+    parser.add_argument("--sentences", type=int, default=200)
+    parser.add_argument("--latency-ms", type=float, default=50)
+    parser.add_argument("--max-chars", type=int, default=500, help="Characters per request (small to force many batches)")
+    args = parser.parse_args()
+
+    MockGoogleHandler.latency = args.latency_ms / 1000
+    server = start_server()
+    os.environ["GOOGLE_TRANSLATE_URL"] = f"http://127.0.0.1:{server.server_port}/translate_a/single"
+    os.environ["GOOGLE_TRANSLATE_MAX_CHARS"] = str(args.max_chars)
+    os.environ["GOOGLE_TRANSLATE_BACKOFF_S"] = "0.01"
+    import google_translate
+
+    sentences = [f"This is sentence number {i}." for i in range(args.sentences)]
+    print(f"🧪 Translating {len(sentences)} sentences via {os.environ['GOOGLE_TRANSLATE_URL']}")
+    started = time.perf_counter()
+    outputs = google_translate.translate_sentences(sentences, "en", "hi")
+    elapsed = time.perf_counter() - started
+
+    batches = len(google_translate.pack_sentences(sentences, args.max_chars))
+    print(f"   Requests: {MockGoogleHandler.requests} for {batches} batches (1 throttled)  "
+          f"Max concurrent: {MockGoogleHandler.max_in_flight}  Time: {elapsed:.2f}s  "
+          f"({len(sentences) / elapsed:.0f} sentences/s; serial would be ~{len(sentences) * args.latency_ms / 1000:.1f}s)")
+
+    ok = True
+    if outputs != [f"[hi] {s}" for s in sentences]:
+        print("❌ Translations are missing or out of order")
+        ok = False
+    if MockGoogleHandler.requests != batches + 1:
+        print("❌ Expected one request per batch plus one retry")
+        ok = False
+    if MockGoogleHandler.max_in_flight < 2 and batches > 1:
+        print("❌ Batches were not sent concurrently")
+        ok = False
+    if MockGoogleHandler.max_in_flight > google_translate.GOOGLE_TRANSLATE_CONCURRENCY:
+        print("❌ More concurrent requests than GOOGLE_TRANSLATE_CONCURRENCY")
+        ok = False
+    if ok:
+        print("✅ Google backend batches, retries and runs requests concurrently")
+    server.shutdown()
+    sys.exit(0 if ok else 1)
+
+
+if __name__ == "__main__":
+    main()
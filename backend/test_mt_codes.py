@@ -0,0 +1,75 @@
+#!/usr/bin/env python3
+"""
+Test script for MT language-code handling
+Backends normalize language codes themselves, so the cached/batched MT paths must hand
+them the caller's codes: normalizing twice turned Nepali ('ne' / 'npi_Deva') into
+'nep_Deva' and then into English for NLLB. Runs with recording stand-ins for the
+backends, so no models are loaded.
+
+Usage:
+    python test_mt_codes.py
+"""
+
+import os
+import sys
+
+# Exercise the code paths, not the translation memory
+os.environ["MT_CACHE"] = "0"
+
+import mt
+
+CODES = sorted(set(mt.LANG_TO_NLLB) | set(mt.INDICTRANS_TO_GOOGLE) | set(mt.GOOGLE_TO_INDICTRANS))
+
+
+def main():
+    print("🧪 Testing MT language codes")
+    print("=" * 50)
+    ok = True
+
+    for name, normalize in mt.MT_CODE_NORMALIZERS.items():
+        for code in CODES:
+            once = normalize(code)
+            if normalize(once) != once:
+                print(f"❌ {name}: {code} → {once} → {normalize(once)} (normalizer is not idempotent)")
+                ok = False
+
+    calls = []
+    backends = dict(mt.MT_BACKENDS)
+
+    def recorder(name):
+        def translate(texts, src_lang, tgt_lang):
+            calls.append((name, src_lang, tgt_lang))
+            return [f"[{name}] {t}" for t in texts]
+        return translate
+
+    for name in mt.MT_BACKENDS:
+        mt.MT_BACKENDS[name] = recorder(name)
+    try:
+        mt.translate_sentences(["Hello there."], "en", "ne", "nllb")
+        if calls[-1] != ("nllb", "en", "ne"):
+            print(f"❌ translate_sentences passed {calls[-1][1:]} to the backend instead of ('en', 'ne')")
+            ok = False
+
+        items = [
+            {"text": "Good morning.", "src_lang": "npi_Deva", "tgt_lang": "eng_Latn", "model": "nllb"},
+            {"text": "Good night.", "src_lang": "ne", "tgt_lang": "en", "model": "nllb"},
+        ]
+        events = list(mt.translate_batch(items))
+        groups = [e for e in events if e["type"] == "group"]
+        if len(groups) != 1:
+            print(f"❌ 'ne' and 'npi_Deva' should share one NLLB group, got {len(groups)}")
+            ok = False
+        src, tgt = calls[-1][1:]
+        if (mt.normalize_code_for_nllb(src), mt.normalize_code_for_nllb(tgt)) != ("nep_Deva", "eng_Latn"):
+            print(f"❌ translate_batch made NLLB translate {src}->{tgt} instead of Nepali to English")
+            ok = False
+    finally:
+        mt.MT_BACKENDS.update(backends)
+
+    if ok:
+        print(f"✅ {len(CODES)} codes normalize idempotently; backends receive the caller's codes")
+    sys.exit(0 if ok else 1)
+
+
+if __name__ == "__main__":
+    main()
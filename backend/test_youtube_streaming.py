@@ -0,0 +1,68 @@
+#!/usr/bin/env python3
+"""
+Test script for streaming (transcribe-while-downloading) ingestion
+Serves a sample clip from a local HTTP server as a stand-in for a YouTube
+audio stream and checks that it is decoded window by window
+"""
+
+import os
+import sys
+import threading
+import functools
+from http.server import HTTPServer, SimpleHTTPRequestHandler
+
+from audio_buffer import SAMPLE_RATE, decode_audio, stream_decode_audio
+
+SAMPLE_DIR = "samples"
+SAMPLE_FILE = "female_clip.wav"
+
+class QuietHandler(SimpleHTTPRequestHandler):
+    def log_message(self, *args):
+        pass
+
+def start_server():
+    handler = functools.partial(QuietHandler, directory=SAMPLE_DIR)
+    server = HTTPServer(("127.0.0.1", 0), handler)
+    threading.Thread(target=server.serve_forever, daemon=True).start()
+    return server
+
+def test_stream_decode(url, window_s=5):
+    """Streamed windows must add up to the same samples as a full decode"""
+    print(f"🧪 Streaming {url} in {window_s}s windows")
+    blocks = list(stream_decode_audio(url, window_s=window_s))
+    streamed = sum(len(b) for b in blocks)
+    full = len(decode_audio(os.path.join(SAMPLE_DIR, SAMPLE_FILE)))
+
+    print(f"   Windows: {len(blocks)}  Streamed: {streamed / SAMPLE_RATE:.2f}s  Full decode: {full / SAMPLE_RATE:.2f}s")
+    if any(len(b) != window_s * SAMPLE_RATE for b in blocks[:-1]):
+        print("❌ Only the last window may be shorter than window_s")
+        return False
+    if streamed != full:
+        print("❌ Streamed audio does not match the full decode")
+        return False
+    print("✅ Streaming decode matches the full decode")
+    return True
+
+def test_stream_transcription(url):
+    """Events arrive per window and end with a 'done' event (needs the ASR models)"""
+    from asr_pipeline import transcribe_stream
+
+    print(f"\n🧪 Transcribing {url} while it streams")
+    events = []
+    for event in transcribe_stream(stream_decode_audio(url, window_s=10), "whisper", "base"):
+        print(f"   {event['type']}: {event.get('text') or event.get('language') or event.get('transcription', '')[:80]}")
+        events.append(event)
+    if not events or events[-1]["type"] != "done":
+        print("❌ Stream did not finish with a 'done' event")
+        return False
+    print("✅ Streaming transcription finished")
+    return True
+
+if __name__ == "__main__":
+    server = start_server()
+    url = f"http://127.0.0.1:{server.server_address[1]}/{SAMPLE_FILE}"
+    ok = test_stream_decode(url)
+    if "--asr" in sys.argv:
+        ok = test_stream_transcription(url) and ok
+    server.shutdown()
+    sys.exit(0 if ok else 1)
@@ -0,0 +1,164 @@
+import os
+import json
+import time
+import sqlite3
+import hashlib
+import threading
+import unicodedata
+from collections import OrderedDict
+
+# Sentence-level translation memory shared by every MT backend: UI strings, repeated chat
+# phrases and re-submitted documents are translated once. Two tiers: an in-process LRU
+# for the hottest sentences in front of a SQLite store that survives restarts. Both are
+# bounded by entry count and evict least-recently-used entries first.
+MT_CACHE_ENABLED = os.getenv("MT_CACHE", "1").lower() not in ("0", "false", "no")
+MT_CACHE_DIR = os.getenv("MT_CACHE_DIR", "mt_cache")
+MT_CACHE_MEMORY_ENTRIES = int(os.getenv("MT_CACHE_MEMORY_ENTRIES", "20000"))
+MT_CACHE_MAX_ENTRIES = int(os.getenv("MT_CACHE_MAX_ENTRIES", "500000"))
+
+# SQLite limits the number of bound parameters per statement
+_SQL_BATCH = 500
+# Memory-tier hits refresh the on-disk last_access in batches of this many keys
+_TOUCH_BATCH = 256
+
+
+def normalize_sentence(text):
+    """Canonical form of a source sentence: NFC Unicode with collapsed whitespace."""
+    return " ".join(unicodedata.normalize("NFC", text).split())
+
+
+def make_translation_key(backend, model_name, src_lang, tgt_lang, sentence):
+    payload = json.dumps([backend, model_name, src_lang, tgt_lang, normalize_sentence(sentence)], ensure_ascii=False)
+    return hashlib.sha256(payload.encode("utf-8")).hexdigest()
+
+
+class TranslationCache:
+    """In-process LRU in front of a SQLite translation store."""
+
+    def __init__(self, directory=MT_CACHE_DIR, memory_entries=MT_CACHE_MEMORY_ENTRIES, max_entries=MT_CACHE_MAX_ENTRIES):
+        os.makedirs(directory, exist_ok=True)
+        self.memory_entries = memory_entries
+        self.max_entries = max_entries
+        self.memory_hits = 0
+        self.disk_hits = 0
+        self.misses = 0
+        self.memory_evictions = 0
+        self.disk_evictions = 0
+        self._memory = OrderedDict()
+        # key -> time of memory-tier hits whose last_access is not written to disk yet
+        self._touched = {}
+        self._lock = threading.Lock()
+        self._db = sqlite3.connect(os.path.join(directory, "translations.db"), check_same_thread=False)
+        self._db.execute(
+            "CREATE TABLE IF NOT EXISTS translations ("
+            " key TEXT PRIMARY KEY, value TEXT NOT NULL, created REAL NOT NULL, last_access REAL NOT NULL)"
+        )
+        self._db.execute("CREATE INDEX IF NOT EXISTS translations_lru ON translations (last_access)")
+        self._db.commit()
+        # Row count kept up to date by put_many / _evict instead of a COUNT(*) per write
+        self._count = self._db.execute("SELECT COUNT(*) FROM translations").fetchone()[0]
+
+    def _remember(self, key, value):
+        self._memory[key] = value
+        self._memory.move_to_end(key)
+        while len(self._memory) > self.memory_entries:
+            self._memory.popitem(last=False)
+            self.memory_evictions += 1
+
+    def get_many(self, keys):
+        """{key: translation} for the keys that are cached (memory first, then disk)."""
+        found, missing = {}, []
+        now = time.time()
+        with self._lock:
+            for key in dict.fromkeys(keys):
+                if key in self._memory:
+                    self._memory.move_to_end(key)
+                    found[key] = self._memory[key]
+                    self._touched[key] = now
+                    self.memory_hits += 1
+                else:
+                    missing.append(key)
+
+            disk = {}
+            for first in range(0, len(missing), _SQL_BATCH):
+                batch = missing[first:first + _SQL_BATCH]
+                rows = self._db.execute(
+                    f"SELECT key, value FROM translations WHERE key IN ({','.join('?' * len(batch))})", batch
+                ).fetchall()
+                disk.update(rows)
+            for key, value in disk.items():
+                self._remember(key, value)
+                self._touched[key] = now
+            # Hot sentences live in memory, but disk eviction must still see them as recent
+            if disk or len(self._touched) >= _TOUCH_BATCH:
+                self._flush_touches()
+                self._db.commit()
+            found.update(disk)
+            self.disk_hits += len(disk)
+            self.misses += len(missing) - len(disk)
+        return found
+
+    def put_many(self, items):
+        """Store {key: translation} in both tiers."""
+        if not items:
+            return
+        now = time.time()
+        keys = list(items)
+        with self._lock:
+            for key, value in items.items():
+                self._remember(key, value)
+            existing = 0
+            for first in range(0, len(keys), _SQL_BATCH):
+                batch = keys[first:first + _SQL_BATCH]
+                existing += self._db.execute(
+                    f"SELECT COUNT(*) FROM translations WHERE key IN ({','.join('?' * len(batch))})", batch
+                ).fetchone()[0]
+            self._flush_touches()
+            self._db.executemany(
+                "INSERT OR REPLACE INTO translations (key, value, created, last_access) VALUES (?, ?, ?, ?)",
+                [(key, value, now, now) for key, value in items.items()],
+            )
+            self._count += len(keys) - existing
+            self._evict()
+            self._db.commit()
+
+    def _flush_touches(self):
+        if self._touched:
+            self._db.executemany(
+                "UPDATE translations SET last_access = ? WHERE key = ?", [(t, k) for k, t in self._touched.items()]
+            )
+            self._touched.clear()
+
+    def _evict(self):
+        excess = self._count - self.max_entries
+        if excess > 0:
+            self._db.execute(
+                "DELETE FROM translations WHERE key IN"
+                " (SELECT key FROM translations ORDER BY last_access ASC LIMIT ?)",
+                (excess,),
+            )
+            self._count -= excess
+            self.disk_evictions += excess
+
+    def stats(self):
+        with self._lock:
+            count = self._count
+            hits = self.memory_hits + self.disk_hits
+            lookups = hits + self.misses
+            return {
+                "hits": hits,
+                "memory_hits": self.memory_hits,
+                "disk_hits": self.disk_hits,
+                "misses": self.misses,
+                "hit_ratio": round(hits / lookups, 4) if lookups else 0.0,
+                "memory_entries": len(self._memory),
+                "memory_max_entries": self.memory_entries,
+                "memory_evictions": self.memory_evictions,
+                "disk_entries": count,
+                "disk_max_entries": self.max_entries,
+                "disk_evictions": self.disk_evictions,
+            }
+
+
+# Process-wide instance (None when MT_CACHE=0)
+translation_cache = TranslationCache() if MT_CACHE_ENABLED else None
@@ -46,6 +46,16 @@ except ImportError:
     from tts_gtts import run_gtts
     from indic_tts import run_indic_tts, INDIC_LANGS
 
+from model_manager import model_manager
+
+XTTS_MODEL_NAME = "tts_models/multilingual/multi-dataset/xtts_v2"
+
+
+def use_xtts_model():
+    """Hold the XTTS-v2 model from the model manager (loaded once, not per request)."""
+    device = "cuda" if torch.cuda.is_available() else "cpu"
+    return model_manager.use(("xtts", XTTS_MODEL_NAME), lambda d: TTS(XTTS_MODEL_NAME).to(d), device)
+
 # =========================================================
 # 🧩 Auto-fix missing dependencies for Japanese tokenizer
 # =========================================================
@@ -199,9 +209,6 @@ def run_tts(text, lang_code, reference_audio=None,
     if prefer == "xtts" or (prefer == "auto" and lang in XTTS_LANGS):
         print(f"🎙️ Using XTTS for language: {lang}")
         try:
-            tts = TTS("tts_models/multilingual/multi-dataset/xtts_v2")
-            tts.to("cuda" if torch.cuda.is_available() else "cpu")
-
             # Reference voice
             ref_wav = None
             if reference_audio and os.path.exists(reference_audio):
@@ -220,15 +227,16 @@ def run_tts(text, lang_code, reference_audio=None,
             print(f"🔹 {len(chunks)} text chunks prepared for XTTS.")
 
             audios = []
-            for i, chunk in enumerate(chunks):
-                try:
-                    print(f"🗣️ Generating chunk {i+1}/{len(chunks)}...")
-                    wav = tts.tts(text=chunk, speaker_wav=ref_wav, language=lang)
-                    audios.append(wav)
-                except Exception as e:
-                    print(f"⚠️ XTTS chunk {i+1} failed ({e}) — using gTTS fallback.")
-                    run_gtts(chunk, lang=lang, out_dir=out_dir,
-                             out_name=f"_chunk_fallback_{i}.mp3")
+            with use_xtts_model() as tts:
+                for i, chunk in enumerate(chunks):
+                    try:
+                        print(f"🗣️ Generating chunk {i+1}/{len(chunks)}...")
+                        wav = tts.tts(text=chunk, speaker_wav=ref_wav, language=lang)
+                        audios.append(wav)
+                    except Exception as e:
+                        print(f"⚠️ XTTS chunk {i+1} failed ({e}) — using gTTS fallback.")
+                        run_gtts(chunk, lang=lang, out_dir=out_dir,
+                                 out_name=f"_chunk_fallback_{i}.mp3")
 
             if not audios:
                 print("⚠️ XTTS fully failed — using gTTS fallback for full text.")
@@ -0,0 +1,102 @@
+import numpy as np
+
+# Energy-based voice activity detection used to drop silence/music before ASR
+# and to place chunk boundaries in pauses instead of at fixed 30 s offsets.
+
+SAMPLE_RATE = 16000
+FRAME_MS = 30
+
+
+def frame_energy_db(audio, sample_rate=SAMPLE_RATE, frame_ms=FRAME_MS):
+    """Per-frame RMS energy in dBFS (the trailing partial frame is zero-padded)."""
+    frame = int(sample_rate * frame_ms / 1000)
+    n_frames = -(-len(audio) // frame)
+    if n_frames == 0:
+        return np.zeros(0, dtype=np.float32)
+    padded = np.zeros(n_frames * frame, dtype=np.float32)
+    padded[:len(audio)] = audio
+    rms = np.sqrt(np.mean(padded.reshape(n_frames, frame) ** 2, axis=1))
+    return 20 * np.log10(np.maximum(rms, 1e-10))
+
+
+def _runs(mask):
+    """(start, end) frame index pairs of consecutive True values."""
+    edges = np.diff(np.concatenate(([0], mask.astype(np.int8), [0])))
+    return list(zip(np.flatnonzero(edges == 1), np.flatnonzero(edges == -1)))
+
+
+def speech_regions(audio, sample_rate=SAMPLE_RATE, frame_ms=FRAME_MS, margin_db=12.0,
+                   min_speech_ms=250, min_silence_ms=300, pad_ms=200):
+    """
+    Detect speech as (start_sample, end_sample) pairs.
+    - The threshold adapts to the recording: noise floor + margin_db, capped well below
+      the loud frames so recordings that are almost all speech are not discarded.
+    - Pauses shorter than min_silence_ms are bridged, blips shorter than min_speech_ms
+      dropped, and every region is padded by pad_ms on both sides.
+    """
+    energy = frame_energy_db(audio, sample_rate, frame_ms)
+    if len(energy) == 0:
+        return []
+
+    floor = np.percentile(energy, 10)
+    loud = np.percentile(energy, 95)
+    threshold = max(min(floor + margin_db, loud - 20.0), -60.0)
+    voiced = energy > threshold
+
+    # Bridge short pauses, then drop short blips
+    min_silence = max(1, min_silence_ms // frame_ms)
+    for start, end in _runs(~voiced):
+        if start > 0 and end < len(voiced) and end - start < min_silence:
+            voiced[start:end] = True
+    min_speech = max(1, min_speech_ms // frame_ms)
+    frame = int(sample_rate * frame_ms / 1000)
+    pad = int(sample_rate * pad_ms / 1000)
+
+    regions = []
+    for start, end in _runs(voiced):
+        if end - start < min_speech:
+            continue
+        s = max(0, start * frame - pad)
+        e = min(len(audio), end * frame + pad)
+        if regions and s <= regions[-1][1]:
+            regions[-1] = (regions[-1][0], e)
+        else:
+            regions.append((s, e))
+    return regions
+
+
+def quietest_cut(energy, lo, hi, frame):
+    """
+    Sample offset of the quietest frame between sample offsets lo and hi, where energy is
+    frame_energy_db(audio) and frame the samples per frame. Used to place cuts in pauses.
+    """
+    f_lo, f_hi = lo // frame, max(lo // frame + 1, hi // frame)
+    return (f_lo + int(np.argmin(energy[f_lo:f_hi]))) * frame
+
+
+def pack_speech_chunks(audio, regions, sample_rate=SAMPLE_RATE, max_chunk_s=30,
+                       max_gap_s=2.0, search_s=5.0, frame_ms=FRAME_MS):
+    """
+    Pack speech regions into contiguous (start, end) spans of at most max_chunk_s.
+    A span is closed when the next region would overflow the window or follows a
+    silence longer than max_gap_s (that silence is dropped). Regions longer than the
+    window are cut at the quietest frame within the last search_s seconds.
+    """
+    max_len = int(max_chunk_s * sample_rate)
+    max_gap = int(max_gap_s * sample_rate)
+    frame = int(sample_rate * frame_ms / 1000)
+    energy = frame_energy_db(audio, sample_rate, frame_ms)
+
+    spans = []
+    for start, end in regions:
+        if spans and start - spans[-1][1] <= max_gap and end - spans[-1][0] <= max_len:
+            spans[-1] = (spans[-1][0], end)
+            continue
+        while end - start > max_len:
+            lo = start + max_len - int(search_s * sample_rate)
+            cut = quietest_cut(energy, lo, start + max_len, frame)
+            cut = cut if cut > start else start + max_len
+            spans.append((start, cut))
+            start = cut
+        spans.append((start, end))
+    return spans
@@ -38,6 +38,10 @@ torch.load = _patched_torch_load
 # Now import TTS after safe globals are set up
 from TTS.api import TTS
 
+from model_manager import model_manager
+
+XTTS_MODEL_NAME = "tts_models/multilingual/multi-dataset/xtts_v2"
+
 # 🌍 Supported language codes for XTTS
 SUPPORTED_LANGS = {
     "en": "Hello, this is English.",
@@ -66,10 +70,10 @@ def run_xtts(text, reference_audio, lang="en", out_dir="tts_output", out_name=No
     """
     os.makedirs(out_dir, exist_ok=True)
 
+    device = "cuda" if torch.cuda.is_available() else "cpu"
     try:
-        # 🔹 Initialize XTTS-v2 (auto-downloads from HF if missing)
-        tts = TTS("tts_models/multilingual/multi-dataset/xtts_v2")
-        tts.to("cuda" if torch.cuda.is_available() else "cpu")
+        # 🔹 Initialize XTTS-v2 once (auto-downloads from HF if missing); shared via the model manager
+        tts = model_manager.acquire(("xtts", XTTS_MODEL_NAME), lambda d: TTS(XTTS_MODEL_NAME).to(d), device)
     except Exception as e:
         print("⚠️ PyTorch safe globals blocked:", e)
         print("👉 Add the missing class to add_safe_globals[] above.")
@@ -82,12 +86,15 @@ def run_xtts(text, reference_audio, lang="en", out_dir="tts_output", out_name=No
     out_path = os.path.join(out_dir, out_name)
 
     # 🔹 Generate speech
-    tts.tts_to_file(
-        text=text,
-        speaker_wav=reference_audio,
-        language=lang,
-        file_path=out_path,
-    )
+    try:
+        tts.tts_to_file(
+            text=text,
+            speaker_wav=reference_audio,
+            language=lang,
+            file_path=out_path,
+        )
+    finally:
+        model_manager.release(("xtts", XTTS_MODEL_NAME))
 
     print(f"✅ XTTS TTS saved to {out_path}")
     return out_path